@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class DomesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "domes"
+
+    def ready(self):
+        from planetarium_service.conditional import track_model_versions
+        from domes.models import PlanetariumDome
+
+        track_model_versions(PlanetariumDome)
@@ -1,14 +1,20 @@
+import time
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from planetarium_service.conditional import model_version_key
 from domes.models import PlanetariumDome
 from domes.serializers import (
     PlanetariumDomeSerializer
 )
 
 PLANETARIUM_DOME_URL = reverse("domes:planetariumdome-list")
+ASYNC_PLANETARIUM_DOME_URL = reverse("domes:planetariumdome-list-async")
 
 
 def detail_url(planetarium_dome_id):
@@ -51,6 +57,47 @@ class AuthenticatedPlanetariumDomeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_planetarium_domes_not_modified_since(self):
+        cache.set(
+            model_version_key(PlanetariumDome), time.time_ns() - 10**9, None
+        )
+        res = self.client.get(PLANETARIUM_DOME_URL)
+
+        res = self.client.get(
+            PLANETARIUM_DOME_URL,
+            HTTP_IF_MODIFIED_SINCE=res["Last-Modified"]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_change_in_current_second_has_no_last_modified(self):
+        cache.set(model_version_key(PlanetariumDome), time.time_ns(), None)
+        res = self.client.get(PLANETARIUM_DOME_URL)
+
+        self.assertNotIn("Last-Modified", res)
+        res = self.client.get(
+            PLANETARIUM_DOME_URL,
+            HTTP_IF_MODIFIED_SINCE=http_date(time.time()),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    async def test_async_list_planetarium_domes(self):
+        headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+
+        res = await self.async_client.get(
+            ASYNC_PLANETARIUM_DOME_URL, headers=headers
+        )
+        expected = await self.async_client.get(
+            PLANETARIUM_DOME_URL, headers=headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()), 3)
+        self.assertEqual(res.json(), expected.json())
+
     def test_planetarium_dome_creation_is_prohibited(self):
         payload = {
             "name": "Big Dome",
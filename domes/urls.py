@@ -1,12 +1,17 @@
 from django.urls import path, include
 from rest_framework import routers
-from domes.views import PlanetariumDomeViewSet
+from domes.views import AsyncPlanetariumDomeListView, PlanetariumDomeViewSet
 
 router = routers.DefaultRouter()
 router.register("domes", PlanetariumDomeViewSet)
 
 urlpatterns = [
-    path("", include(router.urls))
+    path("", include(router.urls)),
+    path(
+        "async/domes/",
+        AsyncPlanetariumDomeListView.as_view(),
+        name="planetariumdome-list-async",
+    ),
 ]
 
 app_name = "domes"
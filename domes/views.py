@@ -2,10 +2,13 @@ from rest_framework import mixins
 from rest_framework.viewsets import GenericViewSet
 from domes.models import PlanetariumDome
 from domes.serializers import PlanetariumDomeSerializer
+from planetarium_service.async_views import AsyncReadView
+from planetarium_service.conditional import ConditionalGetMixin
 from user.permissions import IsAdminOrIfAuthenticatedReadOnly
 
 
 class PlanetariumDomeViewSet(
+    ConditionalGetMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -15,3 +18,14 @@ class PlanetariumDomeViewSet(
     queryset = PlanetariumDome.objects.all()
     serializer_class = PlanetariumDomeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    conditional_models = (PlanetariumDome,)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class AsyncPlanetariumDomeListView(AsyncReadView):
+    viewset_class = PlanetariumDomeViewSet
+    action = "list"
@@ -0,0 +1,99 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.request import Request
+from user.authentication import AsyncJWTAuthentication
+
+
+def api_error_response(error):
+    """JSON response with the same body DRF renders for the exception"""
+    detail = error.detail
+    if not isinstance(detail, dict):
+        detail = {"detail": detail}
+    return JsonResponse(detail, status=error.status_code)
+
+
+class AsyncReadView(View):
+    """
+    Async variant of the list or retrieve action of `viewset_class`.
+    The viewset still builds the queryset and the serializer, while
+    authentication and queries go through the async ORM, so requests
+    waiting on the database do not hold a worker thread.
+    `prefetch_related` has to cover every relation the serializer
+    reads, lazy queries are not allowed in async code.
+    """
+
+    viewset_class = None
+    action = "list"
+    serializer_class = None
+    prefetch_related = ()
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            data = await self.get_data(request, *args, **kwargs)
+        except APIException as error:
+            return api_error_response(error)
+        return JsonResponse(data, safe=False)
+
+    async def get_data(self, request, *args, **kwargs):
+        authenticated = await AsyncJWTAuthentication().aauthenticate(request)
+        if authenticated is None:
+            raise NotAuthenticated()
+
+        api_request = Request(request)
+        api_request.user = authenticated[0]
+        viewset = self.viewset_class(
+            request=api_request,
+            action=self.action,
+            args=args,
+            kwargs=kwargs,
+            format_kwarg=None,
+        )
+        queryset = await sync_to_async(self.get_queryset)(
+            viewset, api_request
+        )
+
+        if self.action == "retrieve":
+            try:
+                instance = await queryset.aget(pk=kwargs["pk"])
+            except queryset.model.DoesNotExist:
+                raise NotFound()
+            return self.get_serializer(viewset, instance).data
+
+        paginator = viewset.paginator
+        if paginator is None:
+            instances = await self.fetch(queryset)
+            return self.get_serializer(viewset, instances, many=True).data
+
+        # The paginator slices and evaluates the queryset itself, the
+        # async ORM of Django 4.2 runs queries the same way
+        page = await sync_to_async(paginator.paginate_queryset)(
+            queryset, api_request, viewset
+        )
+        serializer = self.get_serializer(viewset, page, many=True)
+        return paginator.get_paginated_response(serializer.data).data
+
+    def get_queryset(self, viewset, api_request):
+        """
+        The permission and throttle checks and the filters may touch the
+        cache and the database synchronously, they run in a thread
+        """
+        viewset.check_permissions(api_request)
+        viewset.check_throttles(api_request)
+        return viewset.filter_queryset(
+            viewset.get_queryset()
+        ).prefetch_related(*self.prefetch_related)
+
+    def get_serializer(self, viewset, *args, **kwargs):
+        if self.serializer_class is None:
+            return viewset.get_serializer(*args, **kwargs)
+        kwargs["context"] = viewset.get_serializer_context()
+        return self.serializer_class(*args, **kwargs)
+
+    @staticmethod
+    async def fetch(queryset):
+        if queryset._prefetch_related_lookups:
+            # aiterator() does not prefetch before Django 5.0
+            return [instance async for instance in queryset]
+        return [instance async for instance in queryset.aiterator()]
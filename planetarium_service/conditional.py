@@ -0,0 +1,130 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+MODEL_VERSION_KEY = "catalog:model-version:{}"
+
+
+def model_version_key(model):
+    return MODEL_VERSION_KEY.format(model._meta.label_lower)
+
+
+def _stamp(models):
+    now = time.time_ns()
+    cache.set_many({model_version_key(model): now for model in models}, None)
+
+
+def bump_model_versions(*models):
+    """
+    Stamp the given models as modified now, and again once the current
+    transaction commits, so responses built from uncommitted rows are
+    never served under the new version
+    """
+    _stamp(models)
+    transaction.on_commit(lambda: _stamp(models))
+
+
+def model_versions(models):
+    """
+    Return the version stamps (modification times in nanoseconds) of
+    the given models. Models without a stamp yet are stamped now.
+    """
+    keys = [model_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _version_bumper(model):
+    def bump(sender, **kwargs):
+        bump_model_versions(model)
+
+    return bump
+
+
+def track_model_versions(*models):
+    """
+    Bump the version of each model on save, delete and changes of its
+    many-to-many relations. Bulk operations have to bump it themselves.
+    """
+    for model in models:
+        bump = _version_bumper(model)
+        uid = f"track_model_versions:{model._meta.label_lower}"
+        post_save.connect(bump, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(bump, sender=model, weak=False, dispatch_uid=uid)
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(
+                bump,
+                sender=field.remote_field.through,
+                weak=False,
+                dispatch_uid=uid,
+            )
+
+
+class ConditionalGetMixin:
+    """
+    Answer requests carrying `If-None-Match` or `If-Modified-Since` with
+    304 Not Modified when none of `conditional_models` changed, before
+    the queryset is evaluated. Last-Modified is only sent once its second
+    is over. Views wrap their read actions with
+    `conditional_response`.
+    """
+
+    conditional_models = ()
+    cache_max_age = None
+
+    def get_cache_max_age(self):
+        if self.cache_max_age is None:
+            return settings.CATALOG_CACHE_MAX_AGE
+        return self.cache_max_age
+
+    def get_validators(self, request):
+        """Return the ETag and Last-Modified timestamp of the response"""
+        versions = model_versions(self.conditional_models)
+        fingerprint = ":".join(
+            [
+                *map(str, versions),
+                request.build_absolute_uri(),
+                request.accepted_media_type or "",
+            ]
+        )
+        etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+        return etag, max(versions) // 10 ** 9
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if last_modified >= int(time.time()):
+            # Changes later in the same second would keep this one-second
+            # Last-Modified, so only the ETag validates the response
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code not in (200, 304):
+            return response
+
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=self.get_cache_max_age(),
+            must_revalidate=True,
+        )
+        patch_vary_headers(response, ("Authorization",))
+        return response
@@ -0,0 +1,157 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Names given by shows.storage.ContentAddressedStorage never change
+HASHED_NAME = re.compile(r"^[0-9a-f]{64}\.\w+$")
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(path, stat):
+    """Strong ETag, the content hash of hashed names"""
+    name = os.path.basename(path)
+    if HASHED_NAME.match(name):
+        return f'"{os.path.splitext(name)[0]}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def requested_range(request, size, etag, last_modified):
+    """
+    Return the (start, end) bytes of a single range request, None to
+    send the whole file, or raise ValueError when it is unsatisfiable
+    """
+    match = RANGE.match(request.headers.get("Range", "").replace(" ", ""))
+    if match is None:
+        # Missing, malformed and multiple ranges get the whole file
+        return None
+
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        if_range_date = parse_http_date_safe(if_range)
+        if if_range_date is None or if_range_date < last_modified:
+            return None
+
+    first, last = match.groups()
+    if first and last and int(last) < int(first):
+        # Invalid, not unsatisfiable, the range is ignored
+        return None
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    elif last:
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        return None
+    if start >= size:
+        raise ValueError(f"Range not satisfiable for {size} bytes")
+    return start, end
+
+
+def read_range(path, start, end):
+    with open(path, "rb") as media_file:
+        media_file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = media_file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def offload(name, path, content_type):
+    """
+    Empty response telling the web server which file to send, or None
+    when the bytes are sent by the worker
+    """
+    if settings.MEDIA_SENDFILE == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = (
+            f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX}{quote(name)}"
+        )
+        return response
+    if settings.MEDIA_SENDFILE == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = path
+        return response
+    return None
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a file of MEDIA_ROOT with range requests and conditional
+    GETs. With MEDIA_SENDFILE, the web server sends the bytes and
+    handles ranges itself.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404()
+    if not os.path.isfile(full_path):
+        raise Http404()
+
+    etag = file_etag(full_path, stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+    if response is None:
+        response = offload(path, full_path, content_type)
+    if response is None:
+        try:
+            byte_range = requested_range(
+                request, stat.st_size, etag, last_modified
+            )
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+        if byte_range is None:
+            response = FileResponse(
+                open(full_path, "rb"), content_type=content_type
+            )
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                read_range(full_path, start, end),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Length"] = end - start + 1
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        if encoding:
+            response["Content-Encoding"] = encoding
+        response["Accept-Ranges"] = "bytes"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    if HASHED_NAME.match(os.path.basename(full_path)):
+        patch_cache_control(
+            response, public=True, max_age=60 * 60 * 24 * 365, immutable=True
+        )
+    else:
+        patch_cache_control(
+            response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE
+        )
+    return response
@@ -98,6 +98,25 @@ DATABASES = {
     }
 }
 
+# Version stamps, cached lists and snapshots and the authentication
+# markers are written by the web processes and the management command
+# workers, so every process must share the cache, and they are read on
+# most requests, so it must not cost database queries: Redis, set with
+# CACHE_LOCATION=redis://<host>:6379. Another shared backend can be set
+# with CACHE_BACKEND, a local memory cache is only fit for one process.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.redis.RedisCache"
+        ),
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION", "redis://localhost:6379"
+        ),
+    }
+}
+
+TEST_RUNNER = "planetarium_service.test_runner.PlanetariumTestRunner"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -143,6 +162,14 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = "/vol/web/media"  # For Docker
 # MEDIA_ROOT = BASE_DIR / "media"  # For local development
 
+# Seconds media files may be cached, content hashed names are cached
+# for a year. With MEDIA_SENDFILE "x-accel-redirect" (nginx, internal
+# location at MEDIA_ACCEL_REDIRECT_PREFIX aliasing MEDIA_ROOT) or
+# "x-sendfile" (Apache, lighttpd) the web server sends the files.
+MEDIA_CACHE_MAX_AGE = 60 * 60
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE")
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -151,7 +178,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
@@ -177,4 +204,62 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),  # default = 5 min
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),  # default = 1 day
     "ROTATE_REFRESH_TOKENS": True,  # will return also new refresh token
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.PrincipalTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.serializers.PrincipalTokenRefreshSerializer"
+    ),
 }
+
+# Seconds the is_staff and is_active fields of a JWT request user are
+# cached. Saving or deleting a user drops them, the timeout bounds changes
+# made by queryset updates. The claims are re-read from the database when
+# tokens are refreshed, so they are at most ACCESS_TOKEN_LIFETIME old.
+USER_CACHE_TIMEOUT = 60
+# Seconds a process reuses the change marker of a user it has read, so
+# saving a user reaches the tokens served by other processes this late
+USER_CHANGE_CHECK_INTERVAL = 5
+
+SEAT_HOLD_TTL = timedelta(minutes=10)
+# Holding places again refreshes their expiry up to this long after they
+# were first held, and a user holds this many places of a show session
+SEAT_HOLD_MAX_DURATION = timedelta(minutes=30)
+SEAT_HOLD_MAX_PLACES = 10
+
+# Seconds a cached show session list is served, bounds how long
+# expired seat holds are still counted in tickets_available
+SHOW_SESSION_LIST_CACHE_TIMEOUT = 30
+
+# Calendar keys change with every relevant write, the timeout only
+# bounds how long unused months are kept
+SHOW_SESSION_CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Seconds clients and reverse proxies may reuse catalog responses
+# before revalidating them with If-None-Match / If-Modified-Since
+CATALOG_CACHE_MAX_AGE = 60
+
+# The catalog snapshot lists the show sessions of this many days from
+# today. Snapshot keys change with the catalog and the day, the timeout
+# only bounds how long unused snapshots are kept.
+CATALOG_SNAPSHOT_DAYS = 60
+CATALOG_SNAPSHOT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Live seat events, served by the ASGI application. The local broker
+# only reaches watchers of the process that committed the change, the
+# PostgreSQL one (LISTEN/NOTIFY) reaches every process.
+SEAT_EVENTS_BROKER = os.environ.get(
+    "SEAT_EVENTS_BROKER", "reservations.live.LocalSeatEventBroker"
+)
+SEAT_EVENTS_HEARTBEAT = 15
+SEAT_EVENTS_MAX_AGE = 60 * 5
+SEAT_EVENTS_RETRY = 3
+SEAT_EVENTS_QUEUE_SIZE = 100
+
+# Widths of the resized variants of uploaded astronomy show images,
+# processed by a pool of ASTRONOMY_SHOW_IMAGE_WORKERS threads
+ASTRONOMY_SHOW_IMAGE_WIDTHS = (320, 640, 1280)
+ASTRONOMY_SHOW_IMAGE_QUALITY = 80
+ASTRONOMY_SHOW_IMAGE_WORKERS = 2
+# Larger uploads are rejected before they are decoded
+ASTRONOMY_SHOW_IMAGE_MAX_SIZE = 10 * 1024 * 1024
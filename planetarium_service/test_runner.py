@@ -0,0 +1,22 @@
+from django.core.cache import cache
+from django.test.runner import DiscoverRunner
+
+
+class PlanetariumTestRunner(DiscoverRunner):
+    """
+    Runs the tests against the configured cache, cleared first so the
+    version stamps and cached lists of previous runs are not read.
+    Tests tagged "benchmark" only run when asked for with --tag
+    benchmark.
+    """
+
+    def __init__(self, *args, tags=None, exclude_tags=None, **kwargs):
+        if not tags:
+            exclude_tags = {*(exclude_tags or ()), "benchmark"}
+        super().__init__(
+            *args, tags=tags, exclude_tags=exclude_tags, **kwargs
+        )
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        cache.clear()
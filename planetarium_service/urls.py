@@ -15,7 +15,6 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import (
@@ -23,6 +22,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
     SpectacularRedocView
 )
+from planetarium_service.media import serve_media
+from reservations.views import CatalogSnapshotView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -36,6 +37,11 @@ urlpatterns = [
          include("reservations.urls", namespace="reservations"),
          ),
     path("api/user/", include("user.urls", namespace="user")),
+    path(
+        "api/catalog/snapshot/",
+        CatalogSnapshotView.as_view(),
+        name="catalog-snapshot",
+    ),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/doc/swagger/",
@@ -48,4 +54,9 @@ urlpatterns = [
         name="redoc",
     ),
     path("__debug__/", include("debug_toolbar.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        f"{settings.MEDIA_URL.lstrip('/')}<path:path>",
+        serve_media,
+        name="media",
+    ),
+]
@@ -1,6 +1,14 @@
 from django.contrib import admin
-from reservations.models import Reservation, Ticket, ShowSession
+from reservations.models import (
+    Reservation,
+    ReservationIntake,
+    SeatHold,
+    ShowSession,
+    Ticket,
+)
 
 admin.site.register(ShowSession)
 admin.site.register(Reservation)
 admin.site.register(Ticket)
+admin.site.register(SeatHold)
+admin.site.register(ReservationIntake)
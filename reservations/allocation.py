@@ -0,0 +1,168 @@
+from bisect import bisect_right
+from django.core.cache import cache
+from django.db import transaction
+from reservations.models import SeatHold, Ticket
+
+SEAT_INDEX_CACHE_KEY = "reservations:seat-index:{}"
+
+
+class FreeSeatIndex:
+    """
+    Free places of a show session stored as sorted, inclusive
+    (first seat, last seat) intervals per row. The longest interval of
+    every row is kept aside, so rows that cannot fit a block are skipped
+    without looking at their seats.
+    """
+
+    def __init__(self, rows, seats_in_row, taken_places=(), version=None):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.version = version
+        self.intervals = {
+            row: [(1, seats_in_row)] for row in range(1, rows + 1)
+        }
+        self.longest = {row: seats_in_row for row in self.intervals}
+        self.take(taken_places)
+
+    @classmethod
+    def build(cls, show_session, version=None):
+        """Build the index of a show session from a single query"""
+        taken_places = (
+            Ticket.objects.filter(show_session=show_session)
+            .order_by()
+            .values_list("row", "seat")
+            .union(
+                SeatHold.objects.active()
+                .filter(show_session=show_session)
+                .order_by()
+                .values_list("row", "seat")
+            )
+        )
+        return cls(
+            show_session.planetarium_dome.rows,
+            show_session.planetarium_dome.seats_in_row,
+            taken_places,
+            version,
+        )
+
+    @classmethod
+    def for_show_session(cls, show_session, version):
+        """
+        Return the cached index of a show session, rebuilding it when
+        the cached copy was built for another `version`. The version only
+        follows the sold tickets, changes of the holds and of the places
+        of tickets drop the cached index with invalidate().
+        """
+        index = cache.get(SEAT_INDEX_CACHE_KEY.format(show_session.id))
+        if index is None or index.version != version:
+            index = cls.build(show_session, version)
+            index.save(show_session.id)
+        return index
+
+    def save(self, show_session_id):
+        cache.set(SEAT_INDEX_CACHE_KEY.format(show_session_id), self)
+
+    @staticmethod
+    def invalidate(show_session_ids):
+        """Drop the cached indexes once the transaction commits"""
+        keys = [
+            SEAT_INDEX_CACHE_KEY.format(show_session_id)
+            for show_session_id in show_session_ids
+        ]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    def take(self, places):
+        """Remove the given (row, seat) places from the free intervals"""
+        for row, seat in places:
+            intervals = self.intervals.get(row)
+            if not intervals:
+                continue
+            position = bisect_right(intervals, (seat, self.seats_in_row)) - 1
+            if position < 0:
+                continue
+            first, last = intervals[position]
+            if not first <= seat <= last:
+                continue
+            intervals[position:position + 1] = [
+                interval
+                for interval in ((first, seat - 1), (seat + 1, last))
+                if interval[0] <= interval[1]
+            ]
+            if last - first + 1 == self.longest[row]:
+                self.longest[row] = max(
+                    (end - start + 1 for start, end in intervals), default=0
+                )
+
+    def rows_by_preference(self, preferred_rows=()):
+        """
+        Preferred rows in the given order first, then the other rows
+        from the nearest to the preferred ones (or to the middle row)
+        """
+        preferred_rows = [
+            row
+            for row in dict.fromkeys(preferred_rows)
+            if row in self.intervals
+        ]
+        anchors = preferred_rows or [(self.rows + 1) // 2]
+        other_rows = sorted(
+            (row for row in self.intervals if row not in preferred_rows),
+            key=lambda row: (
+                min(abs(row - anchor) for anchor in anchors),
+                row,
+            ),
+        )
+        return preferred_rows + other_rows
+
+    def centered_block(self, first, last, count):
+        """
+        First seat of `count` seats within the interval, as near to the
+        center of the row as the interval allows
+        """
+        start = (self.seats_in_row - count) // 2 + 1
+        return min(max(start, first), last - count + 1)
+
+    def find_block(self, count, preferred_rows=()):
+        """Return `count` adjacent places or None when no row fits them"""
+        for row in self.rows_by_preference(preferred_rows):
+            if self.longest[row] < count:
+                continue
+            candidates = [
+                self.centered_block(first, last, count)
+                for first, last in self.intervals[row]
+                if last - first + 1 >= count
+            ]
+            center = (self.seats_in_row - count) / 2 + 1
+            start = min(candidates, key=lambda seat: abs(seat - center))
+            return [(row, seat) for seat in range(start, start + count)]
+        return None
+
+    def find_split(self, count, preferred_rows=()):
+        """
+        Return `count` places split into the largest free blocks of the
+        rows nearest to the preferred ones, or None when there are not
+        enough free places
+        """
+        places = []
+        for row in self.rows_by_preference(preferred_rows):
+            for first, last in sorted(
+                self.intervals[row],
+                key=lambda interval: interval[0] - interval[1],
+            ):
+                size = min(count - len(places), last - first + 1)
+                start = self.centered_block(first, last, size)
+                places.extend(
+                    (row, seat) for seat in range(start, start + size)
+                )
+                if len(places) == count:
+                    return places
+        return None
+
+    def allocate(self, count, preferred_rows=(), allow_split=True):
+        """
+        Choose `count` places, together if possible, and fall back to
+        the nearest split allocation when `allow_split` is set
+        """
+        places = self.find_block(count, preferred_rows)
+        if places is None and allow_split:
+            places = self.find_split(count, preferred_rows)
+        return places
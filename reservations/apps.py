@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ReservationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reservations"
+
+    def ready(self):
+        from planetarium_service.conditional import track_model_versions
+        from reservations import signals  # noqa: F401
+        from reservations.models import ShowSession, Ticket
+
+        track_model_versions(ShowSession, Ticket)
@@ -0,0 +1,140 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from reservations.models import ShowSession
+
+SHOW_SESSION_LIST_PREFIX = "reservations:show-session-list"
+CATALOG_VERSION_KEY = f"{SHOW_SESSION_LIST_PREFIX}:catalog-version"
+HITS_KEY = f"{SHOW_SESSION_LIST_PREFIX}:hits"
+MISSES_KEY = f"{SHOW_SESSION_LIST_PREFIX}:misses"
+SHOW_SESSION_CALENDAR_PREFIX = "reservations:show-session-calendar"
+
+
+def _filter_version_key(date, astronomy_show_id):
+    return (
+        f"{SHOW_SESSION_LIST_PREFIX}:version:"
+        f"{date.isoformat() if date else '-'}:{astronomy_show_id or '-'}"
+    )
+
+
+def _calendar_version_key(month, astronomy_show_id):
+    return (
+        f"{SHOW_SESSION_CALENDAR_PREFIX}:version:"
+        f"{month:%Y-%m}:{astronomy_show_id or '-'}"
+    )
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # A missing version is replaced with a value no cached list
+        # could have been stored under
+        cache.set(key, time.time_ns(), None)
+
+
+def _count(key):
+    if not cache.add(key, 1, None):
+        _bump(key)
+
+
+def show_session_list_key(date, astronomy_show_id, variant):
+    """
+    Cache key of a show session list for the normalized filters and
+    a `variant` string (host, range and page of the list). It changes
+    whenever the catalog or the sessions matching the filters change,
+    so stale lists are never read again.
+    """
+    version_key = _filter_version_key(date, astronomy_show_id)
+    versions = cache.get_many([CATALOG_VERSION_KEY, version_key])
+    return (
+        f"{version_key}:{versions.get(CATALOG_VERSION_KEY, 0)}:"
+        f"{versions.get(version_key, 0)}:{variant}"
+    )
+
+
+def get_show_session_list(key):
+    data = cache.get(key)
+    _count(MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+def set_show_session_list(key, data):
+    cache.set(key, data, settings.SHOW_SESSION_LIST_CACHE_TIMEOUT)
+
+
+def show_session_calendar_key(month, astronomy_show_id):
+    """
+    Cache key of a month calendar, it changes with the catalog and
+    with the show sessions of the month
+    """
+    version_key = _calendar_version_key(month, astronomy_show_id)
+    versions = cache.get_many([CATALOG_VERSION_KEY, version_key])
+    return (
+        f"{version_key}:{versions.get(CATALOG_VERSION_KEY, 0)}:"
+        f"{versions.get(version_key, 0)}"
+    )
+
+
+def get_show_session_calendar(key):
+    return cache.get(key)
+
+
+def set_show_session_calendar(key, data):
+    cache.set(key, data, settings.SHOW_SESSION_CALENDAR_CACHE_TIMEOUT)
+
+
+def invalidate_show_session_lists(show_sessions):
+    """
+    Invalidate only the cached lists that can contain the given show
+    sessions: unfiltered, filtered by their date, by their astronomy
+    show and by both. Calendars of their months are invalidated too.
+    """
+    version_keys = set()
+    for show_session in show_sessions:
+        date = show_session.show_time.date()
+        for astronomy_show_id in (None, show_session.astronomy_show_id):
+            version_keys.update(
+                (
+                    _filter_version_key(None, astronomy_show_id),
+                    _filter_version_key(date, astronomy_show_id),
+                    _calendar_version_key(
+                        date.replace(day=1), astronomy_show_id
+                    ),
+                )
+            )
+    for version_key in version_keys:
+        _bump(version_key)
+
+
+def invalidate_show_session_lists_by_id(show_session_ids, known=()):
+    """
+    invalidate_show_session_lists of show sessions given by id, fetched
+    with one query unless they are among the `known` instances
+    """
+    show_sessions = {
+        show_session.id: show_session
+        for show_session in known
+        if show_session.id in show_session_ids
+    }
+    missing_ids = set(show_session_ids) - set(show_sessions)
+    if missing_ids:
+        show_sessions.update(
+            (show_session.id, show_session)
+            for show_session in ShowSession.objects.filter(
+                id__in=missing_ids
+            ).only("id", "show_time", "astronomy_show_id")
+        )
+    invalidate_show_session_lists(show_sessions.values())
+
+
+def invalidate_all_show_session_lists():
+    _bump(CATALOG_VERSION_KEY)
+
+
+def show_session_list_cache_stats():
+    stats = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        "hits": stats.get(HITS_KEY, 0),
+        "misses": stats.get(MISSES_KEY, 0),
+    }
@@ -0,0 +1,20 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PlacesConflict(APIException):
+    """Raised when requested places were taken by a concurrent booking"""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the places were taken by other reservations."
+    default_code = "conflict"
+
+    def __init__(self, places):
+        super().__init__()
+        self.detail = {
+            "detail": self.detail,
+            "conflicts": [
+                {"show_session": show_session_id, "row": row, "seat": seat}
+                for show_session_id, row, seat in places
+            ],
+        }
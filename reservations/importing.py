@@ -0,0 +1,457 @@
+import csv
+import json
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from domes.models import PlanetariumDome
+from planetarium_service.conditional import bump_model_versions
+from shows.models import AstronomyShow, ShowTheme
+from shows.search import update_search_vectors
+from reservations.caching import invalidate_all_show_session_lists
+from reservations.models import Reservation, ShowSession, Ticket
+
+READ_SIZE = 64 * 1024
+# Imported in this order, records only refer to records of earlier types
+RECORD_TYPES = (
+    "show_theme",
+    "planetarium_dome",
+    "astronomy_show",
+    "show_session",
+    "ticket",
+)
+
+
+class InvalidRecord(ValueError):
+    def __init__(self, position, message):
+        super().__init__(message)
+        self.position = position
+
+
+def read_json(stream):
+    """
+    Yield (index, object) of a JSON array read chunk by chunk, without
+    holding the whole document in memory
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    index = 0
+    opened = False
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+
+        decoded = None
+        if position < len(buffer):
+            if not opened:
+                if buffer[position] != "[":
+                    raise InvalidRecord(0, "Expected a JSON array")
+                opened = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                decoded = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                if eof:
+                    raise InvalidRecord(index + 1, str(error))
+
+        if decoded is None:
+            if eof:
+                raise InvalidRecord(index + 1, "Unexpected end of JSON")
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        index += 1
+        record, position = decoded
+        yield index, record
+
+
+def read_ndjson(stream):
+    """Yield (line number, object) of newline delimited JSON"""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as error:
+            raise InvalidRecord(line_number, str(error))
+
+
+def read_csv(stream):
+    """
+    Yield (line number, row) of a CSV file with a header, empty cells
+    are left out and show themes are separated by "|"
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        record = {
+            name: value
+            for name, value in row.items()
+            if name and value not in (None, "")
+        }
+        if "show_themes" in record:
+            record["show_themes"] = record["show_themes"].split("|")
+        yield reader.line_num, record
+
+
+READERS = {
+    "json": read_json,
+    "ndjson": read_ndjson,
+    "csv": read_csv,
+}
+
+
+def parse_show_time(value):
+    show_time = parse_datetime(value)
+    if show_time is None:
+        raise ValueError(value)
+    if settings.USE_TZ and timezone.is_naive(show_time):
+        return timezone.make_aware(show_time)
+    if not settings.USE_TZ and timezone.is_aware(show_time):
+        return timezone.make_naive(show_time)
+    return show_time
+
+
+def required(position, record, name, parse=str):
+    """Return the field of the record converted by `parse`"""
+    value = record.get(name)
+    if value in (None, ""):
+        raise InvalidRecord(position, f"{name} is required")
+    try:
+        return parse(value)
+    except (TypeError, ValueError):
+        raise InvalidRecord(position, f"Invalid {name}: {value!r}")
+
+
+class PlanetariumImporter:
+    """
+    Imports catalog and schedule records in batches of `batch_size`,
+    each batch in one transaction. Foreign keys are given by natural
+    keys: theme names, show titles, dome names, (show title, dome name,
+    show time) for show sessions and emails for users. Existing themes,
+    show sessions and tickets are kept, domes and shows are updated, so
+    an import can be run again after a failure.
+    """
+
+    def __init__(self, batch_size=5000, default_type=None):
+        self.batch_size = batch_size
+        self.default_type = default_type
+        self.pending = defaultdict(list)
+        self.pending_count = 0
+        self.counts = defaultdict(int)
+        self.skipped_tickets = 0
+        # Natural key to id, or to the instance, of the records seen
+        self.show_themes = {}
+        self.planetarium_domes = {}
+        self.astronomy_shows = {}
+        self.show_sessions = {}
+        self.users = {}
+        self.reservations = {}
+
+    def add(self, position, record):
+        if not isinstance(record, dict):
+            raise InvalidRecord(position, "Expected an object")
+        record_type = record.get("type", self.default_type)
+        if record_type not in RECORD_TYPES:
+            raise InvalidRecord(
+                position, f"Unknown record type: {record_type!r}"
+            )
+        self.pending[record_type].append((position, record))
+        self.pending_count += 1
+        if self.pending_count >= self.batch_size:
+            self.flush()
+
+    @transaction.atomic
+    def flush(self):
+        """Import the pending records of every type"""
+        for record_type in RECORD_TYPES:
+            records = self.pending.pop(record_type, None)
+            if records:
+                getattr(self, f"import_{record_type}s")(records)
+                self.counts[record_type] += len(records)
+        self.pending_count = 0
+
+        bump_model_versions(
+            ShowTheme, PlanetariumDome, AstronomyShow, ShowSession, Ticket
+        )
+        invalidate_all_show_session_lists()
+
+    def resolve_show_themes(self, names):
+        """Cache the ids of the show themes, creating the missing ones"""
+        missing = set(names) - self.show_themes.keys()
+        if missing:
+            ShowTheme.objects.bulk_create(
+                [ShowTheme(name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            self.show_themes.update(
+                ShowTheme.objects.filter(name__in=missing).values_list(
+                    "name", "id"
+                )
+            )
+
+    def resolve(self, cache, queryset, field_name, keys, positions):
+        """Cache the existing instances of the natural keys, in one query"""
+        missing = {key for key in keys if key not in cache}
+        if missing:
+            cache.update(
+                (getattr(instance, field_name), instance)
+                for instance in queryset.filter(
+                    **{f"{field_name}__in": missing}
+                )
+            )
+        for position, key in zip(positions, keys):
+            if key not in cache:
+                raise InvalidRecord(
+                    position,
+                    f"Unknown {queryset.model._meta.verbose_name}: {key}",
+                )
+
+    def import_show_themes(self, records):
+        self.resolve_show_themes(
+            required(position, record, "name") for position, record in records
+        )
+
+    def import_planetarium_domes(self, records):
+        planetarium_domes = {}
+        for position, record in records:
+            planetarium_dome = PlanetariumDome(
+                name=required(position, record, "name"),
+                rows=required(position, record, "rows", int),
+                seats_in_row=required(position, record, "seats_in_row", int),
+            )
+            planetarium_domes[planetarium_dome.name] = planetarium_dome
+
+        PlanetariumDome.objects.bulk_create(
+            planetarium_domes.values(),
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["rows", "seats_in_row"],
+        )
+        self.planetarium_domes.update(
+            (planetarium_dome.name, planetarium_dome)
+            for planetarium_dome in PlanetariumDome.objects.filter(
+                name__in=planetarium_domes
+            )
+        )
+
+    def import_astronomy_shows(self, records):
+        astronomy_shows = {}
+        show_themes = {}
+        for position, record in records:
+            title = required(position, record, "title")
+            astronomy_shows[title] = AstronomyShow(
+                title=title, description=record.get("description", "")
+            )
+            names = record.get("show_themes", [])
+            if not isinstance(names, list):
+                raise InvalidRecord(position, "show_themes must be a list")
+            show_themes[title] = [str(name) for name in names]
+
+        AstronomyShow.objects.bulk_create(
+            astronomy_shows.values(),
+            update_conflicts=True,
+            unique_fields=["title"],
+            update_fields=["description"],
+        )
+        self.astronomy_shows.update(
+            (astronomy_show.title, astronomy_show)
+            for astronomy_show in AstronomyShow.objects.filter(
+                title__in=astronomy_shows
+            ).only("id", "title")
+        )
+
+        self.resolve_show_themes(
+            name for names in show_themes.values() for name in names
+        )
+        through = AstronomyShow.show_themes.through
+        through.objects.bulk_create(
+            [
+                through(
+                    astronomyshow_id=self.astronomy_shows[title].id,
+                    showtheme_id=self.show_themes[name],
+                )
+                for title, names in show_themes.items()
+                for name in names
+            ],
+            ignore_conflicts=True,
+        )
+        update_search_vectors(
+            AstronomyShow.objects.filter(
+                id__in=[
+                    self.astronomy_shows[title].id for title in show_themes
+                ]
+            )
+        )
+
+    def show_session_keys(self, records):
+        """Return the (show id, dome, show time) the records refer to"""
+        titles = [
+            required(position, record, "astronomy_show")
+            for position, record in records
+        ]
+        dome_names = [
+            required(position, record, "planetarium_dome")
+            for position, record in records
+        ]
+        positions = [position for position, _ in records]
+        self.resolve(
+            self.astronomy_shows,
+            AstronomyShow.objects.only("id", "title"),
+            "title",
+            titles,
+            positions,
+        )
+        self.resolve(
+            self.planetarium_domes,
+            PlanetariumDome.objects.all(),
+            "name",
+            dome_names,
+            positions,
+        )
+        return [
+            (
+                self.astronomy_shows[title].id,
+                self.planetarium_domes[dome_name],
+                required(position, record, "show_time", parse_show_time),
+            )
+            for (position, record), title, dome_name in zip(
+                records, titles, dome_names
+            )
+        ]
+
+    def find_show_sessions(self, keys):
+        """Cache the ids of the existing show sessions of the keys"""
+        missing = {
+            (show_id, planetarium_dome.id, show_time)
+            for show_id, planetarium_dome, show_time in keys
+        } - self.show_sessions.keys()
+        if not missing:
+            return
+        existing = ShowSession.objects.filter(
+            astronomy_show_id__in={key[0] for key in missing},
+            planetarium_dome_id__in={key[1] for key in missing},
+            show_time__in={key[2] for key in missing},
+        ).values_list(
+            "astronomy_show_id", "planetarium_dome_id", "show_time", "id"
+        )
+        for show_id, planetarium_dome_id, show_time, show_session_id in (
+            existing
+        ):
+            key = (show_id, planetarium_dome_id, show_time)
+            if key in missing:
+                self.show_sessions[key] = show_session_id
+
+    def import_show_sessions(self, records):
+        keys = self.show_session_keys(records)
+        self.find_show_sessions(keys)
+
+        new_show_sessions = {}
+        for show_id, planetarium_dome, show_time in keys:
+            key = (show_id, planetarium_dome.id, show_time)
+            if key not in self.show_sessions:
+                new_show_sessions[key] = ShowSession(
+                    astronomy_show_id=show_id,
+                    planetarium_dome_id=planetarium_dome.id,
+                    show_time=show_time,
+                )
+        ShowSession.objects.bulk_create(new_show_sessions.values())
+        self.show_sessions.update(
+            (key, show_session.id)
+            for key, show_session in new_show_sessions.items()
+        )
+
+    def import_tickets(self, records):
+        keys = self.show_session_keys(records)
+        self.find_show_sessions(keys)
+        emails = [
+            required(position, record, "user") for position, record in records
+        ]
+        self.resolve(
+            self.users,
+            get_user_model().objects.only("id", "email"),
+            "email",
+            emails,
+            [position for position, _ in records],
+        )
+
+        places = {}
+        for (position, record), key, email in zip(records, keys, emails):
+            show_id, planetarium_dome, show_time = key
+            show_session_id = self.show_sessions.get(
+                (show_id, planetarium_dome.id, show_time)
+            )
+            if show_session_id is None:
+                raise InvalidRecord(position, "Unknown show session")
+            row = required(position, record, "row", int)
+            seat = required(position, record, "seat", int)
+            try:
+                Ticket.validate_ticket(
+                    row, seat, planetarium_dome, ValidationError
+                )
+            except ValidationError as error:
+                raise InvalidRecord(position, " ".join(error.messages))
+
+            # Tickets without a reservation reference get their own one
+            reservation = record.get("reservation")
+            places.setdefault(
+                (show_session_id, row, seat),
+                (
+                    self.users[email].id,
+                    position if reservation is None else str(reservation),
+                ),
+            )
+
+        taken = set(
+            Ticket.objects.filter(
+                show_session_id__in={place[0] for place in places}
+            ).values_list("show_session_id", "row", "seat")
+        )
+        new_places = {
+            place: reservation_key
+            for place, reservation_key in places.items()
+            if place not in taken
+        }
+        self.skipped_tickets += len(records) - len(new_places)
+
+        reservations = {
+            reservation_key: self.reservations.get(reservation_key)
+            for reservation_key in new_places.values()
+        }
+        new_reservations = {
+            reservation_key: Reservation(user_id=reservation_key[0])
+            for reservation_key, reservation_id in reservations.items()
+            if reservation_id is None
+        }
+        Reservation.objects.bulk_create(new_reservations.values())
+        for reservation_key, reservation in new_reservations.items():
+            reservations[reservation_key] = reservation.id
+            if isinstance(reservation_key[1], str):
+                self.reservations[reservation_key] = reservation.id
+
+        # Ticket.save() validates every ticket, they were validated above
+        Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    show_session_id=show_session_id,
+                    reservation_id=reservations[reservation_key],
+                    row=row,
+                    seat=seat,
+                )
+                for (show_session_id, row, seat), reservation_key in (
+                    new_places.items()
+                )
+            ],
+            ignore_conflicts=True,
+        )
+        ShowSession.recount_tickets_sold({place[0] for place in places})
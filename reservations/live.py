@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+import psycopg2
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+from reservations.models import SeatHold, Ticket
+
+logger = logging.getLogger(__name__)
+
+SEAT_EVENTS_CHANNEL = "reservations_seat_events"
+# Places per NOTIFY payload, keeps payloads far below the 8000 bytes limit
+NOTIFY_CHUNK_SIZE = 500
+# Put into the queue of a watcher that fell behind, instead of the
+# events it missed
+RESET = {"reset": True}
+
+
+class LocalSeatEventBroker:
+    """
+    In-process fan-out of seat events to the asyncio queues of
+    watchers. Events are delivered once the publishing transaction
+    commits, and only to watchers of the same process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(dict)
+
+    def subscribe(self, show_session_id):
+        """Return a queue receiving the events of the show session"""
+        queue = asyncio.Queue(maxsize=settings.SEAT_EVENTS_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[show_session_id][queue] = (
+                asyncio.get_running_loop()
+            )
+        return queue
+
+    def unsubscribe(self, show_session_id, queue):
+        with self.lock:
+            queues = self.subscribers.get(show_session_id, {})
+            queues.pop(queue, None)
+            if not queues:
+                self.subscribers.pop(show_session_id, None)
+
+    def publish(self, event):
+        transaction.on_commit(lambda: self.deliver(event))
+
+    def deliver(self, event):
+        """Hand the event to every watcher, from any thread"""
+        with self.lock:
+            queues = list(
+                self.subscribers.get(event["show_session"], {}).items()
+            )
+        for queue, loop in queues:
+            try:
+                loop.call_soon_threadsafe(self.put, queue, event)
+            except RuntimeError:
+                self.unsubscribe(event["show_session"], queue)
+
+    @staticmethod
+    def put(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESET)
+
+
+class PostgresSeatEventBroker(LocalSeatEventBroker):
+    """
+    Publishes events with NOTIFY, which PostgreSQL sends when the
+    transaction commits, so watchers of every process receive them.
+    Each process listens in one background thread and fans the events
+    out locally.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+        self.stopped = threading.Event()
+
+    def publish(self, event):
+        chunks = [
+            {
+                "show_session": event["show_session"],
+                "taken": event["taken"][start:start + NOTIFY_CHUNK_SIZE],
+                "released": event["released"][
+                    start:start + NOTIFY_CHUNK_SIZE
+                ],
+            }
+            for start in range(
+                0,
+                max(len(event["taken"]), len(event["released"]), 1),
+                NOTIFY_CHUNK_SIZE,
+            )
+        ]
+        with connection.cursor() as cursor:
+            for chunk in chunks:
+                cursor.execute(
+                    "SELECT pg_notify(%s, %s)",
+                    [SEAT_EVENTS_CHANNEL, json.dumps(chunk)],
+                )
+
+    def subscribe(self, show_session_id):
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(
+                    target=self.listen,
+                    args=(connection.get_connection_params(),),
+                    name="seat-events-listener",
+                    daemon=True,
+                )
+                self.listener.start()
+        return super().subscribe(show_session_id)
+
+    def stop(self):
+        """Stop the listener thread and close its connection"""
+        self.stopped.set()
+        if self.listener is not None:
+            self.listener.join()
+
+    def listen(self, connection_params):
+        while not self.stopped.is_set():
+            listener = None
+            try:
+                listener = psycopg2.connect(**connection_params)
+                listener.autocommit = True
+                with listener.cursor() as cursor:
+                    cursor.execute(f"LISTEN {SEAT_EVENTS_CHANNEL}")
+                while not self.stopped.is_set():
+                    select.select([listener], [], [], 1)
+                    listener.poll()
+                    while listener.notifies:
+                        notify = listener.notifies.pop(0)
+                        self.deliver(json.loads(notify.payload))
+            except psycopg2.Error:
+                logger.exception("Seat events listener lost its connection")
+                time.sleep(1)
+            finally:
+                if listener is not None:
+                    listener.close()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.SEAT_EVENTS_BROKER)()
+
+
+def publish_seat_changes(taken=(), released=()):
+    """
+    Publish (show_session_id, row, seat) places that were taken or
+    released, one event per show session
+    """
+    events = defaultdict(lambda: {"taken": [], "released": []})
+    for change, places in (("taken", taken), ("released", released)):
+        for show_session_id, row, seat in places:
+            events[show_session_id][change].append([row, seat])
+
+    broker = get_broker()
+    for show_session_id, event in events.items():
+        broker.publish({"show_session": show_session_id, **event})
+
+
+def taken_places(show_session_id):
+    """Places of the show session taken by tickets and active holds"""
+    return [
+        list(place)
+        for place in Ticket.objects.filter(show_session_id=show_session_id)
+        .order_by()
+        .values_list("row", "seat")
+        .union(
+            SeatHold.objects.active()
+            .filter(show_session_id=show_session_id)
+            .order_by()
+            .values_list("row", "seat")
+        )
+    ]
+
+
+def server_sent_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def seat_events(show_session_id):
+    """
+    Stream a snapshot of the taken places of the show session and then
+    the taken/released deltas, with keep-alive comments in between.
+    The stream ends after SEAT_EVENTS_MAX_AGE seconds and clients
+    reconnect to a fresh snapshot.
+    """
+    broker = get_broker()
+    queue = broker.subscribe(show_session_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SEAT_EVENTS_MAX_AGE
+    try:
+        yield f"retry: {settings.SEAT_EVENTS_RETRY * 1000}\n\n"
+        event = RESET
+        while True:
+            if event is RESET:
+                # Subscribed before the snapshot, so no delta is missed
+                places = await sync_to_async(taken_places)(show_session_id)
+                yield server_sent_event(
+                    "snapshot",
+                    {"show_session": show_session_id, "taken": places},
+                )
+            elif event is not None:
+                yield server_sent_event("seats", event)
+
+            timeout = min(
+                settings.SEAT_EVENTS_HEARTBEAT, deadline - loop.time()
+            )
+            if timeout <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                event = None
+                yield ": keep-alive\n\n"
+    finally:
+        broker.unsubscribe(show_session_id, queue)
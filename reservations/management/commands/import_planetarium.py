@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+from django.core.management import BaseCommand, CommandError
+from reservations.importing import (
+    READERS,
+    RECORD_TYPES,
+    InvalidRecord,
+    PlanetariumImporter,
+)
+
+EXTENSION_FORMATS = {
+    ".json": "json",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+}
+
+
+class Command(BaseCommand):
+    """
+    Django command to import themes, domes, shows, show sessions and
+    tickets from JSON, NDJSON or CSV. The input is streamed and written
+    in batches with bulk_create, without Model.save() and its signals.
+    Records have a "type" (one of RECORD_TYPES) and refer to each
+    other by natural keys, for example
+    {"type": "ticket", "astronomy_show": "Solar system",
+    "planetarium_dome": "Middle dome", "show_time": "2024-02-04T16:30",
+    "row": 3, "seat": 6, "user": "john@smith.com", "reservation": "42"}
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--type",
+            choices=RECORD_TYPES,
+            help="Type of the records without a type field",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of records written per transaction",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"]
+        if input_format is None:
+            input_format = EXTENSION_FORMATS.get(
+                os.path.splitext(path)[1].lower()
+            )
+        if input_format is None:
+            raise CommandError("Set the input format with --format")
+
+        importer = PlanetariumImporter(
+            batch_size=options["batch_size"], default_type=options["type"]
+        )
+        started = time.perf_counter()
+        stream = (
+            sys.stdin if path == "-"
+            else open(path, encoding="utf-8", newline="")
+        )
+        try:
+            for position, record in READERS[input_format](stream):
+                importer.add(position, record)
+            importer.flush()
+        except InvalidRecord as error:
+            raise CommandError(
+                f"{path}:{error.position}: {error}. Earlier batches were "
+                f"imported, the import can be run again once fixed."
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        rows = sum(importer.counts.values())
+        imported = ", ".join(
+            f"{importer.counts[record_type]} {record_type}"
+            for record_type in RECORD_TYPES
+            if importer.counts[record_type]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {rows} records in {elapsed:.1f} s "
+                f"({rows / max(elapsed, 1e-6):.0f} records/s): "
+                f"{imported or 'nothing'}, {importer.skipped_tickets} "
+                f"tickets already existed"
+            )
+        )
@@ -0,0 +1,127 @@
+import logging
+import time
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from reservations.models import ReservationIntake, ShowSession
+from reservations.serializers import ReservationSerializer
+
+PROCESSING_ERROR_MESSAGE = "The reservation request could not be processed."
+
+logger = logging.getLogger(__name__)
+
+
+def show_session_ids(payload):
+    """Return the sorted show session ids referenced by a queued payload"""
+    tickets = payload.get("tickets") if isinstance(payload, dict) else None
+    ids = set()
+    for ticket in tickets if isinstance(tickets, list) else []:
+        try:
+            ids.add(int(ticket.get("show_session")))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    return sorted(ids)
+
+
+class Command(BaseCommand):
+    """
+    Django command to process queued reservation requests. Requests are
+    claimed in batches with SKIP LOCKED, so several workers can run at
+    the same time, and every batch is booked in one transaction grouped
+    by show session.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of requests claimed and booked per transaction",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the queue is empty",
+        )
+        parser.add_argument(
+            "--idle-sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before polling an empty queue again",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.process_batch(options["batch_size"])
+            if processed:
+                self.stdout.write(
+                    f"Processed {processed} reservation requests"
+                )
+            elif options["once"]:
+                break
+            else:
+                time.sleep(options["idle_sleep"])
+
+    @staticmethod
+    @transaction.atomic
+    def process_batch(batch_size):
+        intakes = list(
+            ReservationIntake.objects.select_for_update(
+                skip_locked=True, of=("self",)
+            )
+            .select_related("user")
+            .filter(status=ReservationIntake.Status.PENDING)
+            .order_by("id")[:batch_size]
+        )
+        if not intakes:
+            return 0
+
+        sessions_by_intake = {
+            intake.id: show_session_ids(intake.payload) for intake in intakes
+        }
+        ShowSession.lock(
+            {
+                show_session_id
+                for ids in sessions_by_intake.values()
+                for show_session_id in ids
+            }
+        )
+
+        # Requests for the same show sessions are booked one after another
+        for intake in sorted(
+            intakes,
+            key=lambda intake: (sessions_by_intake[intake.id], intake.id)
+        ):
+            Command.process_intake(intake)
+
+        ReservationIntake.objects.bulk_update(
+            intakes, ["status", "errors", "reservation", "processed_at"]
+        )
+        return len(intakes)
+
+    @staticmethod
+    def process_intake(intake):
+        """
+        Book one request in a savepoint, an error only fails this request
+        and the rest of the batch is still booked
+        """
+        serializer = ReservationSerializer(
+            data=intake.payload,
+            context={"user": intake.user}
+        )
+        try:
+            with transaction.atomic():
+                serializer.is_valid(raise_exception=True)
+                intake.reservation = serializer.save(user=intake.user)
+                intake.status = ReservationIntake.Status.DONE
+        except APIException as exc:
+            intake.status = ReservationIntake.Status.FAILED
+            intake.errors = exc.detail
+        except Exception:
+            logger.exception(
+                "Could not process the reservation request %s", intake.id
+            )
+            intake.status = ReservationIntake.Status.FAILED
+            intake.errors = {"non_field_errors": [PROCESSING_ERROR_MESSAGE]}
+        intake.processed_at = timezone.now()
@@ -0,0 +1,57 @@
+from django.core.management import BaseCommand
+from planetarium_service.conditional import bump_model_versions
+from reservations.allocation import FreeSeatIndex
+from reservations.caching import invalidate_show_session_lists_by_id
+from reservations.live import publish_seat_changes
+from reservations.models import SeatHold, Ticket
+from reservations.serializers import places_filter
+
+
+class Command(BaseCommand):
+    """Django command to delete expired seat holds in batches"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of expired holds deleted per query",
+        )
+
+    def handle(self, *args, **options):
+        released = 0
+        show_session_ids = set()
+        while True:
+            batch = list(
+                SeatHold.objects.expired().values_list(
+                    "id", "show_session_id", "row", "seat"
+                )[:options["batch_size"]]
+            )
+            if not batch:
+                break
+            released += SeatHold.objects.filter(
+                id__in=[seat_hold[0] for seat_hold in batch]
+            ).delete()[0]
+
+            # Places booked after the hold expired stay taken
+            places = [seat_hold[1:] for seat_hold in batch]
+            show_session_ids.update(place[0] for place in places)
+            booked_places = set(
+                Ticket.objects.filter(places_filter(places)).values_list(
+                    "show_session_id", "row", "seat"
+                )
+            )
+            publish_seat_changes(
+                released=[
+                    place for place in places if place not in booked_places
+                ]
+            )
+
+        if released:
+            bump_model_versions(SeatHold)
+            invalidate_show_session_lists_by_id(show_session_ids)
+            FreeSeatIndex.invalidate(show_session_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Released {released} expired seat holds")
+        )
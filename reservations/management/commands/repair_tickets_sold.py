@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+from planetarium_service.conditional import bump_model_versions
+from reservations.caching import invalidate_all_show_session_lists
+from reservations.models import ShowSession
+
+
+class Command(BaseCommand):
+    """Django command to recompute drifted show session ticket counters"""
+
+    def handle(self, *args, **options):
+        repaired = ShowSession.recount_tickets_sold()
+        if repaired:
+            bump_model_versions(ShowSession)
+            invalidate_all_show_session_lists()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired {repaired} show sessions")
+        )
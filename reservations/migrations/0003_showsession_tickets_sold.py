@@ -0,0 +1,39 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_tickets_sold(apps, schema_editor):
+    ShowSession = apps.get_model("reservations", "ShowSession")
+    Ticket = apps.get_model("reservations", "Ticket")
+    tickets_count = (
+        Ticket.objects.filter(show_session=OuterRef("pk"))
+        .order_by()
+        .values("show_session")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    ShowSession.objects.update(
+        tickets_sold=Coalesce(Subquery(tickets_count), 0)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservations", "0002_seathold"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="showsession",
+            options={"ordering": ["show_time", "id"]},
+        ),
+        migrations.AddField(
+            model_name="showsession",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tickets_sold, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservations", "0004_reservationintake"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["user", "created_at", "id"], name="reservation_user_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservations", "0005_reservation_user_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="checked_in_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shows", "0001_initial"),
+        ("domes", "0001_initial"),
+        ("reservations", "0006_ticket_checked_in_at"),
+    ]
+
+    # The composite indexes are built before the foreign key indexes
+    # they replace are dropped
+    operations = [
+        migrations.AddIndex(
+            model_name="showsession",
+            index=models.Index(
+                fields=["show_time", "id"], name="show_session_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="showsession",
+            index=models.Index(
+                fields=["astronomy_show", "show_time"],
+                name="show_session_show_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="showsession",
+            index=models.Index(
+                fields=["planetarium_dome", "show_time"],
+                name="show_session_dome_time_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="showsession",
+            name="astronomy_show",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="shows.astronomyshow",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="showsession",
+            name="planetarium_dome",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="domes.planetariumdome",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.6 on 2026-10-18 21:29
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservations", "0007_showsession_show_time_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="seathold",
+            name="held_since",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
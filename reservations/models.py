@@ -1,27 +1,126 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
 from domes.models import PlanetariumDome
 from shows.models import AstronomyShow
+from reservations.ticket_codes import make_ticket_code
 
 
 class ShowSession(models.Model):
+    # Both foreign keys are covered by the composite show time indexes
     astronomy_show = models.ForeignKey(
         AstronomyShow,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     planetarium_dome = models.ForeignKey(
         PlanetariumDome,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     show_time = models.DateTimeField()
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
-        ordering = ["show_time"]
+        ordering = ["show_time", "id"]
+        indexes = [
+            models.Index(
+                fields=["show_time", "id"],
+                name="show_session_time_idx",
+            ),
+            models.Index(
+                fields=["astronomy_show", "show_time"],
+                name="show_session_show_time_idx",
+            ),
+            models.Index(
+                fields=["planetarium_dome", "show_time"],
+                name="show_session_dome_time_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.astronomy_show.title + " " + str(self.show_time)
 
+    @staticmethod
+    def lock(show_session_ids):
+        """
+        Lock show session rows until the end of the transaction and
+        return their {id: tickets_sold}. Rows are always locked in
+        ascending id order, so bookings spanning several sessions cannot
+        deadlock each other.
+        """
+        return dict(
+            ShowSession.objects.select_for_update()
+            .filter(id__in=show_session_ids)
+            .order_by("id")
+            .values_list("id", "tickets_sold")
+        )
+
+    @staticmethod
+    def adjust_tickets_sold(changes):
+        """
+        Atomically add the {show_session_id: number of tickets} changes
+        to the stored `tickets_sold` counters with a single UPDATE
+        """
+        changes = {
+            show_session_id: change
+            for show_session_id, change in changes.items()
+            if change
+        }
+        if not changes:
+            return
+
+        ShowSession.objects.filter(id__in=changes).update(
+            tickets_sold=F("tickets_sold") + Case(
+                *(
+                    When(id=show_session_id, then=change)
+                    for show_session_id, change in changes.items()
+                ),
+                output_field=models.IntegerField(),
+            )
+        )
+
+    @staticmethod
+    def recount_tickets_sold(show_session_ids=None):
+        """
+        Set `tickets_sold` to the number of tickets of the show sessions,
+        all of them by default, and return how many counters changed
+        """
+        tickets_count = Coalesce(
+            Subquery(
+                Ticket.objects.filter(show_session=OuterRef("pk"))
+                .order_by()
+                .values("show_session")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+        show_sessions = ShowSession.objects.all()
+        if show_session_ids is not None:
+            show_sessions = show_sessions.filter(id__in=show_session_ids)
+        return (
+            show_sessions.annotate(tickets_count=tickets_count)
+            .filter(~Q(tickets_sold=F("tickets_count")))
+            .update(tickets_sold=tickets_count)
+        )
+
+    def taken_places_bitmap(self) -> bytes:
+        """
+        Pack taken places into a bitset. The place (row, seat) is stored
+        in bit `(row - 1) * seats_in_row + (seat - 1)`, counting from
+        the most significant bit of the first byte.
+        """
+        seats_in_row = self.planetarium_dome.seats_in_row
+        bitmap = bytearray((self.planetarium_dome.capacity + 7) // 8)
+        for row, seat in self.tickets.order_by().values_list("row", "seat"):
+            index = (row - 1) * seats_in_row + seat - 1
+            bitmap[index // 8] |= 0x80 >> (index % 8)
+        return bytes(bitmap)
+
 
 class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -34,6 +133,59 @@ class Reservation(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="reservation_user_created_idx",
+            ),
+        ]
+
+
+class ReservationIntake(models.Model):
+    """
+    Reservation request queued by the asynchronous intake mode and
+    processed later in batches by the `process_reservation_intakes`
+    worker command
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        DONE = "done"
+        FAILED = "failed"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="reservation_intakes",
+    )
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    errors = models.JSONField(null=True)
+    reservation = models.OneToOneField(
+        Reservation,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="intake",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f"{str(self.created_at)} by: {self.user} ({self.status})"
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(status="pending"),
+                name="reservation_intake_pending",
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -45,6 +197,13 @@ class Ticket(models.Model):
     )
     row = models.IntegerField()
     seat = models.IntegerField()
+    checked_in_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def code(self) -> str:
+        return make_ticket_code(
+            self.id, self.show_session_id, self.row, self.seat
+        )
 
     @staticmethod
     def validate_ticket(row, seat, planetarium_dome, error_to_raise):
@@ -93,3 +252,47 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("show_session", "row", "seat")
         ordering = ["row", "seat"]
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=Now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=Now())
+
+
+class SeatHold(models.Model):
+    """
+    Place temporarily held by a user while the reservation is confirmed.
+    Holds are created and deleted very often, so the table is kept narrow
+    and only has the indexes needed for lookups and expiry sweeps.
+    """
+    show_session = models.ForeignKey(
+        ShowSession,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+        db_index=False,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    # Holding the place again keeps it, the hold cannot be extended past
+    # SEAT_HOLD_MAX_DURATION from it
+    held_since = models.DateTimeField(default=timezone.now)
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    def __str__(self):
+        return (
+            f"{str(self.show_session)} (row: {self.row}, seat: {self.seat}) "
+            f"held until {self.expires_at}"
+        )
+
+    class Meta:
+        unique_together = ("show_session", "row", "seat")
@@ -1,9 +1,104 @@
+import base64
+from collections import Counter
+from functools import reduce
+from operator import or_
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Now
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from domes.serializers import PlanetariumDomeSerializer
-from shows.serializers import AstronomyShowListSerializer
-from reservations.models import ShowSession, Ticket, Reservation
+from planetarium_service.conditional import bump_model_versions
+from shows.models import AstronomyShow
+from shows.serializers import (
+    AstronomyShowListSerializer,
+    AstronomyShowSerializer,
+    ImageSrcsetField,
+    ShowThemeSerializer,
+)
+from reservations.allocation import FreeSeatIndex
+from reservations.caching import invalidate_show_session_lists
+from reservations.exceptions import PlacesConflict
+from reservations.live import publish_seat_changes
+from reservations.models import (
+    ShowSession,
+    Ticket,
+    Reservation,
+    ReservationIntake,
+    SeatHold,
+)
+
+UNIQUE_PLACE_MESSAGE = (
+    "The fields show_session, row, seat must make a unique set."
+)
+HELD_PLACE_MESSAGE = "This place is held by another user."
+NOT_ENOUGH_PLACES_MESSAGE = "Not enough free places in a show session."
+HOLD_LIMIT_MESSAGE = (
+    "At most {limit} places of a show session can be held at once."
+)
+HOLD_EXPIRED_MESSAGE = "This place was held too long to be held again."
+
+
+def places_filter(places):
+    """Build a filter matching exactly the given (session, row, seat)"""
+    return reduce(
+        or_,
+        (
+            Q(show_session_id=show_session_id, row=row, seat=seat)
+            for show_session_id, row, seat in places
+        ),
+    )
+
+
+def find_unavailable_places(places, user=None):
+    """
+    Return {(session, row, seat): is_held} for the given places that are
+    taken by tickets or held by anyone except `user`, in a single query
+    """
+    places = set(places)
+    if not places:
+        return {}
+
+    superset_filter = Q(
+        show_session_id__in={place[0] for place in places},
+        row__in={place[1] for place in places},
+        seat__in={place[2] for place in places},
+    )
+    held_places = SeatHold.objects.active().filter(superset_filter)
+    if getattr(user, "pk", None) is not None:
+        held_places = held_places.exclude(user_id=user.pk)
+
+    return {
+        (show_session_id, row, seat): is_held
+        for show_session_id, row, seat, is_held in (
+            Ticket.objects.filter(superset_filter)
+            .order_by()
+            .annotate(is_held=Value(False))
+            .values_list("show_session_id", "row", "seat", "is_held")
+            .union(
+                held_places.order_by()
+                .annotate(is_held=Value(True))
+                .values_list("show_session_id", "row", "seat", "is_held")
+            )
+        )
+        if (show_session_id, row, seat) in places
+    }
+
+
+def lock_places(places, user=None):
+    """
+    Lock the show sessions of the places and make sure the places are
+    still available. Must be called inside a transaction.
+    """
+    places = list(places)
+    ShowSession.lock({place[0] for place in places})
+    lost_places = find_unavailable_places(places, user)
+    if lost_places:
+        raise PlacesConflict(sorted(lost_places))
 
 
 class ShowSessionSerializer(serializers.ModelSerializer):
@@ -12,6 +107,42 @@ class ShowSessionSerializer(serializers.ModelSerializer):
         fields = ("id", "astronomy_show", "planetarium_dome", "show_time")
 
 
+class CatalogAstronomyShowSerializer(AstronomyShowSerializer):
+    image_srcset = ImageSrcsetField()
+
+    class Meta:
+        model = AstronomyShow
+        fields = (
+            "id",
+            "title",
+            "description",
+            "show_themes",
+            "image",
+            "image_srcset",
+        )
+
+
+class CatalogSnapshotSerializer(serializers.Serializer):
+    show_themes = ShowThemeSerializer(many=True)
+    astronomy_shows = CatalogAstronomyShowSerializer(many=True)
+    planetarium_domes = PlanetariumDomeSerializer(many=True)
+    show_sessions_from = serializers.DateTimeField()
+    show_sessions_to = serializers.DateTimeField()
+    show_sessions = ShowSessionSerializer(many=True)
+
+
+class ShowSessionCalendarDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    show_sessions = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    tickets_sold = serializers.IntegerField()
+
+
+class ShowSessionCalendarSerializer(serializers.Serializer):
+    month = serializers.DateField(format="%Y-%m")
+    days = ShowSessionCalendarDaySerializer(many=True)
+
+
 class ShowSessionListSerializer(ShowSessionSerializer):
     astronomy_show_title = serializers.CharField(
         source="astronomy_show.title",
@@ -43,7 +174,195 @@ class ShowSessionListSerializer(ShowSessionSerializer):
         )
 
 
+def _show_session_pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PreloadedShowSessionField(serializers.PrimaryKeyRelatedField):
+    """Resolves show sessions preloaded by `TicketBulkListSerializer`"""
+
+    def to_internal_value(self, data):
+        show_sessions = getattr(self.parent, "preloaded_show_sessions", None)
+        if show_sessions is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool) or _show_session_pk(data) is None:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        show_session = show_sessions.get(_show_session_pk(data))
+        if show_session is None:
+            self.fail("does_not_exist", pk_value=data)
+
+        return show_session
+
+
+class TicketBulkListSerializer(serializers.ListSerializer):
+    """
+    Validates a whole list of tickets with a constant number of queries:
+    one query loads every referenced show session with its dome and
+    one query checks which of the requested places are already taken
+    or held by another user.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        show_session_ids = {
+            _show_session_pk(item.get("show_session"))
+            for item in data
+            if isinstance(item, dict)
+        }
+        show_session_ids.discard(None)
+        self.child.preloaded_show_sessions = (
+            ShowSession.objects.select_related("planetarium_dome")
+            .in_bulk(show_session_ids)
+        )
+
+        try:
+            return self._validate_tickets(data)
+        finally:
+            self.child.preloaded_show_sessions = None
+
+    def _validate_tickets(self, data):
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        tickets_data = []
+        errors = []
+        for item in data:
+            try:
+                tickets_data.append(self.child.run_validation(item))
+                errors.append({})
+            except ValidationError as exc:
+                tickets_data.append(None)
+                errors.append(exc.detail)
+
+        for index, message in self.find_unavailable_places(tickets_data):
+            errors[index] = {"non_field_errors": [message]}
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        return tickets_data
+
+    def find_unavailable_places(self, tickets_data):
+        """
+        Return (index, error message) pairs for tickets whose places
+        are taken, held by another user or repeated in the request
+        """
+        places = {
+            index: (ticket["show_session"].id, ticket["row"], ticket["seat"])
+            for index, ticket in enumerate(tickets_data)
+            if ticket is not None
+        }
+        unavailable_places = find_unavailable_places(
+            places.values(),
+            self.context.get(
+                "user",
+                getattr(self.context.get("request"), "user", None)
+            ),
+        )
+
+        errors = []
+        for index, place in places.items():
+            if place in unavailable_places:
+                errors.append(
+                    (
+                        index,
+                        HELD_PLACE_MESSAGE
+                        if unavailable_places[place]
+                        else UNIQUE_PLACE_MESSAGE,
+                    )
+                )
+            unavailable_places[place] = False
+
+        return errors
+
+
+class SeatHoldBulkListSerializer(TicketBulkListSerializer):
+    def create(self, validated_data):
+        """
+        Hold all places at once. Expired holds and holds of the same user
+        on the requested places are replaced, which also refreshes the
+        expiry time of places that are held again, up to
+        SEAT_HOLD_MAX_DURATION after they were first held. A user holds
+        at most SEAT_HOLD_MAX_PLACES places of a show session.
+        """
+        seat_holds = [SeatHold(**attrs) for attrs in validated_data]
+        user = seat_holds[0].user
+        places = [
+            (seat_hold.show_session_id, seat_hold.row, seat_hold.seat)
+            for seat_hold in seat_holds
+        ]
+
+        with transaction.atomic():
+            # Locking the show sessions also serializes the holds
+            # of a user counted against the limit
+            lock_places(places, user)
+            self.check_hold_limit(places, user)
+            own_holds = SeatHold.objects.filter(
+                places_filter(places), user=user
+            ).only("show_session_id", "row", "seat", "held_since")
+            held_since = {
+                (hold.show_session_id, hold.row, hold.seat): hold.held_since
+                for hold in own_holds
+            }
+            now = timezone.now()
+            errors = []
+            for seat_hold, place in zip(seat_holds, places):
+                seat_hold.held_since = held_since.get(place, now)
+                seat_hold.expires_at = min(
+                    now + settings.SEAT_HOLD_TTL,
+                    seat_hold.held_since + settings.SEAT_HOLD_MAX_DURATION,
+                )
+                errors.append(
+                    {"non_field_errors": [HOLD_EXPIRED_MESSAGE]}
+                    if seat_hold.expires_at <= now
+                    else {}
+                )
+            if any(errors):
+                raise ValidationError(errors)
+
+            SeatHold.objects.filter(places_filter(places)).filter(
+                Q(user=user) | Q(expires_at__lte=Now())
+            ).delete()
+            seat_holds = SeatHold.objects.bulk_create(seat_holds)
+            bump_model_versions(SeatHold)
+            # Holds count in tickets_available of the cached lists
+            invalidate_show_session_lists(
+                {seat_hold.show_session for seat_hold in seat_holds}
+            )
+            FreeSeatIndex.invalidate({place[0] for place in places})
+            publish_seat_changes(taken=places)
+            return seat_holds
+
+    def check_hold_limit(self, places, user):
+        requested = Counter(place[0] for place in places)
+        held = Counter(
+            SeatHold.objects.active()
+            .filter(user=user, show_session_id__in=requested)
+            .exclude(places_filter(places))
+            .values_list("show_session_id", flat=True)
+        )
+        limit = settings.SEAT_HOLD_MAX_PLACES
+        if any(
+            count + held[show_session_id] > limit
+            for show_session_id, count in requested.items()
+        ):
+            raise ValidationError(
+                {"non_field_errors": [HOLD_LIMIT_MESSAGE.format(limit=limit)]}
+            )
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    show_session = PreloadedShowSessionField(
+        queryset=ShowSession.objects.select_related("planetarium_dome")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -56,7 +375,11 @@ class TicketSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Ticket
-        fields = ("id", "row", "seat", "show_session")
+        fields = ("id", "row", "seat", "show_session", "code")
+        # Seat uniqueness is checked for the whole list at once
+        # by TicketBulkListSerializer
+        validators = []
+        list_serializer_class = TicketBulkListSerializer
 
 
 class TicketListSerializer(TicketSerializer):
@@ -89,6 +412,48 @@ class ShowSessionDetailSerializer(ShowSessionSerializer):
         )
 
 
+@extend_schema_field(OpenApiTypes.BYTE)
+class TakenPlacesBitmapField(serializers.Field):
+    """Base64 encoded bitset of taken places, see `taken_places_bitmap`"""
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return base64.b64encode(value.taken_places_bitmap()).decode("ascii")
+
+
+class ShowSessionSeatMapSerializer(serializers.ModelSerializer):
+    rows = serializers.IntegerField(
+        source="planetarium_dome.rows",
+        read_only=True
+    )
+    seats_in_row = serializers.IntegerField(
+        source="planetarium_dome.seats_in_row",
+        read_only=True
+    )
+    taken_places = TakenPlacesBitmapField()
+
+    class Meta:
+        model = ShowSession
+        fields = ("id", "rows", "seats_in_row", "taken_places")
+
+
+class ShowSessionDetailBitmapSerializer(ShowSessionDetailSerializer):
+    taken_places = TakenPlacesBitmapField()
+
+
+class SeatHoldSerializer(TicketSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "row", "seat", "show_session", "expires_at")
+        read_only_fields = ("expires_at",)
+        validators = []
+        list_serializer_class = SeatHoldBulkListSerializer
+
+
 class ReservationSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
 
@@ -99,11 +464,181 @@ class ReservationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
+            lock_places(
+                (
+                    (ticket["show_session"].id, ticket["row"], ticket["seat"])
+                    for ticket in tickets_data
+                ),
+                validated_data.get("user"),
+            )
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
+            tickets = Ticket.objects.bulk_create(
+                Ticket(reservation=reservation, **ticket_data)
+                for ticket_data in tickets_data
+            )
+            ShowSession.adjust_tickets_sold(
+                Counter(ticket.show_session_id for ticket in tickets)
+            )
+            invalidate_show_session_lists(
+                {ticket_data["show_session"] for ticket_data in tickets_data}
+            )
+            SeatHold.objects.filter(
+                places_filter(
+                    (ticket.show_session_id, ticket.row, ticket.seat)
+                    for ticket in tickets
+                ),
+                user=reservation.user,
+            ).delete()
+            bump_model_versions(Ticket, SeatHold)
+            publish_seat_changes(
+                taken=(
+                    (ticket.show_session_id, ticket.row, ticket.seat)
+                    for ticket in tickets
+                )
+            )
             return reservation
 
 
+class BestAvailableReservationSerializer(serializers.Serializer):
+    show_session = serializers.PrimaryKeyRelatedField(
+        queryset=ShowSession.objects.select_related("planetarium_dome")
+    )
+    count = serializers.IntegerField(min_value=1)
+    preferred_rows = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+    )
+    allow_split = serializers.BooleanField(default=True)
+
+    def create(self, validated_data):
+        """
+        Let the server choose the places: adjacent places in the preferred
+        rows when possible, otherwise the nearest split allocation.
+        A cached index that turns out to be stale, because the places
+        are taken or none are left, is rebuilt once.
+        """
+        show_session = validated_data["show_session"]
+        user = validated_data["user"]
+        with transaction.atomic():
+            version = ShowSession.lock([show_session.id])[show_session.id]
+            index = FreeSeatIndex.for_show_session(show_session, version)
+            for attempt in range(2):
+                places = index.allocate(
+                    validated_data["count"],
+                    validated_data["preferred_rows"],
+                    validated_data["allow_split"],
+                )
+                if places is None:
+                    if attempt:
+                        raise ValidationError(
+                            {"count": NOT_ENOUGH_PLACES_MESSAGE}
+                        )
+                    index = FreeSeatIndex.build(show_session)
+                    continue
+
+                try:
+                    reservation = ReservationSerializer().create(
+                        {
+                            "user": user,
+                            "tickets": [
+                                {
+                                    "show_session": show_session,
+                                    "row": row,
+                                    "seat": seat,
+                                }
+                                for row, seat in places
+                            ],
+                        }
+                    )
+                except PlacesConflict:
+                    if attempt:
+                        raise
+                    index = FreeSeatIndex.build(show_session)
+                    continue
+
+                index.take(places)
+                index.version = version + len(places)
+                index.save(show_session.id)
+                return reservation
+
+
 class ReservationListSerializer(ReservationSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class DynamicFieldsMixin:
+    """Keep only the fields named in the optional `fields` argument"""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class TicketPlaceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Ticket
+        fields = ("id", "row", "seat", "show_session", "code")
+        read_only_fields = fields
+
+
+class ReservationSparseSerializer(
+    DynamicFieldsMixin,
+    serializers.ModelSerializer
+):
+    """
+    Reservation with flat tickets where show sessions are only ids,
+    optionally reduced to the requested reservation and ticket fields
+    """
+
+    def __init__(self, *args, **kwargs):
+        ticket_fields = kwargs.pop("ticket_fields", None)
+        super().__init__(*args, **kwargs)
+        if "tickets" in self.fields:
+            self.fields["tickets"] = TicketPlaceSerializer(
+                many=True,
+                read_only=True,
+                fields=ticket_fields
+            )
+
+    class Meta:
+        model = Reservation
+        fields = ("id", "tickets", "created_at")
+        read_only_fields = fields
+
+
+class ReservationIntakeSerializer(serializers.ModelSerializer):
+    status_url = serializers.HyperlinkedIdentityField(
+        view_name="reservations:reservationintake-detail"
+    )
+
+    class Meta:
+        model = ReservationIntake
+        fields = (
+            "id",
+            "status",
+            "status_url",
+            "errors",
+            "reservation",
+            "created_at",
+            "processed_at",
+        )
+
+
+class TicketCheckInSerializer(serializers.Serializer):
+    codes = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=1000,
+    )
+    show_session = serializers.IntegerField(required=False)
+
+
+class TicketCodeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Ticket
+        fields = ("code", "row", "seat", "checked_in_at")
+        read_only_fields = fields
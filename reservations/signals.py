@@ -0,0 +1,123 @@
+from collections import Counter
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow
+from reservations.allocation import FreeSeatIndex
+from reservations.caching import (
+    invalidate_all_show_session_lists,
+    invalidate_show_session_lists_by_id,
+)
+from reservations.live import publish_seat_changes
+from reservations.models import Reservation, ShowSession, Ticket
+
+
+def _accounted_ids(origin, model):
+    """
+    Ids of the `model` instances removed by the delete() call of
+    `origin` whose tickets were already accounted for all at once
+    """
+    accounted = origin.__dict__.setdefault("_tickets_accounted", {})
+    return accounted.setdefault(model, set())
+
+
+def _is_accounted(ticket, origin):
+    accounted = getattr(origin, "_tickets_accounted", {})
+    return ticket.reservation_id in accounted.get(
+        Reservation, ()
+    ) or ticket.show_session_id in accounted.get(ShowSession, ())
+
+
+def _change_places(taken=(), released=(), tickets=()):
+    """
+    Account for tickets taking and releasing (session, row, seat)
+    places: one UPDATE of the counters and one fetch of the sessions
+    """
+    changes = Counter(place[0] for place in taken)
+    changes.subtract(place[0] for place in released)
+    ShowSession.adjust_tickets_sold(changes)
+    invalidate_show_session_lists_by_id(
+        changes,
+        [
+            ticket.show_session
+            for ticket in tickets
+            if Ticket.show_session.is_cached(ticket)
+        ],
+    )
+    # Moves within a session and a release followed by a sale keep the
+    # counter, and so the version of the cached seat index
+    FreeSeatIndex.invalidate(changes)
+    publish_seat_changes(taken=taken, released=released)
+
+
+@receiver(post_save, sender=Ticket)
+def increase_tickets_sold(sender, instance, created, **kwargs):
+    place = (instance.show_session_id, instance.row, instance.seat)
+    if created:
+        _change_places(taken=[place], tickets=[instance])
+    elif instance._original_place not in (None, place):
+        # Moved to another place, in the admin panel
+        _change_places(
+            taken=[place],
+            released=[instance._original_place],
+            tickets=[instance],
+        )
+    instance._original_place = place
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_place(sender, instance, raw, **kwargs):
+    instance._original_place = None
+    if not raw and not instance._state.adding:
+        instance._original_place = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("show_session_id", "row", "seat")
+            .first()
+        )
+
+
+@receiver(pre_delete, sender=Reservation)
+def decrease_tickets_sold_of_reservation(
+    sender, instance, origin=None, **kwargs
+):
+    if origin is None:
+        return
+    _change_places(
+        released=list(
+            instance.tickets.values_list("show_session_id", "row", "seat")
+        )
+    )
+    _accounted_ids(origin, Reservation).add(instance.pk)
+
+
+@receiver(pre_delete, sender=ShowSession)
+def skip_tickets_of_show_session(sender, instance, origin=None, **kwargs):
+    # The counter goes away with the show session and its lists are
+    # invalidated as a whole
+    if origin is not None:
+        _accounted_ids(origin, ShowSession).add(instance.pk)
+
+
+@receiver(post_delete, sender=Ticket)
+def decrease_tickets_sold(sender, instance, origin=None, **kwargs):
+    if _is_accounted(instance, origin):
+        return
+    _change_places(
+        released=[(instance.show_session_id, instance.row, instance.seat)],
+        tickets=[instance],
+    )
+
+
+@receiver(post_save, sender=ShowSession)
+@receiver(post_delete, sender=ShowSession)
+@receiver(post_save, sender=AstronomyShow)
+@receiver(post_delete, sender=AstronomyShow)
+@receiver(post_save, sender=PlanetariumDome)
+@receiver(post_delete, sender=PlanetariumDome)
+def invalidate_show_session_lists_on_catalog_change(sender, **kwargs):
+    invalidate_all_show_session_lists()
@@ -0,0 +1,83 @@
+import gzip
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+from domes.models import PlanetariumDome
+from planetarium_service.conditional import model_versions
+from shows.models import AstronomyShow, ShowTheme
+from reservations.models import ShowSession
+from reservations.serializers import CatalogSnapshotSerializer
+
+CATALOG_SNAPSHOT_PREFIX = "reservations:catalog-snapshot"
+CATALOG_SNAPSHOT_MODELS = (
+    ShowTheme,
+    AstronomyShow,
+    PlanetariumDome,
+    ShowSession,
+)
+
+# The latest snapshot of this process, saves unpickling it per request
+_local_snapshot = {}
+
+
+def catalog_snapshot_key(show_sessions_from):
+    versions = model_versions(CATALOG_SNAPSHOT_MODELS)
+    return (
+        f"{CATALOG_SNAPSHOT_PREFIX}:{show_sessions_from:%Y-%m-%d}:"
+        f"{':'.join(map(str, versions))}"
+    )
+
+
+def build_catalog_snapshot(show_sessions_from, show_sessions_to):
+    """
+    Return the rendered catalog document with its gzipped copy and
+    their strong ETags
+    """
+    data = CatalogSnapshotSerializer(
+        {
+            "show_themes": ShowTheme.objects.all(),
+            "astronomy_shows": AstronomyShow.objects.defer(
+                "search_vector"
+            ).prefetch_related("show_themes"),
+            "planetarium_domes": PlanetariumDome.objects.order_by("id"),
+            "show_sessions_from": show_sessions_from,
+            "show_sessions_to": show_sessions_to,
+            "show_sessions": ShowSession.objects.filter(
+                show_time__gte=show_sessions_from,
+                show_time__lt=show_sessions_to,
+            ),
+        }
+    ).data
+    content = JSONRenderer().render(data)
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    return {
+        "content": content,
+        "etag": f'"{digest}"',
+        "gzip_content": gzip.compress(content, mtime=0),
+        "gzip_etag": f'"{digest}-gzip"',
+    }
+
+
+def get_catalog_snapshot(show_sessions_from):
+    """
+    Return the snapshot of the current catalog version with the show
+    sessions of CATALOG_SNAPSHOT_DAYS days from `show_sessions_from`,
+    built at most once per version and day across processes
+    """
+    show_sessions_to = show_sessions_from + timedelta(
+        days=settings.CATALOG_SNAPSHOT_DAYS
+    )
+    key = catalog_snapshot_key(show_sessions_from)
+    if _local_snapshot.get("key") == key:
+        return _local_snapshot["snapshot"]
+
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_catalog_snapshot(
+            show_sessions_from, show_sessions_to
+        )
+        cache.set(key, snapshot, settings.CATALOG_SNAPSHOT_CACHE_TIMEOUT)
+    _local_snapshot.update(key=key, snapshot=snapshot)
+    return snapshot
@@ -0,0 +1,234 @@
+import random
+import sys
+import time
+from datetime import datetime
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, tag
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow
+from reservations.allocation import SEAT_INDEX_CACHE_KEY, FreeSeatIndex
+from reservations.models import Reservation, ShowSession, Ticket
+
+BEST_AVAILABLE_URL = reverse("reservations:reservation-best-available")
+SEAT_HOLD_URL = reverse("reservations:seathold-list")
+
+
+class FreeSeatIndexTests(SimpleTestCase):
+    def test_block_is_centered_in_the_middle_row(self):
+        index = FreeSeatIndex(rows=5, seats_in_row=10)
+
+        self.assertEqual(
+            index.allocate(4),
+            [(3, 4), (3, 5), (3, 6), (3, 7)]
+        )
+
+    def test_block_in_preferred_row_avoids_taken_places(self):
+        index = FreeSeatIndex(
+            rows=5,
+            seats_in_row=10,
+            taken_places=[(1, 4), (1, 5), (1, 6)]
+        )
+
+        self.assertEqual(
+            index.allocate(3, preferred_rows=[1]),
+            [(1, 7), (1, 8), (1, 9)]
+        )
+
+    def test_full_preferred_row_falls_back_to_nearest_row(self):
+        index = FreeSeatIndex(
+            rows=5,
+            seats_in_row=4,
+            taken_places=[(2, seat) for seat in range(1, 5)]
+        )
+
+        self.assertEqual(
+            index.allocate(2, preferred_rows=[2]),
+            [(1, 2), (1, 3)]
+        )
+
+    def test_split_allocation_when_no_block_fits(self):
+        index = FreeSeatIndex(
+            rows=2,
+            seats_in_row=4,
+            taken_places=[(1, 3), (2, 2), (2, 3)]
+        )
+
+        self.assertIsNone(index.allocate(3, allow_split=False))
+        self.assertEqual(
+            sorted(index.allocate(3)),
+            [(1, 1), (1, 2), (1, 4)]
+        )
+
+    def test_not_enough_free_places(self):
+        index = FreeSeatIndex(rows=1, seats_in_row=3, taken_places=[(1, 2)])
+
+        self.assertIsNone(index.allocate(3))
+
+    def test_take_keeps_longest_interval_up_to_date(self):
+        index = FreeSeatIndex(rows=1, seats_in_row=10)
+
+        index.take([(1, 5), (1, 9)])
+
+        self.assertEqual(index.intervals[1], [(1, 4), (6, 8), (10, 10)])
+        self.assertEqual(index.longest[1], 4)
+
+
+@tag("benchmark")
+class FreeSeatIndexBenchmark(SimpleTestCase):
+    """Benchmark of the allocator on a dome with thousands of seats"""
+
+    def test_allocation_speed_on_large_dome(self):
+        randomizer = random.Random(0)
+        rows, seats_in_row = 60, 100
+        taken_places = randomizer.sample(
+            [
+                (row, seat)
+                for row in range(1, rows + 1)
+                for seat in range(1, seats_in_row + 1)
+            ],
+            k=rows * seats_in_row * 6 // 10,
+        )
+
+        started = time.perf_counter()
+        index = FreeSeatIndex(rows, seats_in_row, taken_places)
+        build_time = time.perf_counter() - started
+
+        allocations = 0
+        started = time.perf_counter()
+        while True:
+            count = randomizer.randint(1, 6)
+            places = index.allocate(
+                count,
+                preferred_rows=[randomizer.randint(1, rows)]
+            )
+            if places is None:
+                break
+            index.take(places)
+            allocations += 1
+        allocation_time = time.perf_counter() - started
+
+        free_places = sum(
+            last - first + 1
+            for intervals in index.intervals.values()
+            for first, last in intervals
+        )
+        self.assertLess(free_places, count)
+        self.assertLess(allocation_time / allocations, 0.005)
+        sys.stderr.write(
+            f"\nIndex of {rows * seats_in_row} seats built in "
+            f"{build_time * 1000:.1f}ms, {allocations} allocations in "
+            f"{allocation_time * 1000:.1f}ms "
+            f"({allocation_time / allocations * 1e6:.0f}us each)\n"
+        )
+
+
+class BestAvailableReservationApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test1@test1.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        planetarium_dome = PlanetariumDome.objects.create(
+            name="Dome Name",
+            rows=3,
+            seats_in_row=6,
+        )
+        self.show_session = ShowSession.objects.create(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(year=2023, month=3, day=1, hour=10)
+        )
+
+    def test_best_available_places_are_booked(self):
+        res = self.client.post(
+            BEST_AVAILABLE_URL,
+            {
+                "show_session": self.show_session.id,
+                "count": 2,
+                "preferred_rows": [1],
+            },
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(1, 3), (1, 4)]
+        )
+
+    def test_stale_cached_index_is_rebuilt(self):
+        payload = {"show_session": self.show_session.id, "count": 2}
+        self.client.post(BEST_AVAILABLE_URL, payload, format="json")
+        Ticket.objects.create(
+            show_session=self.show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=2,
+            seat=1
+        )
+        ShowSession.objects.update(tickets_sold=2)
+
+        res = self.client.post(
+            BEST_AVAILABLE_URL,
+            {**payload, "preferred_rows": [2]},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(2, 5), (2, 6)]
+        )
+
+    def test_stale_full_index_is_rebuilt(self):
+        payload = {"show_session": self.show_session.id, "count": 18}
+        self.client.post(BEST_AVAILABLE_URL, payload, format="json")
+        # Released places replaced by a sale elsewhere keep the counter
+        Ticket.objects.filter(row=1).delete()
+        ShowSession.objects.update(tickets_sold=18)
+
+        res = self.client.post(
+            BEST_AVAILABLE_URL, {**payload, "count": 6}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            {ticket["row"] for ticket in res.data["tickets"]}, {1}
+        )
+
+    def test_holds_drop_cached_index(self):
+        payload = {"show_session": self.show_session.id, "count": 2}
+        self.client.post(BEST_AVAILABLE_URL, payload, format="json")
+        key = SEAT_INDEX_CACHE_KEY.format(self.show_session.id)
+        self.assertIsNotNone(cache.get(key))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                SEAT_HOLD_URL,
+                [{"show_session": self.show_session.id, "row": 1, "seat": 1}],
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(cache.get(key))
+
+    def test_too_many_places_are_rejected(self):
+        res = self.client.post(
+            BEST_AVAILABLE_URL,
+            {"show_session": self.show_session.id, "count": 19},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", res.data)
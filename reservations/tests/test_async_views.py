@@ -0,0 +1,249 @@
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    tag,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow, ShowTheme
+from reservations.models import Reservation, ShowSession, Ticket
+
+SHOW_SESSION_URL = reverse("reservations:showsession-list")
+ASYNC_SHOW_SESSION_URL = reverse("reservations:showsession-list-async")
+ASTRONOMY_SHOW_URL = reverse("shows:astronomyshow-list")
+ASYNC_ASTRONOMY_SHOW_URL = reverse("shows:astronomyshow-list-async")
+
+CONCURRENT_REQUESTS = 50
+ROUNDS = 3
+
+
+def detail_url(show_session_id, name="showsession-detail"):
+    return reverse(f"reservations:{name}", args=[show_session_id])
+
+
+def create_catalog(show_sessions=3):
+    show_theme = ShowTheme.objects.create(name="Space inside")
+    astronomy_show = AstronomyShow.objects.create(
+        title="Good Show",
+        description="Good Show description"
+    )
+    astronomy_show.show_themes.add(show_theme)
+    planetarium_dome = PlanetariumDome.objects.create(
+        name="Dome Test",
+        rows=2,
+        seats_in_row=3,
+    )
+    return [
+        ShowSession.objects.create(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(2022, 3, 1 + index % 28, 14, 0),
+        )
+        for index in range(show_sessions)
+    ]
+
+
+class AsyncShowSessionViewsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.test",
+            "testpass",
+        )
+        self.show_sessions = create_catalog()
+        Ticket.objects.create(
+            show_session=self.show_sessions[0],
+            reservation=Reservation.objects.create(user=self.user),
+            row=2,
+            seat=3
+        )
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+
+    async def test_auth_required(self):
+        res = await self.async_client.get(ASYNC_SHOW_SESSION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_list_matches_sync_view(self):
+        params = {"from": "2022-03-02T00:00"}
+        res = await self.async_client.get(
+            ASYNC_SHOW_SESSION_URL, params, headers=self.headers
+        )
+        expected = await self.async_client.get(
+            SHOW_SESSION_URL, params, headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()["results"]), 2)
+        self.assertEqual(res.json()["results"], expected.json()["results"])
+
+    async def test_detail_matches_sync_view(self):
+        show_session = self.show_sessions[0]
+        res = await self.async_client.get(
+            detail_url(show_session.id, "showsession-detail-async"),
+            headers=self.headers,
+        )
+        expected = await self.async_client.get(
+            detail_url(show_session.id), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), expected.json())
+
+    async def test_unknown_show_session(self):
+        url = detail_url(
+            self.show_sessions[-1].id + 1, "showsession-detail-async"
+        )
+        res = await self.async_client.get(url, headers=self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# The throttles and the fallback search read the cache synchronously, a
+# database cache rejects that in async code
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "async_views_cache",
+        }
+    }
+)
+@mock.patch("shows.search.uses_search_vectors", return_value=False)
+class AsyncViewsDatabaseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("createcachetable", verbosity=0)
+        user = get_user_model().objects.create_user(
+            "test@test.test",
+            "testpass",
+        )
+        cls.show_sessions = create_catalog()
+        cls.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(user)}"
+        }
+
+    async def test_show_session_list(self, _):
+        res = await self.async_client.get(
+            ASYNC_SHOW_SESSION_URL, headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()["results"]), 3)
+
+    async def test_astronomy_show_search(self, _):
+        res = await self.async_client.get(
+            ASYNC_ASTRONOMY_SHOW_URL, {"q": "good"}, headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [show["title"] for show in res.json()], ["Good Show"]
+        )
+
+
+async def asgi_get(application, url, headers):
+    """Run one GET request through the ASGI application"""
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(b"host", b"testserver"), *headers],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]["status"], b"".join(
+        message.get("body", b"") for message in messages[1:]
+    )
+
+
+# Both variants query the database on every request
+@tag("benchmark")
+@override_settings(SHOW_SESSION_LIST_CACHE_TIMEOUT=0)
+class AsyncViewsCapacityBenchmark(TransactionTestCase):
+    """
+    Requests served by one ASGI worker with many requests in flight,
+    sync DRF views against their async variants
+    """
+
+    def setUp(self):
+        create_catalog(show_sessions=60)
+        user = get_user_model().objects.create_user(
+            "test@test.test",
+            "testpass",
+        )
+        token = AccessToken.for_user(user)
+        self.headers = [(b"authorization", f"Bearer {token}".encode())]
+        self.application = get_asgi_application()
+
+    async def measure(self, url):
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            responses = await asyncio.gather(
+                *(
+                    asgi_get(self.application, url, self.headers)
+                    for _ in range(CONCURRENT_REQUESTS)
+                )
+            )
+        elapsed = time.perf_counter() - started
+        return elapsed, responses
+
+    def test_concurrent_capacity(self):
+        report = []
+        for name, sync_url, async_url in (
+            ("astronomy show list", ASTRONOMY_SHOW_URL,
+             ASYNC_ASTRONOMY_SHOW_URL),
+            ("show session list", SHOW_SESSION_URL, ASYNC_SHOW_SESSION_URL),
+        ):
+            timings = []
+            bodies = []
+            for url in (sync_url, async_url):
+                elapsed, responses = asyncio.run(self.measure(url))
+                self.assertEqual(
+                    {status_code for status_code, _ in responses},
+                    {status.HTTP_200_OK}
+                )
+                timings.append(elapsed)
+                bodies.append(json.loads(responses[0][1]))
+            if isinstance(bodies[0], dict):
+                bodies = [body["results"] for body in bodies]
+            self.assertEqual(bodies[0], bodies[1])
+
+            requests = CONCURRENT_REQUESTS * ROUNDS
+            report.append(
+                f"{name}: sync {requests / timings[0]:.0f} requests/s, "
+                f"async {requests / timings[1]:.0f} requests/s"
+            )
+
+        sys.stderr.write(
+            f"\n{CONCURRENT_REQUESTS} concurrent requests on one ASGI "
+            f"worker, {'; '.join(report)}\n"
+        )
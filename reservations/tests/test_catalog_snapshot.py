@@ -0,0 +1,141 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow, ShowTheme
+from reservations.models import Reservation, ShowSession, Ticket
+from reservations.snapshot import _local_snapshot
+
+CATALOG_SNAPSHOT_URL = reverse("catalog-snapshot")
+
+
+class UnauthenticatedCatalogSnapshotTests(TestCase):
+    def test_auth_required(self):
+        res = APIClient().get(CATALOG_SNAPSHOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CatalogSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _local_snapshot.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.test",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        show_theme = ShowTheme.objects.create(name="Space inside")
+        self.astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        self.astronomy_show.show_themes.add(show_theme)
+        self.planetarium_dome = PlanetariumDome.objects.create(
+            name="Dome Test",
+            rows=2,
+            seats_in_row=3,
+        )
+        today = datetime.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.show_sessions = [
+            self.create_show_session(today + timedelta(days=days, hours=18))
+            for days in (-1, 0, 59, 60)
+        ]
+
+    def create_show_session(self, show_time):
+        return ShowSession.objects.create(
+            astronomy_show=self.astronomy_show,
+            planetarium_dome=self.planetarium_dome,
+            show_time=show_time,
+        )
+
+    def test_snapshot_lists_catalog_and_upcoming_show_sessions(self):
+        res = self.client.get(CATALOG_SNAPSHOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/json")
+        snapshot = json.loads(res.content)
+        self.assertEqual(
+            snapshot["show_themes"],
+            [{"id": ShowTheme.objects.get().id, "name": "Space inside"}]
+        )
+        self.assertEqual(
+            snapshot["astronomy_shows"],
+            [
+                {
+                    "id": self.astronomy_show.id,
+                    "title": "Good Show",
+                    "description": "Good Show description",
+                    "show_themes": [ShowTheme.objects.get().id],
+                    "image": None,
+                    "image_srcset": {},
+                }
+            ]
+        )
+        self.assertEqual(
+            [dome["name"] for dome in snapshot["planetarium_domes"]],
+            ["Dome Test"]
+        )
+        self.assertEqual(
+            [show_session["id"] for show_session in snapshot["show_sessions"]],
+            [self.show_sessions[1].id, self.show_sessions[2].id]
+        )
+
+    def test_gzipped_snapshot(self):
+        res = self.client.get(
+            CATALOG_SNAPSHOT_URL, HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+        plain = self.client.get(CATALOG_SNAPSHOT_URL)
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotEqual(res["ETag"], plain["ETag"])
+        self.assertIn("Accept-Encoding", res["Vary"])
+
+    def test_unchanged_snapshot_is_not_modified(self):
+        etag = self.client.get(CATALOG_SNAPSHOT_URL)["ETag"]
+
+        res = self.client.get(CATALOG_SNAPSHOT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_snapshot_is_rebuilt_only_after_catalog_changes(self):
+        first = self.client.get(CATALOG_SNAPSHOT_URL)
+
+        with self.assertNumQueries(0):
+            self.client.get(CATALOG_SNAPSHOT_URL)
+
+        # Sold tickets do not change the snapshot
+        Ticket.objects.create(
+            show_session=self.show_sessions[1],
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1,
+        )
+        with self.assertNumQueries(0):
+            self.client.get(CATALOG_SNAPSHOT_URL)
+
+        _local_snapshot.clear()
+        with self.assertNumQueries(0):
+            self.client.get(CATALOG_SNAPSHOT_URL)
+
+        show_session = self.create_show_session(
+            self.show_sessions[1].show_time + timedelta(hours=1)
+        )
+        res = self.client.get(CATALOG_SNAPSHOT_URL)
+
+        self.assertNotEqual(res["ETag"], first["ETag"])
+        self.assertIn(
+            show_session.id,
+            [item["id"] for item in json.loads(res.content)["show_sessions"]]
+        )
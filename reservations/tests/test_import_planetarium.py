@@ -0,0 +1,286 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, tag
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow, ShowTheme
+from shows.search import search_astronomy_shows
+from reservations.importing import read_json
+from reservations.models import Reservation, ShowSession, Ticket
+
+CATALOG = [
+    {"type": "show_theme", "name": "Dark Space"},
+    {
+        "type": "planetarium_dome",
+        "name": "Middle dome",
+        "rows": 7,
+        "seats_in_row": 10,
+    },
+    {
+        "type": "astronomy_show",
+        "title": "Solar system",
+        "description": "The main planets of the solar system.",
+        "show_themes": ["Dark Space", "Planets"],
+    },
+    {
+        "type": "show_session",
+        "astronomy_show": "Solar system",
+        "planetarium_dome": "Middle dome",
+        "show_time": "2024-02-04T16:30:00",
+    },
+]
+
+
+def ticket(row, seat, reservation=None, **fields):
+    record = {
+        "type": "ticket",
+        "astronomy_show": "Solar system",
+        "planetarium_dome": "Middle dome",
+        "show_time": "2024-02-04T16:30:00",
+        "row": row,
+        "seat": seat,
+        "user": "john@smith.com",
+        **fields,
+    }
+    if reservation is not None:
+        record["reservation"] = reservation
+    return record
+
+
+class ImportPlanetariumTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "john@smith.com", "testpass"
+        )
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", newline="") as input_file:
+            input_file.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        out = StringIO()
+        call_command("import_planetarium", path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_json_import(self):
+        records = CATALOG + [
+            ticket(1, 1, reservation="a"),
+            ticket(1, 2, reservation="a"),
+            ticket(2, 1),
+        ]
+        path = self.write("planetarium.json", json.dumps(records, indent=2))
+
+        out = self.run_import(path)
+
+        self.assertIn("Imported 7 records", out)
+        astronomy_show = AstronomyShow.objects.get(title="Solar system")
+        self.assertEqual(
+            sorted(astronomy_show.show_themes.values_list("name", flat=True)),
+            ["Dark Space", "Planets"]
+        )
+        self.assertEqual(
+            list(
+                search_astronomy_shows(AstronomyShow.objects.all(), "planets")
+            ),
+            [astronomy_show]
+        )
+        show_session = ShowSession.objects.get()
+        self.assertEqual(show_session.show_time, datetime(2024, 2, 4, 16, 30))
+        self.assertEqual(show_session.tickets_sold, 3)
+        self.assertEqual(Reservation.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            Ticket.objects.get(row=1, seat=2).reservation,
+            Ticket.objects.get(row=1, seat=1).reservation,
+        )
+
+        out = self.run_import(path)
+
+        self.assertIn("3 tickets already existed", out)
+        self.assertEqual(Ticket.objects.count(), 3)
+        self.assertEqual(Reservation.objects.count(), 2)
+        self.assertEqual(ShowSession.objects.get().tickets_sold, 3)
+
+    def test_ndjson_batches_share_natural_keys(self):
+        records = CATALOG + [
+            ticket(row, seat, reservation="a")
+            for row in (1, 2) for seat in (1, 2, 3)
+        ]
+        path = self.write(
+            "planetarium.ndjson",
+            "\n".join(json.dumps(record) for record in records) + "\n",
+        )
+
+        self.run_import(path, "--batch-size=2")
+
+        self.assertEqual(ShowTheme.objects.count(), 2)
+        self.assertEqual(ShowSession.objects.get().tickets_sold, 6)
+        self.assertEqual(Reservation.objects.get().tickets.count(), 6)
+
+    def test_csv_import_with_default_type(self):
+        catalog = self.write(
+            "shows.csv",
+            "title,description,show_themes\n"
+            "Solar system,Planets,Dark Space|Planets\n"
+            "Stars,,\n",
+        )
+
+        self.run_import(catalog, "--type=astronomy_show")
+
+        self.assertEqual(
+            list(AstronomyShow.objects.values_list("title", "description")),
+            [("Solar system", "Planets"), ("Stars", "")]
+        )
+        self.assertEqual(
+            AstronomyShow.objects.get(title="Solar system")
+            .show_themes.count(),
+            2
+        )
+
+    def test_domes_and_shows_are_updated(self):
+        self.run_import(self.write("catalog.json", json.dumps(CATALOG)))
+        records = [
+            dict(CATALOG[1], rows=8),
+            dict(CATALOG[2], description="Updated"),
+        ]
+
+        self.run_import(self.write("update.json", json.dumps(records)))
+
+        self.assertEqual(PlanetariumDome.objects.get().rows, 8)
+        self.assertEqual(AstronomyShow.objects.get().description, "Updated")
+
+    def test_invalid_records_are_reported_with_position(self):
+        for records, message in (
+            (
+                CATALOG + [ticket(8, 1)],
+                "planetarium.ndjson:5: row number must be in available range",
+            ),
+            (
+                CATALOG + [ticket(1, 1, planetarium_dome="Small dome")],
+                "planetarium.ndjson:5: Unknown planetarium dome: Small dome",
+            ),
+            (
+                CATALOG + [ticket(1, 1, user="nobody@test.test")],
+                "planetarium.ndjson:5: Unknown user: nobody@test.test",
+            ),
+            (
+                CATALOG[:3] + [dict(CATALOG[3], show_time="today")],
+                "planetarium.ndjson:4: Invalid show_time: 'today'",
+            ),
+            ([{"type": "user"}], "Unknown record type: 'user'"),
+        ):
+            path = self.write(
+                "planetarium.ndjson",
+                "\n".join(json.dumps(record) for record in records),
+            )
+            with self.assertRaisesMessage(CommandError, message):
+                self.run_import(path)
+
+    @mock.patch("reservations.importing.READ_SIZE", 5)
+    def test_json_is_read_in_chunks(self):
+        stream = StringIO(' [{"name": "a, ]"}, {"rows": [1, 2]} ,{}]')
+
+        self.assertEqual(
+            list(read_json(stream)),
+            [(1, {"name": "a, ]"}), (2, {"rows": [1, 2]}), (3, {})]
+        )
+
+    def test_truncated_json(self):
+        with self.assertRaisesMessage(ValueError, "Unexpected end of JSON"):
+            list(read_json(StringIO('[{"name": "a"}')))
+
+
+@tag("benchmark")
+class ImportPlanetariumBenchmark(TestCase):
+    """Bulk imported tickets against tickets saved one at a time"""
+
+    TICKETS = 20000
+    SAVED_TICKETS = 1000
+
+    def setUp(self):
+        users = [
+            get_user_model()(email=f"user{index}@test.test")
+            for index in range(100)
+        ]
+        get_user_model().objects.bulk_create(users)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_import_rate(self):
+        sessions = self.TICKETS // 100
+        records = CATALOG[:3] + [
+            {
+                "type": "show_session",
+                "astronomy_show": "Solar system",
+                "planetarium_dome": "Middle dome",
+                "show_time": f"2024-03-01T10:{index % 60:02}:{index // 60:02}",
+            }
+            for index in range(sessions)
+        ]
+        records += [
+            {
+                "type": "ticket",
+                "astronomy_show": "Solar system",
+                "planetarium_dome": "Middle dome",
+                "show_time": f"2024-03-01T10:{index % 60:02}:{index // 60:02}",
+                "row": place // 10 + 1,
+                "seat": place % 10 + 1,
+                "user": f"user{place}@test.test",
+                "reservation": str(place // 4),
+            }
+            for index in range(sessions)
+            for place in range(100)
+            if place < 70
+        ]
+        path = os.path.join(self.directory, "tickets.ndjson")
+        with open(path, "w") as input_file:
+            for record in records:
+                input_file.write(json.dumps(record) + "\n")
+
+        started = time.perf_counter()
+        call_command("import_planetarium", path, stdout=StringIO())
+        imported = time.perf_counter() - started
+        tickets = Ticket.objects.count()
+        self.assertEqual(tickets, sessions * 70)
+        self.assertEqual(
+            set(ShowSession.objects.values_list("tickets_sold", flat=True)),
+            {70}
+        )
+
+        planetarium_dome = PlanetariumDome.objects.get()
+        planetarium_dome.rows = self.SAVED_TICKETS // 10
+        planetarium_dome.save()
+        show_session = ShowSession.objects.create(
+            astronomy_show=AstronomyShow.objects.get(),
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(2024, 4, 1, 10, 0),
+        )
+        reservation = Reservation.objects.create(
+            user=get_user_model().objects.first()
+        )
+        started = time.perf_counter()
+        for place in range(self.SAVED_TICKETS):
+            Ticket.objects.create(
+                show_session=show_session,
+                reservation=reservation,
+                row=place // 10 + 1,
+                seat=place % 10 + 1,
+            )
+        saved = time.perf_counter() - started
+
+        sys.stderr.write(
+            f"\nimport_planetarium: {len(records)} records in "
+            f"{imported:.1f} s ({len(records) / imported:.0f} records/s); "
+            f"Ticket.save(): {self.SAVED_TICKETS / saved:.0f} tickets/s\n"
+        )
@@ -0,0 +1,215 @@
+import asyncio
+import json
+from datetime import datetime
+from unittest import skipUnless
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow
+from reservations.live import (
+    LocalSeatEventBroker,
+    PostgresSeatEventBroker,
+    get_broker,
+    publish_seat_changes,
+)
+from reservations.models import Reservation, SeatHold, ShowSession, Ticket
+
+
+def seat_events_url(show_session_id):
+    return reverse(
+        "reservations:showsession-seat-events",
+        args=[show_session_id]
+    )
+
+
+def parse_event(chunk):
+    lines = dict(
+        line.split(": ", 1) for line in chunk.decode().strip().split("\n")
+    )
+    return lines["event"], json.loads(lines["data"])
+
+
+class ShowSessionSeatEventsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.test",
+            "testpass",
+        )
+        self.show_session = ShowSession.objects.create(
+            astronomy_show=AstronomyShow.objects.create(
+                title="Good Show",
+                description="Good Show description"
+            ),
+            planetarium_dome=PlanetariumDome.objects.create(
+                name="Dome Test",
+                rows=2,
+                seats_in_row=3,
+            ),
+            show_time=datetime(2022, 3, 1, 14, 0),
+        )
+        Ticket.objects.create(
+            show_session=self.show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=2
+        )
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+
+    async def test_auth_required(self):
+        res = await self.async_client.get(
+            seat_events_url(self.show_session.id)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_unknown_show_session(self):
+        res = await self.async_client.get(
+            seat_events_url(self.show_session.id + 1), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_snapshot_then_deltas_are_streamed(self):
+        res = await self.async_client.get(
+            seat_events_url(self.show_session.id), headers=self.headers
+        )
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        stream = res.streaming_content
+
+        self.assertTrue((await anext(stream)).startswith(b"retry: "))
+        self.assertEqual(
+            parse_event(await anext(stream)),
+            (
+                "snapshot",
+                {"show_session": self.show_session.id, "taken": [[1, 2]]},
+            )
+        )
+
+        get_broker().deliver(
+            {
+                "show_session": self.show_session.id,
+                "taken": [[2, 3]],
+                "released": [[1, 2]],
+            }
+        )
+        self.assertEqual(
+            parse_event(await anext(stream)),
+            (
+                "seats",
+                {
+                    "show_session": self.show_session.id,
+                    "taken": [[2, 3]],
+                    "released": [[1, 2]],
+                },
+            )
+        )
+        await stream.aclose()
+
+    def test_changes_are_published_on_commit(self):
+        broker = get_broker()
+        delivered = []
+        broker.deliver = delivered.append
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.objects.first().delete()
+                publish_seat_changes(
+                    taken=[(self.show_session.id, 2, 2)]
+                )
+        finally:
+            del broker.deliver
+
+        self.assertEqual(
+            delivered,
+            [
+                {
+                    "show_session": self.show_session.id,
+                    "taken": [],
+                    "released": [[1, 2]],
+                },
+                {
+                    "show_session": self.show_session.id,
+                    "taken": [[2, 2]],
+                    "released": [],
+                },
+            ]
+        )
+
+
+class LocalSeatEventBrokerTests(TestCase):
+    def test_slow_watcher_is_reset(self):
+        async def watch():
+            broker = LocalSeatEventBroker()
+            queue = broker.subscribe(1)
+            for seat in range(1, 151):
+                broker.put(
+                    queue,
+                    {"show_session": 1, "taken": [[1, seat]], "released": []}
+                )
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        with self.settings(SEAT_EVENTS_QUEUE_SIZE=100):
+            events = asyncio.run(watch())
+
+        self.assertEqual(events[0], {"reset": True})
+        self.assertEqual(events[1]["taken"], [[1, 102]])
+        self.assertEqual(len(events), 50)
+
+
+@skipUnless(connection.vendor == "postgresql", "LISTEN/NOTIFY of PostgreSQL")
+class PostgresSeatEventBrokerTests(TransactionTestCase):
+    def test_events_reach_listeners_after_commit(self):
+        show_session = ShowSession.objects.create(
+            astronomy_show=AstronomyShow.objects.create(
+                title="Good Show",
+                description="Good Show description"
+            ),
+            planetarium_dome=PlanetariumDome.objects.create(
+                name="Dome Test",
+                rows=2,
+                seats_in_row=3,
+            ),
+            show_time=datetime(2022, 3, 1, 14, 0),
+        )
+        user = get_user_model().objects.create_user(
+            "test@test.test",
+            "testpass",
+        )
+        broker = PostgresSeatEventBroker()
+        self.addCleanup(broker.stop)
+
+        def hold_seat():
+            with transaction.atomic():
+                SeatHold.objects.create(
+                    show_session=show_session,
+                    user=user,
+                    row=1,
+                    seat=1,
+                    expires_at=datetime(2100, 1, 1),
+                )
+                broker.publish(
+                    {
+                        "show_session": show_session.id,
+                        "taken": [[1, 1]],
+                        "released": [],
+                    }
+                )
+            connection.close()
+
+        async def watch():
+            queue = broker.subscribe(show_session.id)
+            # Give the listener thread time to LISTEN before publishing
+            await asyncio.sleep(0.5)
+            await sync_to_async(hold_seat, thread_sensitive=False)()
+            return await asyncio.wait_for(queue.get(), 5)
+
+        self.assertEqual(
+            asyncio.run(watch()),
+            {"show_session": show_session.id, "taken": [[1, 1]], "released": []}
+        )
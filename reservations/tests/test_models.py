@@ -1,7 +1,9 @@
 from datetime import datetime
+from io import StringIO
 from unittest import mock
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
 from domes.models import PlanetariumDome
 from shows.models import AstronomyShow, ShowTheme
@@ -246,3 +248,70 @@ class TicketTests(TestCase):
             message = "Validation method works"
 
         self.assertEqual(message, "Validation method works")
+
+    def test_tickets_sold_follows_ticket_creation_and_deletion(self):
+        ticket = Ticket.objects.create(
+            show_session=self.show_session,
+            reservation=self.reservation,
+            row=2,
+            seat=2
+        )
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 2)
+
+        ticket.delete()
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 1)
+
+        self.reservation.delete()
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 0)
+
+    def test_deleting_reservation_adjusts_tickets_sold_at_once(self):
+        Ticket.objects.bulk_create(
+            Ticket(
+                show_session=self.show_session,
+                reservation=self.reservation,
+                row=3,
+                seat=seat,
+            )
+            for seat in range(1, 11)
+        )
+        ShowSession.objects.update(tickets_sold=11)
+
+        with self.assertNumQueries(7):
+            self.reservation.delete()
+
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 0)
+
+    def test_deleting_show_session_does_not_adjust_tickets_sold(self):
+        with self.assertNumQueries(4):
+            self.show_session.delete()
+
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_moving_ticket_to_another_show_session(self):
+        other_show_session = ShowSession.objects.create(
+            astronomy_show=self.show_session.astronomy_show,
+            planetarium_dome=self.show_session.planetarium_dome,
+            show_time=self.show_session.show_time,
+        )
+
+        self.ticket.show_session = other_show_session
+        self.ticket.save()
+
+        self.show_session.refresh_from_db()
+        other_show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 0)
+        self.assertEqual(other_show_session.tickets_sold, 1)
+
+    def test_repair_tickets_sold_command(self):
+        ShowSession.objects.update(tickets_sold=10)
+        out = StringIO()
+
+        call_command("repair_tickets_sold", stdout=out)
+
+        self.show_session.refresh_from_db()
+        self.assertEqual(self.show_session.tickets_sold, 1)
+        self.assertIn("Repaired 1 show sessions", out.getvalue())
@@ -1,4 +1,5 @@
 from datetime import datetime
+from unittest import mock
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -6,7 +7,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 from domes.models import PlanetariumDome
 from shows.models import ShowTheme, AstronomyShow
-from reservations.models import Reservation, ShowSession
+from reservations.models import Reservation, ShowSession, Ticket
 from reservations.serializers import ReservationListSerializer
 
 RESERVATION_URL = reverse("reservations:reservation-list")
@@ -119,3 +120,254 @@ class AuthenticatedReservationApiTests(TestCase):
             res.data["tickets"][0]["show_session"],
             payload["tickets"][0]["show_session"]
         )
+
+
+class ReservationPaginationApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test1@test1.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        for _ in range(25):
+            Reservation.objects.create(user=self.user)
+
+    def test_reservations_are_cursor_paginated_by_default(self):
+        reservation_ids = []
+        url = RESERVATION_URL
+        while url:
+            res = self.client.get(url)
+            self.assertNotIn("count", res.data)
+            reservation_ids.extend(
+                reservation["id"] for reservation in res.data["results"]
+            )
+            url = res.data["next"]
+
+        self.assertEqual(
+            reservation_ids,
+            list(
+                Reservation.objects.order_by("-created_at", "-id")
+                .values_list("id", flat=True)
+            )
+        )
+
+    def test_page_number_pagination_is_available(self):
+        res = self.client.get(RESERVATION_URL, {"page": 3})
+
+        self.assertEqual(res.data["count"], 25)
+        self.assertEqual(len(res.data["results"]), 5)
+
+
+class ReservationSparseFieldsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test1@test1.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        planetarium_dome = PlanetariumDome.objects.create(
+            name="Dome Name",
+            rows=10,
+            seats_in_row=10,
+        )
+        self.show_session = ShowSession.objects.create(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(year=2023, month=3, day=1, hour=10)
+        )
+        for row in range(1, 4):
+            reservation = Reservation.objects.create(user=self.user)
+            for seat in range(1, 4):
+                Ticket.objects.create(
+                    show_session=self.show_session,
+                    reservation=reservation,
+                    row=row,
+                    seat=seat
+                )
+
+    def test_only_requested_fields_are_returned(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                RESERVATION_URL,
+                {"fields": "id,tickets.row,tickets.seat"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data["results"][0]), {"id", "tickets"})
+        self.assertEqual(
+            res.data["results"][0]["tickets"][0],
+            {"row": 3, "seat": 1}
+        )
+
+    def test_show_sessions_are_side_loaded_once(self):
+        res = self.client.get(RESERVATION_URL, {"expand": "show_sessions"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"][0]["tickets"][0]["show_session"],
+            self.show_session.id
+        )
+        self.assertEqual(
+            list(res.data["included"]["show_sessions"]),
+            [self.show_session.id]
+        )
+        self.assertEqual(
+            res.data["included"]["show_sessions"][self.show_session.id][
+                "astronomy_show_title"
+            ],
+            "Good Show"
+        )
+
+    def test_expanded_show_session_is_kept_with_sparse_ticket_fields(self):
+        res = self.client.get(
+            RESERVATION_URL,
+            {"fields": "tickets.seat", "expand": "show_sessions"}
+        )
+
+        self.assertEqual(
+            res.data["results"][0]["tickets"][0],
+            {"seat": 1, "show_session": self.show_session.id}
+        )
+
+
+class ReservationBulkCreationApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test1@test1.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        planetarium_dome = PlanetariumDome.objects.create(
+            name="Dome Name",
+            rows=10,
+            seats_in_row=10,
+        )
+        self.show_session1 = ShowSession.objects.create(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(year=2023, month=3, day=1, hour=10)
+        )
+        self.show_session2 = ShowSession.objects.create(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(year=2023, month=3, day=2, hour=10)
+        )
+
+    def tickets_payload(self, count, row=1):
+        return {
+            "tickets": [
+                {
+                    "row": row,
+                    "seat": seat,
+                    "show_session": show_session.id
+                }
+                for seat in range(1, count + 1)
+                for show_session in (self.show_session1, self.show_session2)
+            ]
+        }
+
+    def test_query_count_does_not_grow_with_tickets(self):
+        with self.assertNumQueries(11):
+            res = self.client.post(
+                RESERVATION_URL, self.tickets_payload(1), format="json"
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(11):
+            res = self.client.post(
+                RESERVATION_URL,
+                self.tickets_payload(10, row=2),
+                format="json"
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 20)
+        self.assertEqual(Ticket.objects.count(), 22)
+
+    def test_taken_seat_is_rejected(self):
+        self.client.post(
+            RESERVATION_URL, self.tickets_payload(1), format="json"
+        )
+
+        res = self.client.post(
+            RESERVATION_URL, self.tickets_payload(2), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][2], {})
+        self.assertEqual(
+            str(res.data["tickets"][0]["non_field_errors"][0]),
+            "The fields show_session, row, seat must make a unique set."
+        )
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_repeated_seat_in_one_request_is_rejected(self):
+        payload = self.tickets_payload(1)
+        payload["tickets"].append(payload["tickets"][0])
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("non_field_errors", res.data["tickets"][2])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_seat_out_of_range_is_rejected(self):
+        res = self.client.post(
+            RESERVATION_URL, self.tickets_payload(1, row=11), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("row", res.data["tickets"][0])
+
+    def test_unknown_show_session_is_rejected(self):
+        payload = {"tickets": [{"row": 1, "seat": 1, "show_session": 999}]}
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("show_session", res.data["tickets"][0])
+
+    def test_place_taken_after_validation_is_reported_as_conflict(self):
+        self.client.post(
+            RESERVATION_URL, self.tickets_payload(1), format="json"
+        )
+
+        with mock.patch(
+            "reservations.serializers.TicketBulkListSerializer"
+            ".find_unavailable_places",
+            mock.Mock(return_value=[]),
+        ):
+            res = self.client.post(
+                RESERVATION_URL, self.tickets_payload(2), format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["conflicts"],
+            [
+                {
+                    "show_session": self.show_session1.id,
+                    "row": 1,
+                    "seat": 1
+                },
+                {
+                    "show_session": self.show_session2.id,
+                    "row": 1,
+                    "seat": 1
+                },
+            ]
+        )
+        self.assertEqual(Reservation.objects.count(), 1)
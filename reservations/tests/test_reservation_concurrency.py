@@ -0,0 +1,126 @@
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
+from django.test import TransactionTestCase, skipUnlessDBFeature, tag
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow
+from reservations.models import ShowSession, Ticket
+
+RESERVATION_URL = reverse("reservations:reservation-list")
+
+THREADS = 8
+RESERVATIONS_PER_THREAD = 15
+TICKETS_PER_RESERVATION = 3
+
+
+@tag("benchmark")
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentReservationTests(TransactionTestCase):
+    """Stress test for bookings racing for the same places"""
+
+    def setUp(self):
+        astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        planetarium_dome = PlanetariumDome.objects.create(
+            name="Small Dome",
+            rows=5,
+            seats_in_row=10,
+        )
+        self.show_sessions = [
+            ShowSession.objects.create(
+                astronomy_show=astronomy_show,
+                planetarium_dome=planetarium_dome,
+                show_time=datetime(year=2023, month=3, day=day, hour=10)
+            )
+            for day in (1, 2)
+        ]
+        self.users = [
+            get_user_model().objects.create_user(
+                f"user{index}@test.com",
+                "testpass",
+            )
+            for index in range(THREADS)
+        ]
+
+    def book(self, user, seed, results):
+        client = APIClient()
+        client.force_authenticate(user)
+        randomizer = random.Random(seed)
+        try:
+            for _ in range(RESERVATIONS_PER_THREAD):
+                show_sessions = randomizer.sample(self.show_sessions, 2)
+                tickets = [
+                    {
+                        "show_session": show_session.id,
+                        "row": randomizer.randint(1, 5),
+                        "seat": randomizer.randint(1, 10),
+                    }
+                    for show_session in show_sessions
+                    for _ in range(TICKETS_PER_RESERVATION)
+                ]
+                res = client.post(
+                    RESERVATION_URL, {"tickets": tickets}, format="json"
+                )
+                results.append(
+                    (res.status_code, res.data if res.status_code == 201
+                     else None)
+                )
+        finally:
+            connection.close()
+
+    def test_no_place_is_booked_twice(self):
+        results = []
+        threads = [
+            threading.Thread(target=self.book, args=(user, index, results))
+            for index, user in enumerate(self.users)
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        status_codes = [status_code for status_code, _ in results]
+        self.assertEqual(len(results), THREADS * RESERVATIONS_PER_THREAD)
+        self.assertTrue(
+            set(status_codes) <= {
+                status.HTTP_201_CREATED,
+                status.HTTP_400_BAD_REQUEST,
+                status.HTTP_409_CONFLICT,
+            }
+        )
+        self.assertFalse(
+            Ticket.objects.values("show_session", "row", "seat")
+            .annotate(count=Count("id"))
+            .filter(count__gt=1)
+            .exists()
+        )
+        booked_tickets = sum(
+            len(data["tickets"]) for _, data in results if data
+        )
+        self.assertEqual(Ticket.objects.count(), booked_tickets)
+        for show_session in ShowSession.objects.all():
+            self.assertEqual(
+                show_session.tickets_sold,
+                show_session.tickets.count()
+            )
+
+        sys.stderr.write(
+            f"\n{len(results)} concurrent bookings in {elapsed:.2f}s "
+            f"({len(results) / elapsed:.1f} requests/s, "
+            f"{status_codes.count(201)} created, "
+            f"{status_codes.count(409)} conflicts, "
+            f"{status_codes.count(400)} rejected)\n"
+        )
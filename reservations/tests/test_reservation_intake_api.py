@@ -0,0 +1,147 @@
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow
+from reservations.models import ReservationIntake, ShowSession, Ticket
+from reservations.serializers import ReservationSerializer
+
+RESERVATION_URL = reverse("reservations:reservation-list")
+RESERVATION_INTAKE_URL = reverse("reservations:reservationintake-list")
+
+
+def process_intakes():
+    call_command("process_reservation_intakes", once=True, stdout=StringIO())
+
+
+class AsyncReservationApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test1@test1.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        planetarium_dome = PlanetariumDome.objects.create(
+            name="Dome Name",
+            rows=5,
+            seats_in_row=5,
+        )
+        self.show_session = ShowSession.objects.create(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(year=2023, month=3, day=1, hour=10)
+        )
+        self.payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "show_session": self.show_session.id},
+                {"row": 1, "seat": 2, "show_session": self.show_session.id},
+            ]
+        }
+
+    def test_async_reservation_is_queued(self):
+        res = self.client.post(
+            f"{RESERVATION_URL}?async=true", self.payload, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["status"], "pending")
+        self.assertIn(
+            reverse(
+                "reservations:reservationintake-detail",
+                args=[res.data["id"]]
+            ),
+            res.data["status_url"]
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_worker_books_queued_reservations(self):
+        res = self.client.post(
+            f"{RESERVATION_URL}?async=true", self.payload, format="json"
+        )
+
+        process_intakes()
+
+        status_res = self.client.get(res.data["status_url"])
+        self.assertEqual(status_res.data["status"], "done")
+        self.assertIsNotNone(status_res.data["reservation"])
+        self.assertEqual(
+            Ticket.objects.filter(
+                reservation_id=status_res.data["reservation"]
+            ).count(),
+            2
+        )
+
+    def test_worker_rejects_places_taken_earlier_in_batch(self):
+        self.client.post(
+            f"{RESERVATION_URL}?async=true", self.payload, format="json"
+        )
+        res = self.client.post(
+            f"{RESERVATION_URL}?async=true", self.payload, format="json"
+        )
+
+        process_intakes()
+
+        intake = ReservationIntake.objects.get(id=res.data["id"])
+        self.assertEqual(intake.status, ReservationIntake.Status.FAILED)
+        self.assertIn("tickets", intake.errors)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_worker_fails_only_the_broken_request(self):
+        broken = self.client.post(
+            f"{RESERVATION_URL}?async=true", self.payload, format="json"
+        )
+        self.payload["tickets"] = [
+            {"row": 2, "seat": 1, "show_session": self.show_session.id},
+        ]
+        res = self.client.post(
+            f"{RESERVATION_URL}?async=true", self.payload, format="json"
+        )
+        save = ReservationSerializer.save
+
+        def save_or_fail(serializer, **kwargs):
+            if len(serializer.validated_data["tickets"]) == 2:
+                raise RuntimeError("Unexpected failure")
+            return save(serializer, **kwargs)
+
+        with mock.patch.object(
+            ReservationSerializer, "save", autospec=True,
+            side_effect=save_or_fail,
+        ), self.assertLogs(
+            "reservations.management.commands.process_reservation_intakes"
+        ):
+            process_intakes()
+
+        intake = ReservationIntake.objects.get(id=broken.data["id"])
+        self.assertEqual(intake.status, ReservationIntake.Status.FAILED)
+        self.assertIn("non_field_errors", intake.errors)
+        self.assertEqual(
+            ReservationIntake.objects.get(id=res.data["id"]).status,
+            ReservationIntake.Status.DONE,
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_intakes_are_listed_for_current_user_only(self):
+        other_user = get_user_model().objects.create_user(
+            "test2@test2.com",
+            "testpass",
+        )
+        ReservationIntake.objects.create(user=other_user, payload={})
+        self.client.post(
+            f"{RESERVATION_URL}?async=true", self.payload, format="json"
+        )
+
+        res = self.client.get(RESERVATION_INTAKE_URL)
+
+        self.assertEqual(res.data["count"], 1)
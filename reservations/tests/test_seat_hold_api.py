@@ -0,0 +1,232 @@
+from datetime import datetime, timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow
+from reservations.models import SeatHold, ShowSession, Ticket
+
+SEAT_HOLD_URL = reverse("reservations:seathold-list")
+RESERVATION_URL = reverse("reservations:reservation-list")
+SHOW_SESSION_URL = reverse("reservations:showsession-list")
+
+
+class UnauthenticatedSeatHoldApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(SEAT_HOLD_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedSeatHoldApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test1@test1.com",
+            "testpass",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "test2@test2.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        planetarium_dome = PlanetariumDome.objects.create(
+            name="Dome Name",
+            rows=2,
+            seats_in_row=5,
+        )
+        self.show_session = ShowSession.objects.create(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(year=2023, month=3, day=1, hour=10)
+        )
+        self.places = [
+            {"row": 1, "seat": 1, "show_session": self.show_session.id},
+            {"row": 1, "seat": 2, "show_session": self.show_session.id},
+        ]
+
+    def test_hold_places(self):
+        res = self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        self.assertIn("expires_at", res.data[0])
+        self.assertEqual(
+            SeatHold.objects.filter(user=self.user).count(),
+            2
+        )
+
+    def test_held_places_reduce_tickets_available(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        res = self.client.get(SHOW_SESSION_URL)
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 8)
+
+    def test_holds_invalidate_cached_show_session_lists(self):
+        res = self.client.get(SHOW_SESSION_URL)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 10)
+
+        res = self.client.post(SEAT_HOLD_URL, self.places, format="json")
+        self.assertEqual(
+            self.client.get(SHOW_SESSION_URL).data["results"][0][
+                "tickets_available"
+            ],
+            8,
+        )
+
+        self.client.delete(
+            reverse("reservations:seathold-detail", args=[res.data[0]["id"]])
+        )
+        self.assertEqual(
+            self.client.get(SHOW_SESSION_URL).data["results"][0][
+                "tickets_available"
+            ],
+            9,
+        )
+
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        call_command("release_expired_seat_holds", stdout=StringIO())
+        self.assertEqual(
+            self.client.get(SHOW_SESSION_URL).data["results"][0][
+                "tickets_available"
+            ],
+            10,
+        )
+
+    def test_holding_place_again_refreshes_own_hold(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+        SeatHold.objects.update(expires_at=timezone.now())
+
+        res = self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.active().count(), 2)
+
+    def test_hold_cannot_be_extended_past_max_duration(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+        SeatHold.objects.update(
+            held_since=timezone.now() - timedelta(minutes=25)
+        )
+
+        res = self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        seat_hold = SeatHold.objects.first()
+        self.assertEqual(
+            seat_hold.expires_at,
+            seat_hold.held_since + timedelta(minutes=30),
+        )
+
+        SeatHold.objects.update(
+            held_since=timezone.now() - timedelta(minutes=30)
+        )
+        res = self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            str(res.data[0]["non_field_errors"][0]),
+            "This place was held too long to be held again."
+        )
+
+    @override_settings(SEAT_HOLD_MAX_PLACES=3)
+    def test_places_held_per_show_session_are_limited(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+        more_places = [
+            {"row": 2, "seat": seat, "show_session": self.show_session.id}
+            for seat in (1, 2)
+        ]
+
+        res = self.client.post(SEAT_HOLD_URL, more_places, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(SeatHold.objects.count(), 2)
+        res = self.client.post(
+            SEAT_HOLD_URL, self.places + more_places[:1], format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_place_held_by_another_user_cannot_be_held(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+        self.client.force_authenticate(self.other_user)
+
+        res = self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            str(res.data[0]["non_field_errors"][0]),
+            "This place is held by another user."
+        )
+
+    def test_place_held_by_another_user_cannot_be_reserved(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+        self.client.force_authenticate(self.other_user)
+
+        res = self.client.post(
+            RESERVATION_URL, {"tickets": self.places}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_expired_hold_does_not_block_other_users(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        self.client.force_authenticate(self.other_user)
+
+        res = self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_reservation_turns_holds_into_tickets(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        res = self.client.post(
+            RESERVATION_URL, {"tickets": self.places}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_release_hold(self):
+        res = self.client.post(SEAT_HOLD_URL, self.places, format="json")
+
+        res = self.client.delete(
+            reverse("reservations:seathold-detail", args=[res.data[0]["id"]])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_release_expired_seat_holds_command(self):
+        self.client.post(SEAT_HOLD_URL, self.places, format="json")
+        SeatHold.objects.filter(seat=1).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        call_command(
+            "release_expired_seat_holds", batch_size=1, stdout=StringIO()
+        )
+
+        self.assertEqual(
+            list(SeatHold.objects.values_list("seat", flat=True)),
+            [2]
+        )
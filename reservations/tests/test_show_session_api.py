@@ -1,5 +1,9 @@
+import base64
+import csv
+import json
 from datetime import datetime
 from django.db.models import Count, F
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -7,13 +11,15 @@ from rest_framework import status
 from rest_framework.test import APIClient
 from domes.models import PlanetariumDome
 from shows.models import ShowTheme, AstronomyShow
-from reservations.models import ShowSession
+from reservations.models import Reservation, ShowSession, Ticket
 from reservations.serializers import (
     ShowSessionListSerializer,
     ShowSessionDetailSerializer
 )
 
 SHOW_SESSION_URL = reverse("reservations:showsession-list")
+CACHE_STATS_URL = reverse("reservations:showsession-cache-stats")
+CALENDAR_URL = reverse("reservations:showsession-calendar")
 
 
 def detail_url(show_session_id):
@@ -23,6 +29,20 @@ def detail_url(show_session_id):
     )
 
 
+def seat_map_url(show_session_id):
+    return reverse(
+        "reservations:showsession-seat-map",
+        args=[show_session_id]
+    )
+
+
+def manifest_url(show_session_id):
+    return reverse(
+        "reservations:showsession-manifest",
+        args=[show_session_id]
+    )
+
+
 class UnauthenticatedShowSessionApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -34,6 +54,7 @@ class UnauthenticatedShowSessionApiTests(TestCase):
 
 class AuthenticatedShowSessionApiTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "test@test.test",
@@ -80,7 +101,7 @@ class AuthenticatedShowSessionApiTests(TestCase):
         serializer = ShowSessionListSerializer(show_sessions, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_filter_show_sessions_by_date(self):
         date = datetime(
@@ -117,7 +138,7 @@ class AuthenticatedShowSessionApiTests(TestCase):
         )
         serializer = ShowSessionListSerializer(queryset, many=True)
 
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data["results"])
 
     def test_filter_show_sessions_by_astronomy_show(self):
         show_theme = ShowTheme.objects.create(name="Dark Space")
@@ -162,7 +183,45 @@ class AuthenticatedShowSessionApiTests(TestCase):
         )
         serializer = ShowSessionListSerializer(queryset, many=True)
 
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data["results"])
+
+    def test_filter_show_sessions_by_show_time_range(self):
+        res = self.client.get(
+            SHOW_SESSION_URL,
+            {"from": "2022-03-02T14:00", "to": "2022-03-03T14:00"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [session["show_time"] for session in res.data["results"]],
+            ["2022-03-02T14:00:00"]
+        )
+
+    def test_invalid_show_time_range_is_rejected(self):
+        res = self.client.get(SHOW_SESSION_URL, {"from": "tomorrow"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("from", res.data)
+
+    def test_show_sessions_are_paginated_by_show_time(self):
+        show_sessions = list(ShowSession.objects.values_list("id", flat=True))
+        for _ in range(20):
+            ShowSession.objects.create(
+                astronomy_show=self.astronomy_show,
+                planetarium_dome=self.planetarium_dome,
+                show_time=datetime(2022, 3, 3, 14, 0)
+            )
+
+        first_page = self.client.get(SHOW_SESSION_URL).data
+        second_page = self.client.get(first_page["next"]).data
+
+        self.assertEqual(len(first_page["results"]), 20)
+        self.assertEqual(
+            [session["id"] for session in first_page["results"][:3]],
+            show_sessions
+        )
+        self.assertEqual(len(second_page["results"]), 3)
+        self.assertIsNone(second_page["next"])
 
     def test_show_session_creation_is_prohibited(self):
         date = datetime(
@@ -214,9 +273,205 @@ class AuthenticatedShowSessionApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_show_session_list_is_cached(self):
+        self.client.get(SHOW_SESSION_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(SHOW_SESSION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_new_ticket_invalidates_lists_of_its_show_session(self):
+        show_session = ShowSession.objects.first()
+        date = show_session.show_time.date().isoformat()
+        other_date = ShowSession.objects.last().show_time.date().isoformat()
+        for params in ({}, {"date": date}, {"date": other_date}):
+            self.client.get(SHOW_SESSION_URL, params)
+
+        Ticket.objects.create(
+            show_session=show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1
+        )
+
+        res = self.client.get(SHOW_SESSION_URL)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 5)
+        res = self.client.get(SHOW_SESSION_URL, {"date": date})
+        self.assertEqual(res.data["results"][0]["tickets_available"], 5)
+        with self.assertNumQueries(0):
+            self.client.get(SHOW_SESSION_URL, {"date": other_date})
+
+    def test_new_ticket_modifies_show_session_detail(self):
+        show_session = ShowSession.objects.first()
+        res = self.client.get(detail_url(show_session.id))
+        self.assertIn("max-age=0", res["Cache-Control"])
+        etag = res["ETag"]
+
+        res = self.client.get(
+            detail_url(show_session.id), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Ticket.objects.create(
+            show_session=show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1
+        )
+        res = self.client.get(
+            detail_url(show_session.id), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["taken_places"]), 1)
+
+    def test_catalog_change_invalidates_all_lists(self):
+        self.client.get(SHOW_SESSION_URL)
+
+        self.astronomy_show.title = "Better Show"
+        self.astronomy_show.save()
+
+        res = self.client.get(SHOW_SESSION_URL)
+        self.assertEqual(
+            res.data["results"][0]["astronomy_show_title"], "Better Show"
+        )
+
+    def test_month_calendar(self):
+        ShowSession.objects.create(
+            astronomy_show=self.astronomy_show,
+            planetarium_dome=self.planetarium_dome,
+            show_time=datetime(2022, 3, 1, 18, 0)
+        )
+        ShowSession.objects.create(
+            astronomy_show=self.astronomy_show,
+            planetarium_dome=self.planetarium_dome,
+            show_time=datetime(2022, 4, 1, 18, 0)
+        )
+        Ticket.objects.create(
+            show_session=ShowSession.objects.first(),
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1
+        )
+
+        with self.assertNumQueries(1):
+            res = self.client.get(CALENDAR_URL, {"month": "2022-03"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["month"], "2022-03")
+        self.assertEqual(
+            [dict(day) for day in res.data["days"]],
+            [
+                {
+                    "date": "2022-03-01",
+                    "show_sessions": 2,
+                    "capacity": 12,
+                    "tickets_sold": 1,
+                },
+                {
+                    "date": "2022-03-02",
+                    "show_sessions": 1,
+                    "capacity": 6,
+                    "tickets_sold": 0,
+                },
+                {
+                    "date": "2022-03-03",
+                    "show_sessions": 1,
+                    "capacity": 6,
+                    "tickets_sold": 0,
+                },
+            ]
+        )
+
+    def test_month_calendar_defaults_to_current_month(self):
+        res = self.client.get(CALENDAR_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["month"], f"{datetime.now():%Y-%m}")
+
+    def test_month_calendar_is_cached_until_a_ticket_is_sold(self):
+        self.client.get(CALENDAR_URL, {"month": "2022-03"})
+        with self.assertNumQueries(0):
+            self.client.get(CALENDAR_URL, {"month": "2022-03"})
+
+        Ticket.objects.create(
+            show_session=ShowSession.objects.last(),
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1
+        )
+        res = self.client.get(CALENDAR_URL, {"month": "2022-03"})
+
+        self.assertEqual(res.data["days"][2]["tickets_sold"], 1)
+
+    def test_show_session_manifest_requires_admin(self):
+        show_session = ShowSession.objects.first()
+
+        res = self.client.get(manifest_url(show_session.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_show_session_manifest_errors_are_json(self):
+        show_session = ShowSession.objects.first()
+
+        for manifest_format in ("csv", "ndjson"):
+            res = self.client.get(
+                manifest_url(show_session.id), {"format": manifest_format}
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+            self.assertEqual(res["Content-Type"], "application/json")
+            self.assertIn("detail", res.json())
+
+    def test_seat_map_packs_taken_places(self):
+        show_session = ShowSession.objects.first()
+        reservation = Reservation.objects.create(user=self.user)
+        for row, seat in [(1, 1), (2, 2), (2, 3)]:
+            Ticket.objects.create(
+                show_session=show_session,
+                reservation=reservation,
+                row=row,
+                seat=seat
+            )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(seat_map_url(show_session.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["rows"], 2)
+        self.assertEqual(res.data["seats_in_row"], 3)
+        self.assertEqual(
+            base64.b64decode(res.data["taken_places"]),
+            bytes([0b10001100])
+        )
+
+    def test_retrieve_show_session_with_taken_places_bitmap(self):
+        show_session = ShowSession.objects.first()
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            show_session=show_session,
+            reservation=reservation,
+            row=2,
+            seat=3
+        )
+
+        res = self.client.get(
+            detail_url(show_session.id),
+            {"taken_places": "bitmap"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["planetarium_dome"]["rows"], 2)
+        self.assertEqual(
+            base64.b64decode(res.data["taken_places"]),
+            bytes([0b00000100])
+        )
+
 
 class AdminShowSessionApiTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "test@test.test",
@@ -281,3 +536,60 @@ class AdminShowSessionApiTests(TestCase):
             res.data["planetarium_dome"],
             show_session.planetarium_dome.id
         )
+
+    def test_show_session_list_cache_stats(self):
+        self.client.get(SHOW_SESSION_URL)
+        self.client.get(SHOW_SESSION_URL)
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"hits": 1, "misses": 1})
+
+    def test_show_session_manifest_is_streamed(self):
+        show_session = ShowSession.objects.first()
+        reservation = Reservation.objects.create(user=self.user)
+        for row, seat in [(2, 1), (1, 3)]:
+            Ticket.objects.create(
+                show_session=show_session,
+                reservation=reservation,
+                row=row,
+                seat=seat
+            )
+
+        res = self.client.get(manifest_url(show_session.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(
+            csv.reader(
+                b"".join(res.streaming_content).decode().splitlines()
+            )
+        )
+        self.assertEqual(
+            rows[0],
+            ["ticket_id", "row", "seat", "reservation_id", "email",
+             "reserved_at"]
+        )
+        self.assertEqual(
+            [row[1:3] + row[4:5] for row in rows[1:]],
+            [["1", "3", self.user.email], ["2", "1", self.user.email]]
+        )
+
+    def test_show_session_manifest_as_ndjson(self):
+        show_session = ShowSession.objects.first()
+        Ticket.objects.create(
+            show_session=show_session,
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1
+        )
+
+        res = self.client.get(
+            manifest_url(show_session.id),
+            {"format": "ndjson"}
+        )
+
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["email"], self.user.email)
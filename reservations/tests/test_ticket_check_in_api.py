@@ -0,0 +1,172 @@
+from datetime import datetime
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from domes.models import PlanetariumDome
+from shows.models import AstronomyShow
+from reservations.models import Reservation, ShowSession, Ticket
+from reservations.ticket_codes import (
+    make_ticket_code,
+    read_ticket_code,
+)
+
+CHECK_IN_URL = reverse("reservations:ticket-check-in")
+
+
+def ticket_codes_url(show_session_id):
+    return reverse(
+        "reservations:showsession-ticket-codes",
+        args=[show_session_id]
+    )
+
+
+class TicketCodeTests(TestCase):
+    def test_ticket_code_round_trip(self):
+        code = make_ticket_code(12, 3, 4, 5)
+
+        self.assertEqual(read_ticket_code(code), (12, 3, 4, 5))
+
+    def test_ticket_code_of_64_bit_ids(self):
+        code = make_ticket_code(2**40, 2**33, 4, 5)
+
+        self.assertEqual(read_ticket_code(code), (2**40, 2**33, 4, 5))
+
+    def test_tampered_ticket_code_is_rejected(self):
+        code = make_ticket_code(12, 3, 4, 5)
+        tampered = ("B" if code[0] == "A" else "A") + code[1:]
+
+        self.assertIsNone(read_ticket_code(tampered))
+        self.assertIsNone(read_ticket_code("not a code"))
+        self.assertIsNone(read_ticket_code(code[:-2]))
+
+
+class TicketCheckInApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com",
+            "testpass",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+        astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        planetarium_dome = PlanetariumDome.objects.create(
+            name="Dome Name",
+            rows=5,
+            seats_in_row=5,
+        )
+        self.show_session = ShowSession.objects.create(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_time=datetime(year=2023, month=3, day=1, hour=10)
+        )
+        reservation = Reservation.objects.create(user=self.user)
+        self.tickets = [
+            Ticket.objects.create(
+                show_session=self.show_session,
+                reservation=reservation,
+                row=1,
+                seat=seat
+            )
+            for seat in (1, 2)
+        ]
+
+    def test_check_in_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@user.com", "pass")
+        )
+
+        res = self.client.post(
+            CHECK_IN_URL, {"codes": [self.tickets[0].code]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_check_in_batch_of_codes(self):
+        codes = [ticket.code for ticket in self.tickets]
+
+        with self.assertNumQueries(1):
+            res = self.client.post(
+                CHECK_IN_URL, {"codes": codes}, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]],
+            ["checked_in", "checked_in"]
+        )
+        self.assertEqual(
+            Ticket.objects.filter(checked_in_at__isnull=False).count(),
+            2
+        )
+
+    def test_check_in_reports_repeated_and_invalid_codes(self):
+        self.client.post(
+            CHECK_IN_URL, {"codes": [self.tickets[0].code]}, format="json"
+        )
+        deleted_ticket_code = make_ticket_code(
+            999, self.show_session.id, 1, 3
+        )
+
+        res = self.client.post(
+            CHECK_IN_URL,
+            {
+                "codes": [
+                    self.tickets[0].code,
+                    self.tickets[1].code,
+                    "forged",
+                    deleted_ticket_code,
+                ],
+            },
+            format="json"
+        )
+
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]],
+            ["already_checked_in", "checked_in", "invalid", "invalid"]
+        )
+
+    def test_code_repeated_in_batch_is_checked_in_once(self):
+        code = self.tickets[0].code
+
+        res = self.client.post(
+            CHECK_IN_URL, {"codes": [code, code, code]}, format="json"
+        )
+
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]],
+            ["checked_in", "already_checked_in", "already_checked_in"]
+        )
+
+    def test_check_in_rejects_ticket_for_another_show_session(self):
+        res = self.client.post(
+            CHECK_IN_URL,
+            {
+                "codes": [self.tickets[0].code],
+                "show_session": self.show_session.id + 1,
+            },
+            format="json"
+        )
+
+        self.assertEqual(
+            res.data["results"][0]["status"],
+            "wrong_show_session"
+        )
+        self.assertFalse(
+            Ticket.objects.filter(checked_in_at__isnull=False).exists()
+        )
+
+    def test_ticket_codes_of_show_session(self):
+        res = self.client.get(ticket_codes_url(self.show_session.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [ticket["code"] for ticket in res.data],
+            [ticket.code for ticket in self.tickets]
+        )
@@ -0,0 +1,50 @@
+import base64
+import binascii
+import struct
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+TICKET_CODE_SALT = "reservations.ticket-code"
+# Ticket and show session ids are 64-bit (BigAutoField)
+TICKET_CODE_FORMAT = struct.Struct(">QQII")
+SIGNATURE_LENGTH = 12
+
+
+def _signature(payload):
+    return salted_hmac(
+        TICKET_CODE_SALT, payload, algorithm="sha256"
+    ).digest()[:SIGNATURE_LENGTH]
+
+
+def make_ticket_code(ticket_id, show_session_id, row, seat):
+    """
+    Return a compact url-safe code holding the ticket id, show session
+    id, row and seat, signed with SECRET_KEY
+    """
+    payload = TICKET_CODE_FORMAT.pack(ticket_id, show_session_id, row, seat)
+    return (
+        base64.urlsafe_b64encode(payload + _signature(payload))
+        .rstrip(b"=")
+        .decode("ascii")
+    )
+
+
+def read_ticket_code(code):
+    """
+    Return (ticket id, show session id, row, seat) of a ticket code or
+    None when the code is malformed or its signature does not match.
+    No database access is needed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(code + "=" * (-len(code) % 4))
+    except (binascii.Error, TypeError, ValueError):
+        return None
+
+    if len(data) != TICKET_CODE_FORMAT.size + SIGNATURE_LENGTH:
+        return None
+
+    payload = data[:TICKET_CODE_FORMAT.size]
+    signature = data[TICKET_CODE_FORMAT.size:]
+    if not constant_time_compare(signature, _signature(payload)):
+        return None
+
+    return TICKET_CODE_FORMAT.unpack(payload)
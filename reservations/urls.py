@@ -1,13 +1,40 @@
 from django.urls import path, include
 from rest_framework import routers
-from reservations.views import ReservationViewSet, ShowSessionViewSet
+from reservations.views import (
+    AsyncShowSessionDetailView,
+    AsyncShowSessionListView,
+    ReservationViewSet,
+    ReservationIntakeViewSet,
+    ShowSessionViewSet,
+    SeatHoldViewSet,
+    ShowSessionSeatEventsView,
+    TicketCheckInView,
+)
 
 router = routers.DefaultRouter()
 router.register("reservations", ReservationViewSet)
 router.register("show-sessions", ShowSessionViewSet)
+router.register("seat-holds", SeatHoldViewSet)
+router.register("reservation-intakes", ReservationIntakeViewSet)
 
 urlpatterns = [
-    path("", include(router.urls))
+    path("", include(router.urls)),
+    path("check-in/", TicketCheckInView.as_view(), name="ticket-check-in"),
+    path(
+        "show-sessions/<int:pk>/seat-events/",
+        ShowSessionSeatEventsView.as_view(),
+        name="showsession-seat-events",
+    ),
+    path(
+        "async/show-sessions/",
+        AsyncShowSessionListView.as_view(),
+        name="showsession-list-async",
+    ),
+    path(
+        "async/show-sessions/<int:pk>/",
+        AsyncShowSessionDetailView.as_view(),
+        name="showsession-detail-async",
+    ),
 ]
 
 app_name = "reservations"
@@ -1,65 +1,380 @@
-from datetime import datetime
-from django.db.models import Count, F
+import csv
+import json
+from datetime import datetime, time, timedelta
+from urllib.parse import urlencode
+from django.conf import settings
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.views import View
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import mixins, viewsets
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import generics, mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    NotAuthenticated,
+    NotFound,
+    ValidationError,
+)
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
+from domes.models import PlanetariumDome
+from planetarium_service.async_views import (
+    AsyncReadView,
+    api_error_response,
+)
+from planetarium_service.conditional import (
+    ConditionalGetMixin,
+    bump_model_versions,
+)
+from shows.models import AstronomyShow
+from user.authentication import AsyncJWTAuthentication
 from user.permissions import IsAdminOrIfAuthenticatedReadOnly
-from reservations.models import ShowSession, Reservation
+from reservations.models import (
+    ShowSession,
+    Reservation,
+    ReservationIntake,
+    SeatHold,
+    Ticket,
+)
 from reservations.serializers import (
+    CatalogSnapshotSerializer,
     ShowSessionListSerializer,
     ShowSessionDetailSerializer,
+    ShowSessionDetailBitmapSerializer,
+    ShowSessionSeatMapSerializer,
+    ShowSessionCalendarSerializer,
     ShowSessionSerializer,
     ReservationSerializer,
-    ReservationListSerializer
+    ReservationListSerializer,
+    ReservationSparseSerializer,
+    ReservationIntakeSerializer,
+    BestAvailableReservationSerializer,
+    SeatHoldSerializer,
+    TicketCheckInSerializer,
+    TicketCodeSerializer,
+)
+from reservations.allocation import FreeSeatIndex
+from reservations.caching import (
+    get_show_session_calendar,
+    get_show_session_list,
+    invalidate_show_session_lists_by_id,
+    set_show_session_calendar,
+    set_show_session_list,
+    show_session_calendar_key,
+    show_session_list_cache_stats,
+    show_session_list_key,
+)
+from reservations.live import publish_seat_changes, seat_events
+from reservations.snapshot import get_catalog_snapshot
+from reservations.ticket_codes import read_ticket_code
+
+ACTIVE_SEAT_HOLDS_COUNT = (
+    SeatHold.objects.active()
+    .filter(show_session=OuterRef("pk"))
+    .order_by()
+    .values("show_session")
+    .annotate(count=Count("id"))
+    .values("count")
+)
+
+MANIFEST_FIELDS = (
+    "ticket_id",
+    "row",
+    "seat",
+    "reservation_id",
+    "email",
+    "reserved_at",
 )
+MANIFEST_CHUNK_SIZE = 2000
+
+
+class ManifestRenderer(BaseRenderer):
+    """
+    Manifests are streamed by the view itself, the renderer only
+    selects the format. Errors are rendered as JSON by the view.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data) + "\n"
+
+
+class CSVRenderer(ManifestRenderer):
+    media_type = "text/csv"
+    format = "csv"  # noqa: VNE003
+
+
+class NDJSONRenderer(ManifestRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"  # noqa: VNE003
+
+
+class Echo:
+    """File-like object whose write() returns the written value"""
+
+    def write(self, value):
+        return value
+
+
+def manifest_lines(tickets, manifest_format):
+    """Yield the manifest in chunks of encoded csv or ndjson lines"""
+    writer = csv.writer(Echo())
+    if manifest_format == "csv":
+        yield writer.writerow(MANIFEST_FIELDS)
+
+    lines = []
+    for ticket in tickets:
+        if manifest_format == "csv":
+            lines.append(writer.writerow(ticket))
+        else:
+            lines.append(
+                json.dumps(
+                    dict(zip(MANIFEST_FIELDS, ticket)),
+                    default=datetime.isoformat
+                ) + "\n"
+            )
+        if len(lines) == MANIFEST_CHUNK_SIZE:
+            yield "".join(lines)
+            lines = []
+
+    if lines:
+        yield "".join(lines)
+
+
+def today():
+    """Current date, localdate() needs aware datetimes"""
+    if settings.USE_TZ:
+        return timezone.localdate()
+    return timezone.now().date()
+
 
+def start_of_day(date):
+    day_start = datetime.combine(date, time.min)
+    if settings.USE_TZ:
+        return timezone.make_aware(day_start)
+    return day_start
 
-class ShowSessionViewSet(viewsets.ModelViewSet):
+
+class ShowSessionPagination(CursorPagination):
+    """Keyset pagination, pages never scan the sessions before them"""
+
+    page_size = 20
+    ordering = ("show_time", "id")
+
+
+class ShowSessionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = (
         ShowSession.objects.select_related(
             "astronomy_show",
             "planetarium_dome"
-        ).order_by("show_time")
+        ).order_by("show_time", "id")
         .annotate(
             tickets_available=(
                 F("planetarium_dome__rows")
                 * F("planetarium_dome__seats_in_row")
-                - Count("tickets")
+                - F("tickets_sold")
+                - Coalesce(Subquery(ACTIVE_SEAT_HOLDS_COUNT), 0)
             )
         )
     )
     serializer_class = ShowSessionListSerializer
+    pagination_class = ShowSessionPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    conditional_models = (
+        ShowSession,
+        AstronomyShow,
+        PlanetariumDome,
+        Ticket,
+        SeatHold,
+    )
+    # Availability changes with every sale, so clients always revalidate
+    cache_max_age = 0
 
     def get_queryset(self):
-        date = self.request.query_params.get("date")
-        astronomy_show_id_str = self.request.query_params.get("astronomy_show")
+        if self.action == "seat_map":
+            return ShowSession.objects.select_related("planetarium_dome")
 
-        queryset = self.queryset
+        if self.action in ("manifest", "ticket_codes", "calendar"):
+            return ShowSession.objects.all()
 
-        if date:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(show_time__date=date)
+        date, astronomy_show_id = self.get_filters()
+        show_time_from, show_time_to = self.get_show_time_range()
 
-        if astronomy_show_id_str:
+        queryset = super().get_queryset()
+
+        # Half-open ranges on the bare column, so the show time indexes
+        # are used instead of casting every row to a date
+        if date:
             queryset = queryset.filter(
-                astronomy_show_id=int(astronomy_show_id_str)
+                show_time__gte=start_of_day(date),
+                show_time__lt=start_of_day(date + timedelta(days=1)),
             )
 
+        if show_time_from:
+            queryset = queryset.filter(show_time__gte=show_time_from)
+
+        if show_time_to:
+            queryset = queryset.filter(show_time__lt=show_time_to)
+
+        if astronomy_show_id:
+            queryset = queryset.filter(astronomy_show_id=astronomy_show_id)
+
         return queryset
 
+    def get_query_param(self, name, field):
+        """Return the query parameter converted by the serializer field"""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return field.to_internal_value(value)
+        except ValidationError as error:
+            raise ValidationError({name: error.detail})
+
+    def get_filters(self):
+        """Return the normalized (date, astronomy show id) filters"""
+        return (
+            self.get_query_param("date", serializers.DateField()),
+            self.get_query_param("astronomy_show", serializers.IntegerField()),
+        )
+
+    def get_show_time_range(self):
+        """Return the [from, to) show time range, each end is optional"""
+        return (
+            self.get_query_param("from", serializers.DateTimeField()),
+            self.get_query_param("to", serializers.DateTimeField()),
+        )
+
     def get_serializer_class(self):
         if self.action == "list":
             return ShowSessionListSerializer
 
         if self.action == "retrieve":
+            if self.request.query_params.get("taken_places") == "bitmap":
+                return ShowSessionDetailBitmapSerializer
             return ShowSessionDetailSerializer
 
+        if self.action == "seat_map":
+            return ShowSessionSeatMapSerializer
+
+        if self.action == "ticket_codes":
+            return TicketCodeSerializer
+
+        if self.action == "calendar":
+            return ShowSessionCalendarSerializer
+
         return ShowSessionSerializer
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Error details are JSON whatever manifest format was requested
+        if getattr(response, "exception", False) and isinstance(
+            getattr(request, "accepted_renderer", None), ManifestRenderer
+        ):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    @action(methods=["GET"], detail=True, url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        """
+        Endpoint for dome geometry with taken places packed into
+        a base64 encoded bitset
+        """
+        serializer = self.get_serializer(self.get_object())
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "format",
+                type=OpenApiTypes.STR,
+                enum=["csv", "ndjson"],
+                description="Manifest format (ex. ?format=ndjson)",
+            ),
+        ]
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        permission_classes=[IsAdminUser],
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def manifest(self, request, pk=None):
+        """
+        Endpoint for streaming all tickets of a show session with the
+        emails of their owners, without loading them into memory
+        """
+        show_session = self.get_object()
+        manifest_format = request.accepted_renderer.format
+        tickets = (
+            Ticket.objects.filter(show_session=show_session)
+            .order_by("row", "seat")
+            .values_list(
+                "id",
+                "row",
+                "seat",
+                "reservation_id",
+                "reservation__user__email",
+                "reservation__created_at",
+            )
+            .iterator(chunk_size=MANIFEST_CHUNK_SIZE)
+        )
+
+        response = StreamingHttpResponse(
+            manifest_lines(tickets, manifest_format),
+            content_type=request.accepted_renderer.media_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="show-session-{show_session.id}'
+            f'-manifest.{manifest_format}"'
+        )
+        return response
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="ticket-codes",
+        permission_classes=[IsAdminUser],
+    )
+    def ticket_codes(self, request, pk=None):
+        """
+        Endpoint for downloading the signed codes of all tickets of
+        a show session, so scanners can validate tickets offline
+        """
+        tickets = Ticket.objects.filter(
+            show_session=self.get_object()
+        ).only("id", "show_session_id", "row", "seat", "checked_in_at")
+        serializer = self.get_serializer(tickets, many=True)
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "taken_places",
+                type=OpenApiTypes.STR,
+                enum=["bitmap"],
+                description=(
+                    "Return taken places as a base64 encoded bitset "
+                    "(ex. ?taken_places=bitmap)"
+                ),
+            ),
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -78,10 +393,121 @@ class ShowSessionViewSet(viewsets.ModelViewSet):
                     "(ex. ?date=2022-10-23)"
                 ),
             ),
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATETIME,
+                description=(
+                    "Show sessions starting at or after the datetime "
+                    "(ex. ?from=2022-10-23T18:00)"
+                ),
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATETIME,
+                description=(
+                    "Show sessions starting before the datetime "
+                    "(ex. ?to=2022-10-24T00:00)"
+                ),
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            self.cached_list, request, *args, **kwargs
+        )
+
+    def cached_list(self, request, *args, **kwargs):
+        page_params = urlencode(
+            [
+                (name, request.query_params[name])
+                for name in ("from", "to", "cursor")
+                if name in request.query_params
+            ]
+        )
+        cache_key = show_session_list_key(
+            *self.get_filters(),
+            f"{request.build_absolute_uri('/')}?{page_params}"
+        )
+        data = get_show_session_list(cache_key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        set_show_session_list(cache_key, response.data)
+        return response
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "month",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Month of the calendar, the current one by default "
+                    "(ex. ?month=2022-10)"
+                ),
+            ),
+            OpenApiParameter(
+                "astronomy_show",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Filter by astronomy show id "
+                    "(ex. ?astronomy_show=2)"
+                ),
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False)
+    def calendar(self, request):
+        """
+        Endpoint for the number of show sessions, capacity and seats
+        sold of every day of a month that has show sessions
+        """
+        month = self.get_query_param(
+            "month", serializers.DateField(input_formats=["%Y-%m"])
+        ) or today().replace(day=1)
+        astronomy_show_id = self.get_query_param(
+            "astronomy_show", serializers.IntegerField()
+        )
+
+        cache_key = show_session_calendar_key(month, astronomy_show_id)
+        data = get_show_session_calendar(cache_key)
+        if data is not None:
+            return Response(data)
+
+        next_month = (month + timedelta(days=31)).replace(day=1)
+        queryset = self.get_queryset().filter(
+            show_time__gte=start_of_day(month),
+            show_time__lt=start_of_day(next_month),
+        )
+        if astronomy_show_id:
+            queryset = queryset.filter(astronomy_show_id=astronomy_show_id)
+
+        days = (
+            queryset.annotate(date=TruncDate("show_time"))
+            .values("date")
+            .annotate(
+                show_sessions=Count("id"),
+                capacity=Sum(
+                    F("planetarium_dome__rows")
+                    * F("planetarium_dome__seats_in_row")
+                ),
+                tickets_sold=Sum("tickets_sold"),
+            )
+            .order_by("date")
+        )
+        serializer = self.get_serializer({"month": month, "days": days})
+        set_show_session_calendar(cache_key, serializer.data)
+        return Response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="cache-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """Endpoint for hit and miss counters of the cached list"""
+        return Response(show_session_list_cache_stats())
 
 
 class ReservationPagination(PageNumberPagination):
@@ -89,6 +515,11 @@ class ReservationPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class ReservationCursorPagination(CursorPagination):
+    page_size = 10
+    ordering = ("-created_at", "-id")
+
+
 class ReservationViewSet(
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -99,17 +530,365 @@ class ReservationViewSet(
         "tickets__show_session__planetarium_dome",
     )
     serializer_class = ReservationSerializer
-    pagination_class = ReservationPagination
+    pagination_class = ReservationCursorPagination
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user)
+        queryset = self.queryset
+        if self.action == "list" and self.is_sparse:
+            queryset = Reservation.objects.prefetch_related("tickets")
+
+        return queryset.filter(user=self.request.user).order_by(
+            "-created_at", "-id"
+        )
+
+    @property
+    def is_sparse(self):
+        query_params = self.request.query_params
+        return "fields" in query_params or "expand" in query_params
+
+    def get_sparse_fields(self):
+        """
+        Split ?fields=id,tickets.row,tickets.seat into reservation
+        and ticket fields, None meaning all of them
+        """
+        fields = self.request.query_params.get("fields")
+        if not fields:
+            return None, None
+
+        reservation_fields = set()
+        ticket_fields = set()
+        for field in fields.split(","):
+            field_name, _, ticket_field_name = field.strip().partition(".")
+            reservation_fields.add(field_name)
+            if field_name == "tickets" and ticket_field_name:
+                ticket_fields.add(ticket_field_name)
+
+        if ticket_fields and "show_sessions" in self.get_expand():
+            ticket_fields.add("show_session")
+
+        return reservation_fields, ticket_fields or None
+
+    def get_expand(self):
+        expand = self.request.query_params.get("expand", "")
+        return {name.strip() for name in expand.split(",") if name.strip()}
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "list" and self.is_sparse:
+            kwargs["fields"], kwargs["ticket_fields"] = (
+                self.get_sparse_fields()
+            )
+        return super().get_serializer(*args, **kwargs)
+
+    @property
+    def paginator(self):
+        """
+        Cursor pagination by default, page number pagination
+        when a page is requested (ex. ?page=2)
+        """
+        if not hasattr(self, "_paginator"):
+            if "page" in self.request.query_params:
+                self._paginator = ReservationPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_serializer_class(self):
         if self.action == "list":
+            if self.is_sparse:
+                return ReservationSparseSerializer
             return ReservationListSerializer
 
+        if self.action == "best_available":
+            return BestAvailableReservationSerializer
+
         return ReservationSerializer
 
+    @action(methods=["POST"], detail=False, url_path="best-available")
+    def best_available(self, request):
+        """
+        Endpoint for booking a number of places chosen by the server,
+        together if possible and in the preferred rows first
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reservation = serializer.save(user=request.user)
+        return Response(
+            ReservationSerializer(reservation).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "page",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Use page number pagination instead of cursor "
+                    "pagination (ex. ?page=2)"
+                ),
+            ),
+            OpenApiParameter(
+                "fields",
+                type={"type": "list", "items": {"type": "string"}},
+                description=(
+                    "Return only these reservation and ticket fields, "
+                    "show sessions become ids "
+                    "(ex. ?fields=id,tickets.row,tickets.seat)"
+                ),
+            ),
+            OpenApiParameter(
+                "expand",
+                type={"type": "list", "items": {"type": "string"}},
+                enum=["show_sessions"],
+                description=(
+                    "Side-load the show sessions of the page once into "
+                    "`included`, keyed by id (ex. ?expand=show_sessions)"
+                ),
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+
+        if "show_sessions" in self.get_expand():
+            show_session_ids = {
+                ticket.show_session_id
+                for reservation in self.paginator.page
+                for ticket in reservation.tickets.all()
+            }
+            show_sessions = ShowSession.objects.select_related(
+                "astronomy_show",
+                "planetarium_dome"
+            ).filter(id__in=show_session_ids)
+            response.data["included"] = {
+                "show_sessions": {
+                    show_session["id"]: show_session
+                    for show_session in ShowSessionListSerializer(
+                        show_sessions,
+                        many=True,
+                        context=self.get_serializer_context()
+                    ).data
+                }
+            }
+
+        return response
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "async",
+                type=OpenApiTypes.BOOL,
+                description=(
+                    "Queue the reservation and process it in the "
+                    "background, the response contains a status url "
+                    "(ex. ?async=true)"
+                ),
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs):
+        if request.query_params.get("async") != "true":
+            return super().create(request, *args, **kwargs)
+
+        intake = ReservationIntake.objects.create(
+            user=request.user,
+            payload=request.data
+        )
+        serializer = ReservationIntakeSerializer(
+            intake,
+            context=self.get_serializer_context()
+        )
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class ReservationIntakeViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    GenericViewSet,
+):
+    queryset = ReservationIntake.objects.all()
+    serializer_class = ReservationIntakeSerializer
+    pagination_class = ReservationPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+
+class SeatHoldViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    queryset = SeatHold.objects.active()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        """
+        Endpoint for holding a list of places until the reservation
+        is confirmed (ex. [{"show_session": 1, "row": 2, "seat": 3}])
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        bump_model_versions(SeatHold)
+        invalidate_show_session_lists_by_id([instance.show_session_id])
+        FreeSeatIndex.invalidate([instance.show_session_id])
+        publish_seat_changes(
+            released=[(instance.show_session_id, instance.row, instance.seat)]
+        )
+
+
+class TicketCheckInView(generics.GenericAPIView):
+    serializer_class = TicketCheckInSerializer
+    permission_classes = (IsAdminUser,)
+
+    def post(self, request):
+        """
+        Endpoint for checking in a batch of scanned ticket codes.
+        Signatures are verified without the database and all valid
+        tickets are checked in with a single UPDATE by primary key,
+        their states are only read back when some were not updated.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        show_session_id = serializer.validated_data.get("show_session")
+
+        results = []
+        for code in serializer.validated_data["codes"]:
+            ticket = read_ticket_code(code)
+            if ticket is None:
+                results.append({"code": code, "status": "invalid"})
+                continue
+
+            result = dict(
+                zip(("code", "ticket", "show_session", "row", "seat"),
+                    (code, *ticket))
+            )
+            if show_session_id not in (None, result["show_session"]):
+                result["status"] = "wrong_show_session"
+            results.append(result)
+
+        ticket_ids = [
+            result["ticket"] for result in results if "status" not in result
+        ]
+        check_ins = {}
+        if ticket_ids:
+            checked_in_at = timezone.now()
+            updated = Ticket.objects.filter(
+                id__in=ticket_ids,
+                checked_in_at__isnull=True
+            ).update(checked_in_at=checked_in_at)
+            if updated == len(set(ticket_ids)):
+                check_ins = dict.fromkeys(ticket_ids, checked_in_at)
+            else:
+                check_ins = dict(
+                    Ticket.objects.filter(id__in=ticket_ids)
+                    .order_by()
+                    .values_list("id", "checked_in_at")
+                )
+
+        # A code scanned twice in the batch is checked in only once
+        checked_in = set()
+        for result in results:
+            if "status" in result:
+                continue
+            if result["ticket"] not in check_ins:
+                result["status"] = "invalid"
+            elif (
+                check_ins[result["ticket"]] == checked_in_at
+                and result["ticket"] not in checked_in
+            ):
+                result["status"] = "checked_in"
+                checked_in.add(result["ticket"])
+            else:
+                result["status"] = "already_checked_in"
+
+        return Response({"results": results})
+
+
+class CatalogSnapshotView(generics.GenericAPIView):
+    serializer_class = CatalogSnapshotSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        """
+        Endpoint for all show themes, astronomy shows, planetarium domes
+        and the upcoming show sessions in one document. It is rendered
+        and gzipped once per catalog version and day, then served as
+        stored bytes.
+        """
+        snapshot = get_catalog_snapshot(start_of_day(today()))
+        use_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+        etag = snapshot["gzip_etag" if use_gzip else "etag"]
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                snapshot["gzip_content" if use_gzip else "content"],
+                content_type="application/json",
+            )
+            if use_gzip:
+                response["Content-Encoding"] = "gzip"
+        response["ETag"] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.CATALOG_CACHE_MAX_AGE,
+            must_revalidate=True,
+        )
+        patch_vary_headers(response, ("Accept-Encoding", "Authorization"))
+        return response
+
+
+class ShowSessionSeatEventsView(View):
+    """
+    Server-sent events of the places of a show session, pushed as
+    reservations and holds commit. Waiting watchers only cost a queue,
+    so one ASGI worker holds thousands of them.
+    """
+
+    async def get(self, request, pk):
+        try:
+            authenticated = await AsyncJWTAuthentication().aauthenticate(
+                request
+            )
+        except AuthenticationFailed as error:
+            return api_error_response(error)
+        if authenticated is None:
+            return api_error_response(NotAuthenticated())
+
+        if not await ShowSession.objects.filter(pk=pk).aexists():
+            return api_error_response(NotFound())
+
+        response = StreamingHttpResponse(
+            seat_events(pk), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class AsyncShowSessionListView(AsyncReadView):
+    viewset_class = ShowSessionViewSet
+    action = "list"
+
+
+class AsyncShowSessionDetailView(AsyncReadView):
+    viewset_class = ShowSessionViewSet
+    action = "retrieve"
+    serializer_class = ShowSessionDetailSerializer
+    prefetch_related = ("astronomy_show__show_themes", "tickets")
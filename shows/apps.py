@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class PlanetariumConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "shows"
+
+    def ready(self):
+        from planetarium_service.conditional import track_model_versions
+        from shows import signals  # noqa: F401
+        from shows.models import AstronomyShow, ShowTheme
+
+        track_model_versions(AstronomyShow, ShowTheme)
@@ -0,0 +1,119 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from planetarium_service.conditional import bump_model_versions
+from shows.models import AstronomyShow
+
+logger = logging.getLogger(__name__)
+
+# Pillow format and file extension of every variant
+VARIANT_FORMATS = {
+    "jpeg": ("JPEG", "jpg"),
+    "webp": ("WEBP", "webp"),
+}
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    """
+    Pool shared by the requests of this process. Pillow releases the
+    GIL while decoding, resizing and encoding, so threads are enough.
+    """
+    return ThreadPoolExecutor(
+        max_workers=settings.ASTRONOMY_SHOW_IMAGE_WORKERS,
+        thread_name_prefix="astronomy-show-images",
+    )
+
+
+def variant_name(image_name, width, extension):
+    root, _ = os.path.splitext(image_name)
+    return f"{root}-{width}w.{extension}"
+
+
+def render_variants(image_file):
+    """
+    Return {format: {width: bytes}} of the uploaded image resized to
+    the configured widths, never enlarged. Variants are re-encoded
+    without EXIF or other metadata.
+    """
+    with Image.open(image_file) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    widths = sorted(
+        {
+            min(width, image.width)
+            for width in settings.ASTRONOMY_SHOW_IMAGE_WIDTHS
+        }
+    )
+    variants = {image_format: {} for image_format in VARIANT_FORMATS}
+    for width in widths:
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for image_format, (pillow_format, _) in VARIANT_FORMATS.items():
+            output = BytesIO()
+            resized.save(
+                output,
+                format=pillow_format,
+                quality=settings.ASTRONOMY_SHOW_IMAGE_QUALITY,
+            )
+            variants[image_format][width] = output.getvalue()
+    return variants
+
+
+def process_astronomy_show_image(astronomy_show_id, image_name):
+    """
+    Store the variants of the image and save their names on the
+    astronomy show, unless another image was uploaded in the meantime
+    """
+    storage = AstronomyShow._meta.get_field("image").storage
+    with storage.open(image_name) as image_file:
+        rendered = render_variants(image_file)
+
+    image_variants = {}
+    for image_format, widths in rendered.items():
+        extension = VARIANT_FORMATS[image_format][1]
+        image_variants[image_format] = {
+            str(width): storage.save(
+                variant_name(image_name, width, extension),
+                ContentFile(content),
+            )
+            for width, content in widths.items()
+        }
+
+    # Variants of a replaced image are left to collect_orphaned_images
+    updated = AstronomyShow.objects.filter(
+        id=astronomy_show_id, image=image_name
+    ).update(image_variants=image_variants)
+    if updated:
+        bump_model_versions(AstronomyShow)
+    return updated
+
+
+def _process_in_worker(astronomy_show_id, image_name):
+    try:
+        process_astronomy_show_image(astronomy_show_id, image_name)
+    except Exception:
+        logger.exception(
+            "Could not process the image %s of astronomy show %s",
+            image_name,
+            astronomy_show_id,
+        )
+    finally:
+        connection.close()
+
+
+def schedule_image_processing(astronomy_show):
+    """Process the image in the pool once the upload is committed"""
+    astronomy_show_id = astronomy_show.id
+    image_name = astronomy_show.image.name
+    transaction.on_commit(
+        lambda: get_executor().submit(
+            _process_in_worker, astronomy_show_id, image_name
+        )
+    )
@@ -0,0 +1,86 @@
+import os
+import time
+from django.core.management import BaseCommand
+from shows.models import AstronomyShow
+from shows.storage import image_storage
+
+IMAGES_DIRECTORY = "uploads/astronomy_shows"
+
+
+def stored_files(directory):
+    """Yield the names of the files stored under the directory"""
+    if not image_storage.exists(directory):
+        return
+    directories, files = image_storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for subdirectory in directories:
+        yield from stored_files(os.path.join(directory, subdirectory))
+
+
+def referenced_files():
+    """Names of the images and image variants used by astronomy shows"""
+    names = set()
+    images = AstronomyShow.objects.exclude(image__isnull=True).values_list(
+        "image", "image_variants"
+    )
+    for image, image_variants in images.iterator():
+        names.add(image)
+        for variants in image_variants.values():
+            names.update(variants.values())
+    return names
+
+
+class Command(BaseCommand):
+    """
+    Django command to delete the stored astronomy show images that no
+    astronomy show uses anymore. Recent files are kept, they may belong
+    to an upload that is not committed yet.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of stored files checked at once",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=60 * 60,
+            help="Seconds since the last write before a file is collected",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the files that would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        referenced = referenced_files()
+        deleted = 0
+        batch = []
+        for name in stored_files(IMAGES_DIRECTORY):
+            batch.append(name)
+            if len(batch) == options["batch_size"]:
+                deleted += self.collect(batch, referenced, options)
+                batch = []
+        deleted += self.collect(batch, referenced, options)
+
+        action = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(f"{action} {deleted} orphaned image files")
+
+    @staticmethod
+    def collect(names, referenced, options):
+        oldest = time.time() - options["min_age"]
+        orphans = [
+            name
+            for name in names
+            if name not in referenced
+            and os.path.getmtime(image_storage.path(name)) <= oldest
+        ]
+        if not options["dry_run"]:
+            for name in orphans:
+                image_storage.delete(name)
+        return len(orphans)
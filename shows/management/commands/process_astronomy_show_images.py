@@ -0,0 +1,33 @@
+from django.core.management import BaseCommand
+from shows.images import process_astronomy_show_image
+from shows.models import AstronomyShow
+
+
+class Command(BaseCommand):
+    """
+    Django command to process the image variants of astronomy shows,
+    for images uploaded through the admin panel or lost by a worker
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Process images that already have variants as well",
+        )
+
+    def handle(self, *args, **options):
+        astronomy_shows = AstronomyShow.objects.exclude(
+            image__isnull=True
+        ).exclude(image="")
+        if not options["all"]:
+            astronomy_shows = astronomy_shows.filter(image_variants={})
+
+        processed = 0
+        for astronomy_show_id, image_name in astronomy_shows.values_list(
+            "id", "image"
+        ).iterator():
+            processed += process_astronomy_show_image(
+                astronomy_show_id, image_name
+            )
+        self.stdout.write(f"Processed {processed} astronomy show images")
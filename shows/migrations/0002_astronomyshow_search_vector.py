@@ -0,0 +1,53 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:53
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def fill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    AstronomyShow = apps.get_model("shows", "AstronomyShow")
+    ShowTheme = apps.get_model("shows", "ShowTheme")
+    theme_names = Subquery(
+        ShowTheme.objects.filter(astronomy_shows=OuterRef("pk"))
+        .order_by()
+        .values("astronomy_shows")
+        .annotate(names=StringAgg("name", delimiter=" "))
+        .values("names")
+    )
+    AstronomyShow.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector(theme_names, weight="B", config="english")
+            + SearchVector("description", weight="C", config="english")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shows", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="astronomyshow",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="astronomyshow",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="astronomy_show_search_idx"
+            ),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
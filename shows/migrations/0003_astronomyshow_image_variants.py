@@ -0,0 +1,17 @@
+# Generated by Django 4.2.6 on 2026-10-18 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shows", "0002_astronomyshow_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="astronomyshow",
+            name="image_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-18 21:03
+
+from django.db import migrations, models
+import shows.models
+import shows.storage
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shows", "0003_astronomyshow_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="astronomyshow",
+            name="image",
+            field=models.ImageField(
+                null=True,
+                storage=shows.storage.ContentAddressedStorage(),
+                upload_to=shows.models.astronomy_show_image_file_path,
+            ),
+        ),
+    ]
@@ -1,7 +1,9 @@
 import os
-import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.text import slugify
+from shows.storage import image_storage
 
 
 class ShowTheme(models.Model):
@@ -15,8 +17,9 @@ class ShowTheme(models.Model):
 
 
 def astronomy_show_image_file_path(instance, filename):
+    """The storage renames the image after its content"""
     _, extension = os.path.splitext(filename)
-    filename = f"{slugify(instance.title)}-{uuid.uuid4()}{extension}"
+    filename = f"{slugify(instance.title)}{extension.lower()}"
 
     return os.path.join("uploads/astronomy_shows/", filename)
 
@@ -30,11 +33,22 @@ class AstronomyShow(models.Model):
     )
     image = models.ImageField(
         null=True,
-        upload_to=astronomy_show_image_file_path
+        upload_to=astronomy_show_image_file_path,
+        storage=image_storage,
     )
+    # {format: {width: file name}}, filled in by shows.images
+    image_variants = models.JSONField(default=dict, editable=False)
+    # Kept up to date by shows.signals, see shows.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            GinIndex(
+                fields=["search_vector"],
+                name="astronomy_show_search_idx",
+            ),
+        ]
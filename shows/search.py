@@ -0,0 +1,162 @@
+import re
+from collections import defaultdict
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection
+from django.db.models import (
+    Case,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from planetarium_service.conditional import model_versions
+from shows.models import AstronomyShow, ShowTheme
+
+SEARCH_CONFIG = "english"
+# Default weights of PostgreSQL ts_rank for the A, B and C labels
+TITLE_WEIGHT = 1.0
+THEMES_WEIGHT = 0.4
+DESCRIPTION_WEIGHT = 0.2
+
+_fallback_index = {}
+
+
+def uses_search_vectors():
+    return connection.vendor == "postgresql"
+
+
+def astronomy_show_search_vector():
+    """Title, theme names and description weighted A, B and C"""
+    theme_names = Subquery(
+        ShowTheme.objects.filter(astronomy_shows=OuterRef("pk"))
+        .order_by()
+        .values("astronomy_shows")
+        .annotate(names=StringAgg("name", delimiter=" "))
+        .values("names")
+    )
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(theme_names, weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(astronomy_shows):
+    """Recompute the stored search vectors with a single UPDATE"""
+    if uses_search_vectors():
+        astronomy_shows.update(search_vector=astronomy_show_search_vector())
+
+
+def stem(term):
+    """
+    Light stemming of English plurals, enough for "black hole" to match
+    "Black holes" like the PostgreSQL english configuration does
+    """
+    if term.endswith("ies") and len(term) > 4:
+        return term[:-3] + "y"
+    if term.endswith("s") and not term.endswith(("ss", "us", "is")):
+        if len(term) > 3:
+            return term[:-1]
+    return term
+
+
+def tokenize(text):
+    return [stem(term) for term in re.findall(r"\w+", text.lower())]
+
+
+class InvertedIndex:
+    """
+    In-process inverted index of astronomy shows, used instead of the
+    search vectors on databases other than PostgreSQL. Every term maps
+    to the {show id: weighted term frequency} of the shows using it.
+    Only plurals are stemmed.
+    """
+
+    def __init__(self, documents=()):
+        self.postings = defaultdict(dict)
+        for show_id, title, themes, description in documents:
+            for text, weight in (
+                (title, TITLE_WEIGHT),
+                (themes, THEMES_WEIGHT),
+                (description, DESCRIPTION_WEIGHT),
+            ):
+                for term in tokenize(text):
+                    postings = self.postings[term]
+                    postings[show_id] = postings.get(show_id, 0) + weight
+
+    @classmethod
+    def build(cls):
+        """Build the index of all astronomy shows from two queries"""
+        themes = defaultdict(list)
+        show_themes = AstronomyShow.show_themes.through.objects.values_list(
+            "astronomyshow_id", "showtheme__name"
+        )
+        for show_id, name in show_themes:
+            themes[show_id].append(name)
+
+        astronomy_shows = AstronomyShow.objects.values_list(
+            "id", "title", "description"
+        )
+        return cls(
+            (show_id, title, " ".join(themes[show_id]), description)
+            for show_id, title, description in astronomy_shows
+        )
+
+    @classmethod
+    def current(cls):
+        """The index of this process, rebuilt after catalog changes"""
+        versions = model_versions((AstronomyShow, ShowTheme))
+        if _fallback_index.get("versions") != versions:
+            _fallback_index["index"] = cls.build()
+            _fallback_index["versions"] = versions
+        return _fallback_index["index"]
+
+    def search(self, query):
+        """Return {show id: score} of the shows matching every term"""
+        terms = set(tokenize(query))
+        if not terms:
+            return {}
+        postings = [self.postings.get(term, {}) for term in terms]
+        matches = set.intersection(*(set(posting) for posting in postings))
+        return {
+            show_id: sum(posting[show_id] for posting in postings)
+            for show_id in matches
+        }
+
+
+def search_astronomy_shows(queryset, query):
+    """
+    Filter the astronomy shows matching the web search style `query`
+    and order them from the most relevant
+    """
+    if uses_search_vectors():
+        search_query = SearchQuery(
+            query, search_type="websearch", config=SEARCH_CONFIG
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F("search_vector"), search_query)
+        ).order_by("-rank", "id")
+
+    # One branch per distinct score rather than per show keeps the
+    # expression shallow on large catalogs
+    scores = InvertedIndex.current().search(query)
+    show_ids_by_score = defaultdict(list)
+    for show_id, score in scores.items():
+        show_ids_by_score[round(score, 6)].append(show_id)
+    return queryset.filter(id__in=scores).annotate(
+        rank=Case(
+            *(
+                When(id__in=show_ids, then=Value(score))
+                for score, show_ids in show_ids_by_score.items()
+            ),
+            default=0.0,
+            output_field=FloatField(),
+        )
+    ).order_by("-rank", "id")
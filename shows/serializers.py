@@ -1,5 +1,11 @@
+from django.conf import settings
+from django.db import transaction
+from django.template.defaultfilters import filesizeformat
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from shows.images import schedule_image_processing
 from shows.models import AstronomyShow, ShowTheme
+from shows.storage import SIGNATURE_SIZE, image_extension
 
 
 class ShowThemeSerializer(serializers.ModelSerializer):
@@ -14,27 +20,117 @@ class AstronomyShowSerializer(serializers.ModelSerializer):
         fields = ("id", "title", "description", "show_themes")
 
 
+@extend_schema_field(
+    {
+        "type": "object",
+        "additionalProperties": {"type": "string"},
+        "example": {
+            "webp": "/media/show-320w.webp 320w, /media/show-640w.webp 640w",
+            "jpeg": "/media/show-320w.jpg 320w, /media/show-640w.jpg 640w",
+        },
+    }
+)
+class ImageSrcsetField(serializers.Field):
+    """
+    `srcset` of every variant format of the image, empty until the
+    variants are processed
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "image_variants"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        storage = AstronomyShow._meta.get_field("image").storage
+        request = self.context.get("request")
+        srcset = {}
+        for image_format, names in value.items():
+            urls = []
+            for width, name in sorted(
+                names.items(), key=lambda item: int(item[0])
+            ):
+                url = storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls.append(f"{url} {width}w")
+            srcset[image_format] = ", ".join(urls)
+        return srcset
+
+
 class AstronomyShowListSerializer(AstronomyShowSerializer):
     show_themes = serializers.SlugRelatedField(
         many=True,
         read_only=True,
         slug_field="name"
     )
+    image_srcset = ImageSrcsetField()
 
     class Meta:
         model = AstronomyShow
-        fields = ("id", "title", "description", "show_themes", "image")
+        fields = (
+            "id",
+            "title",
+            "description",
+            "show_themes",
+            "image",
+            "image_srcset",
+        )
 
 
 class AstronomyShowDetailSerializer(AstronomyShowSerializer):
     show_themes = ShowThemeSerializer(many=True, read_only=True)
+    image_srcset = ImageSrcsetField()
 
     class Meta:
         model = AstronomyShow
-        fields = ("id", "title", "description", "show_themes", "image")
+        fields = (
+            "id",
+            "title",
+            "description",
+            "show_themes",
+            "image",
+            "image_srcset",
+        )
+
+
+class UploadedImageField(serializers.ImageField):
+    """Checks the size and the type of the file before decoding it"""
+
+    default_error_messages = {
+        "max_size": "Ensure the image is not larger than {max_size}.",
+        "invalid_type": "Upload a JPEG, PNG or WebP image.",
+    }
+
+    def to_internal_value(self, data):
+        max_size = settings.ASTRONOMY_SHOW_IMAGE_MAX_SIZE
+        if getattr(data, "size", 0) > max_size:
+            self.fail("max_size", max_size=filesizeformat(max_size))
+
+        if hasattr(data, "read"):
+            data.seek(0)
+            header = data.read(SIGNATURE_SIZE)
+            data.seek(0)
+            if image_extension(header) is None:
+                self.fail("invalid_type")
+
+        return super().to_internal_value(data)
 
 
 class AstronomyShowImageSerializer(serializers.ModelSerializer):
+    image = UploadedImageField()
+
     class Meta:
         model = AstronomyShow
         fields = ("id", "image")
+
+    def update(self, instance, validated_data):
+        """
+        Store the upload as it is, the variants are processed in the
+        background
+        """
+        with transaction.atomic():
+            instance.image_variants = {}
+            instance = super().update(instance, validated_data)
+            schedule_image_processing(instance)
+        return instance
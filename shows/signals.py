@@ -0,0 +1,57 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from shows.models import AstronomyShow, ShowTheme
+from shows.search import update_search_vectors
+
+
+@receiver(post_save, sender=AstronomyShow)
+def update_astronomy_show_search_vector(sender, instance, **kwargs):
+    update_search_vectors(AstronomyShow.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=AstronomyShow.show_themes.through)
+def update_search_vectors_on_show_themes_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "pre_clear" and reverse:
+        instance.cleared_astronomy_show_ids = list(
+            instance.astronomy_shows.values_list("id", flat=True)
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        astronomy_shows = AstronomyShow.objects.filter(pk=instance.pk)
+    elif action == "post_clear":
+        astronomy_shows = AstronomyShow.objects.filter(
+            pk__in=instance.cleared_astronomy_show_ids
+        )
+    else:
+        astronomy_shows = AstronomyShow.objects.filter(pk__in=pk_set)
+    update_search_vectors(astronomy_shows)
+
+
+@receiver(post_save, sender=ShowTheme)
+def update_search_vectors_on_show_theme_save(sender, instance, **kwargs):
+    update_search_vectors(AstronomyShow.objects.filter(show_themes=instance))
+
+
+@receiver(pre_delete, sender=ShowTheme)
+def remember_show_theme_astronomy_shows(sender, instance, **kwargs):
+    instance.deleted_astronomy_show_ids = list(
+        instance.astronomy_shows.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=ShowTheme)
+def update_search_vectors_on_show_theme_delete(sender, instance, **kwargs):
+    update_search_vectors(
+        AstronomyShow.objects.filter(
+            pk__in=instance.deleted_astronomy_show_ids
+        )
+    )
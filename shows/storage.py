@@ -0,0 +1,88 @@
+import hashlib
+import os
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.utils.deconstruct import deconstructible
+
+# Enough leading bytes to recognize every accepted image type
+SIGNATURE_SIZE = 12
+
+
+def image_extension(header):
+    """Extension of the image type recognized from its leading bytes"""
+    if header.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploaded files to temporary files chunk by chunk and
+    hashes them on the way. Chunks past ASTRONOMY_SHOW_IMAGE_MAX_SIZE
+    are dropped, the file keeps its full size so validation can reject
+    it without reading it.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hash = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= settings.ASTRONOMY_SHOW_IMAGE_MAX_SIZE:
+            self.hash.update(raw_data)
+            self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.content_hash = self.hash.hexdigest()
+        return uploaded_file
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every file as <directory>/<ab>/<sha256><extension> in the
+    directory of the requested name, so identical files are stored
+    once and a stored file never changes. Files can be shared by
+    several records, unreferenced ones are removed by the
+    `collect_orphaned_images` command only.
+    """
+
+    def _save(self, name, content):
+        content_hash = getattr(content, "content_hash", None)
+        if content_hash is None:
+            hasher = hashlib.sha256()
+            for chunk in content.chunks():
+                hasher.update(chunk)
+            content_hash = hasher.hexdigest()
+
+        content.seek(0)
+        extension = image_extension(content.read(SIGNATURE_SIZE))
+        if extension is None:
+            extension = os.path.splitext(name)[1].lower()
+        name = os.path.join(
+            os.path.dirname(name),
+            content_hash[:2],
+            f"{content_hash}{extension}",
+        )
+
+        if self.exists(name):
+            # Reused blobs are not old enough to be collected
+            os.utime(self.path(name))
+            return name
+
+        saved_name = super()._save(name, content)
+        if saved_name != name:
+            # The same content was stored concurrently
+            self.delete(saved_name)
+        return name
+
+
+image_storage = ContentAddressedStorage()
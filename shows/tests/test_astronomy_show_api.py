@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
 from shows.models import ShowTheme, AstronomyShow
 from shows.serializers import (
@@ -14,6 +15,7 @@ from shows.serializers import (
 )
 
 ASTRONOMY_SHOW_URL = reverse("shows:astronomyshow-list")
+ASYNC_ASTRONOMY_SHOW_URL = reverse("shows:astronomyshow-list-async")
 
 
 def detail_url(astronomy_show_id):
@@ -94,6 +96,46 @@ class AuthenticatedAstronomyShowApiTests(TestCase):
         self.assertIn(serializer2.data, res.data)
         self.assertNotIn(serializer3.data, res.data)
 
+    def test_filter_astronomy_shows_by_all_show_themes(self):
+        astronomy_show = AstronomyShow.objects.create(
+            title="Both themes",
+            description="Both themes description"
+        )
+        astronomy_show.show_themes.add(self.show_theme1, self.show_theme2)
+        show_themes = f"{self.show_theme1.id},{self.show_theme2.id}"
+
+        res = self.client.get(
+            ASTRONOMY_SHOW_URL, {"show_themes": show_themes}
+        )
+        self.assertEqual(
+            [show["id"] for show in res.data],
+            [
+                self.astronomy_show1.id,
+                self.astronomy_show2.id,
+                astronomy_show.id,
+            ]
+        )
+
+        res = self.client.get(
+            ASTRONOMY_SHOW_URL,
+            {"show_themes": show_themes, "show_themes_match": "all"}
+        )
+        self.assertEqual(
+            [show["id"] for show in res.data], [astronomy_show.id]
+        )
+
+    def test_filter_astronomy_shows_by_unknown_match_mode(self):
+        res = self.client.get(
+            ASTRONOMY_SHOW_URL,
+            {
+                "show_themes": self.show_theme1.id,
+                "show_themes_match": "some",
+            }
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("show_themes_match", res.data)
+
     def test_filter_astronomy_shows_by_title(self):
         res = self.client.get(ASTRONOMY_SHOW_URL, {"title": "Show"})
 
@@ -105,6 +147,32 @@ class AuthenticatedAstronomyShowApiTests(TestCase):
         self.assertIn(serializer2.data, res.data)
         self.assertNotIn(serializer3.data, res.data)
 
+    def test_search_astronomy_shows(self):
+        astronomy_show = AstronomyShow.objects.create(
+            title="Inside the Sun",
+            description="A bad trip through the solar core"
+        )
+
+        res = self.client.get(ASTRONOMY_SHOW_URL, {"q": "bad"})
+
+        self.assertEqual(
+            [show["id"] for show in res.data],
+            [self.astronomy_show2.id, astronomy_show.id]
+        )
+
+    def test_search_follows_show_theme_changes(self):
+        self.show_theme3.name = "Black holes"
+        self.show_theme3.save()
+
+        res = self.client.get(ASTRONOMY_SHOW_URL, {"q": "black hole"})
+        self.assertEqual(
+            [show["id"] for show in res.data], [self.astronomy_show3.id]
+        )
+
+        self.astronomy_show3.show_themes.clear()
+        res = self.client.get(ASTRONOMY_SHOW_URL, {"q": "black hole"})
+        self.assertEqual(res.data, [])
+
     def test_astronomy_show_creation_is_prohibited(self):
         payload = {
             "title": "Test Title",
@@ -128,6 +196,28 @@ class AuthenticatedAstronomyShowApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_unchanged_astronomy_shows_are_not_modified(self):
+        res = self.client.get(ASTRONOMY_SHOW_URL)
+        self.assertIn("max-age=60", res["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                ASTRONOMY_SHOW_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_show_theme_change_modifies_astronomy_show_detail(self):
+        url = detail_url(self.astronomy_show1.id)
+        etag = self.client.get(url)["ETag"]
+
+        self.astronomy_show1.show_themes.add(self.show_theme2)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["show_themes"]), 2)
+        self.assertNotEqual(res["ETag"], etag)
+
 
 class AdminAstronomyShowApiTests(TestCase):
     def setUp(self):
@@ -271,3 +361,38 @@ class AstronomyShowImageUploadTests(TestCase):
         res = self.client.get(ASTRONOMY_SHOW_URL)
 
         self.assertIn("image", res.data[0].keys())
+
+
+class AsyncAstronomyShowApiTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            "test@test.test",
+            "testpass",
+        )
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(user)}"
+        }
+        self.astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        self.astronomy_show.show_themes.add(
+            ShowTheme.objects.create(name="Space inside")
+        )
+
+    async def test_async_list_and_detail_match_sync_views(self):
+        for async_url, url in (
+            (ASYNC_ASTRONOMY_SHOW_URL, ASTRONOMY_SHOW_URL),
+            (
+                reverse(
+                    "shows:astronomyshow-detail-async",
+                    args=[self.astronomy_show.id]
+                ),
+                detail_url(self.astronomy_show.id),
+            ),
+        ):
+            res = await self.async_client.get(async_url, headers=self.headers)
+            expected = await self.async_client.get(url, headers=self.headers)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.json(), expected.json())
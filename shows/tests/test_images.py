@@ -0,0 +1,132 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from shows.images import process_astronomy_show_image
+from shows.models import AstronomyShow
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_file(width, height):
+    image = Image.new("RGB", (width, height), "navy")
+    exif = Image.Exif()
+    exif[0x010F] = "Telescope maker"
+    output = BytesIO()
+    image.save(output, format="JPEG", exif=exif)
+    output.name = "sky.jpg"
+    output.seek(0)
+    return output
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    ASTRONOMY_SHOW_IMAGE_WIDTHS=(320, 640, 1280),
+)
+class AstronomyShowImageVariantsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@myproject.com", "password"
+            )
+        )
+        self.astronomy_show = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+
+    def upload(self, width=800, height=400):
+        url = reverse(
+            "shows:astronomyshow-upload-image",
+            args=[self.astronomy_show.id]
+        )
+        with mock.patch("shows.images.get_executor") as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(
+                    url,
+                    {"image": jpeg_file(width, height)},
+                    format="multipart"
+                )
+        self.astronomy_show.refresh_from_db()
+        return res, get_executor.return_value
+
+    def test_upload_defers_processing(self):
+        res, executor = self.upload()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.astronomy_show.image_variants, {})
+        executor.submit.assert_called_once_with(
+            mock.ANY, self.astronomy_show.id, self.astronomy_show.image.name
+        )
+
+    def test_variants_are_resized_without_metadata(self):
+        self.upload()
+
+        process_astronomy_show_image(
+            self.astronomy_show.id, self.astronomy_show.image.name
+        )
+        self.astronomy_show.refresh_from_db()
+
+        variants = self.astronomy_show.image_variants
+        self.assertEqual(set(variants), {"jpeg", "webp"})
+        storage = self.astronomy_show.image.storage
+        for image_format, names in variants.items():
+            # Never enlarged past the 800 pixels of the upload
+            self.assertEqual(list(names), ["320", "640", "800"])
+            for width, name in names.items():
+                with storage.open(name) as variant, Image.open(variant) as im:
+                    self.assertEqual(im.format.lower(), image_format)
+                    self.assertEqual(im.width, int(width))
+                    self.assertEqual(im.height, int(width) // 2)
+                    self.assertEqual(len(im.getexif()), 0)
+
+    def test_srcset_is_listed(self):
+        self.upload()
+        process_astronomy_show_image(
+            self.astronomy_show.id, self.astronomy_show.image.name
+        )
+
+        res = self.client.get(reverse("shows:astronomyshow-list"))
+
+        srcset = res.data[0]["image_srcset"]
+        self.assertEqual(set(srcset), {"jpeg", "webp"})
+        self.assertRegex(
+            srcset["webp"],
+            r"^http://testserver/media/\S+\.webp 320w, "
+            r"\S+\.webp 640w, \S+\.webp 800w$"
+        )
+
+    def test_replaced_image_is_not_processed(self):
+        self.upload()
+        image_name = self.astronomy_show.image.name
+        self.upload(width=400)
+
+        self.assertEqual(
+            process_astronomy_show_image(self.astronomy_show.id, image_name),
+            0
+        )
+        self.astronomy_show.refresh_from_db()
+        self.assertEqual(self.astronomy_show.image_variants, {})
+
+    def test_command_processes_missing_variants(self):
+        self.upload(width=100, height=100)
+
+        call_command("process_astronomy_show_images", stdout=StringIO())
+
+        self.astronomy_show.refresh_from_db()
+        self.assertEqual(
+            list(self.astronomy_show.image_variants["webp"]), ["100"]
+        )
@@ -0,0 +1,212 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    override_settings,
+    tag,
+)
+from django.urls import reverse
+from django.views.static import serve
+from planetarium_service.media import serve_media
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4096
+CONTENT_HASH = hashlib.sha256(CONTENT).hexdigest()
+POSTER = "uploads/astronomy_shows/poster.jpg"
+HASHED_POSTER = (
+    f"uploads/astronomy_shows/{CONTENT_HASH[:2]}/{CONTENT_HASH}.jpg"
+)
+REQUESTS = 200
+
+
+def media_url(name):
+    return reverse("media", args=[name])
+
+
+def write_media(name):
+    path = os.path.join(MEDIA_ROOT, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as media_file:
+        media_file.write(CONTENT)
+
+
+def body(response):
+    return b"".join(response)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE=None)
+class ServeMediaTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        write_media(POSTER)
+        write_media(HASHED_POSTER)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_file_is_served_with_validators(self):
+        res = self.client.get(media_url(POSTER))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(body(res), CONTENT)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertEqual(res["Cache-Control"], "public, max-age=3600")
+        self.assertIn("Last-Modified", res)
+
+        res = self.client.get(
+            media_url(POSTER), headers={"If-None-Match": res["ETag"]}
+        )
+        self.assertEqual(res.status_code, 304)
+
+    def test_hashed_file_is_immutable(self):
+        res = self.client.get(media_url(HASHED_POSTER))
+
+        self.assertEqual(res["ETag"], f'"{CONTENT_HASH}"')
+        self.assertEqual(
+            res["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+
+    def test_range_requests(self):
+        for byte_range, expected, content_range in (
+            ("bytes=2-5", CONTENT[2:6], "bytes 2-5/1048576"),
+            ("bytes=1048570-", CONTENT[-6:], "bytes 1048570-1048575/1048576"),
+            ("bytes=-4", CONTENT[-4:], "bytes 1048572-1048575/1048576"),
+        ):
+            res = self.client.get(
+                media_url(POSTER), headers={"Range": byte_range}
+            )
+
+            self.assertEqual(res.status_code, 206)
+            self.assertEqual(body(res), expected)
+            self.assertEqual(res["Content-Length"], str(len(expected)))
+            self.assertEqual(res["Content-Range"], content_range)
+
+    def test_unsatisfiable_range(self):
+        res = self.client.get(
+            media_url(POSTER), headers={"Range": "bytes=2000000-"}
+        )
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], "bytes */1048576")
+
+    def test_reversed_range_gets_whole_file(self):
+        res = self.client.get(
+            media_url(POSTER), headers={"Range": "bytes=5-2"}
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(body(res)), len(CONTENT))
+
+    def test_stale_if_range_gets_whole_file(self):
+        res = self.client.get(
+            media_url(POSTER),
+            headers={"Range": "bytes=0-9", "If-Range": '"stale"'},
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(body(res)), len(CONTENT))
+
+    def test_files_outside_media_root_are_not_served(self):
+        for name in ("../secret.txt", "uploads/missing.jpg", "uploads"):
+            res = self.client.get(media_url(name))
+            self.assertEqual(res.status_code, 404)
+
+    def test_only_safe_methods(self):
+        res = self.client.post(media_url(POSTER))
+
+        self.assertEqual(res.status_code, 405)
+
+    @override_settings(MEDIA_SENDFILE="x-accel-redirect")
+    def test_x_accel_redirect(self):
+        res = self.client.get(media_url(POSTER))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/protected-media/{POSTER}"
+        )
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertIn("ETag", res)
+
+    @override_settings(MEDIA_SENDFILE="x-sendfile")
+    def test_x_sendfile(self):
+        res = self.client.get(media_url(POSTER))
+
+        self.assertEqual(
+            res["X-Sendfile"], os.path.join(MEDIA_ROOT, POSTER)
+        )
+
+
+@tag("benchmark")
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE=None)
+class ServeMediaBenchmark(SimpleTestCase):
+    """
+    The media view against django.views.static.serve, which static()
+    mounted, for a 1 MiB image
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        write_media(POSTER)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @staticmethod
+    def measure(view, headers=None):
+        request = RequestFactory().get("/", headers=headers)
+        sent = 0
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            response = view(request)
+            sent += len(body(response))
+            response.close()
+        elapsed = (time.perf_counter() - started) / REQUESTS
+        return f"{elapsed * 1000:.2f} ms, {sent // REQUESTS} bytes"
+
+    def test_media_serving(self):
+        def static_view(request):
+            return serve(request, POSTER, document_root=MEDIA_ROOT)
+
+        def media_view(request):
+            return serve_media(request, POSTER)
+
+        validators = serve_media(RequestFactory().get("/"), POSTER)
+        validators.close()
+        report = []
+        for name, static_headers, media_headers in (
+            ("full", None, None),
+            (
+                "revalidation",
+                {"If-Modified-Since": validators["Last-Modified"]},
+                {"If-None-Match": validators["ETag"]},
+            ),
+            (
+                "64 KiB range",
+                {"Range": "bytes=0-65535"},
+                {"Range": "bytes=0-65535"},
+            ),
+        ):
+            report.append(
+                f"{name}: static() {self.measure(static_view, static_headers)}"
+                f", media view {self.measure(media_view, media_headers)}"
+            )
+        with self.settings(MEDIA_SENDFILE="x-accel-redirect"):
+            report.append(f"x-accel-redirect: {self.measure(media_view)}")
+
+        sys.stderr.write(
+            f"\nPer request for a {len(CONTENT)} bytes file, "
+            f"{'; '.join(report)}\n"
+        )
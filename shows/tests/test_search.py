@@ -0,0 +1,78 @@
+from unittest import mock
+from django.test import TestCase
+from shows.models import AstronomyShow, ShowTheme
+from shows.search import InvertedIndex, search_astronomy_shows
+
+
+class InvertedIndexTests(TestCase):
+    def test_search_requires_every_term_and_weights_fields(self):
+        index = InvertedIndex(
+            [
+                (1, "Stars", "Space", "Stars and planets"),
+                (2, "Planets", "Stars", "Around the sun"),
+                (3, "Moon", "Space", "Stars far away"),
+            ]
+        )
+
+        self.assertEqual(
+            index.search("STARS"), {1: 1.2, 2: 0.4, 3: 0.2}
+        )
+        self.assertEqual(index.search("stars planets"), {1: 1.4, 2: 1.4})
+        self.assertEqual(index.search("comets"), {})
+        self.assertEqual(index.search("  "), {})
+
+    def test_plurals_match_singulars(self):
+        index = InvertedIndex(
+            [
+                (1, "Galaxies", "Black holes", ""),
+                (2, "Stars", "Space", "Glass dust"),
+            ]
+        )
+
+        self.assertEqual(index.search("black hole"), {1: 0.8})
+        self.assertEqual(index.search("galaxy"), {1: 1.0})
+        self.assertEqual(index.search("star"), {2: 1.0})
+        self.assertEqual(index.search("glass"), {2: 0.2})
+
+
+@mock.patch("shows.search.uses_search_vectors", return_value=False)
+class FallbackSearchTests(TestCase):
+    def setUp(self):
+        self.moon = AstronomyShow.objects.create(
+            title="Moon", description="Craters of the moon"
+        )
+        self.sun = AstronomyShow.objects.create(
+            title="Sun", description="The star closest to the moon"
+        )
+        self.sun.show_themes.add(ShowTheme.objects.create(name="Stars"))
+
+    def test_results_are_ordered_by_relevance(self, _):
+        results = search_astronomy_shows(AstronomyShow.objects.all(), "moon")
+
+        self.assertEqual(list(results), [self.moon, self.sun])
+
+    def test_index_is_rebuilt_after_catalog_changes(self, _):
+        search_astronomy_shows(AstronomyShow.objects.all(), "stars")
+
+        self.moon.show_themes.add(ShowTheme.objects.get(name="Stars"))
+        results = search_astronomy_shows(AstronomyShow.objects.all(), "stars")
+
+        self.assertEqual(set(results), {self.moon, self.sun})
+
+    def test_ranking_has_one_branch_per_score(self, _):
+        AstronomyShow.objects.bulk_create(
+            AstronomyShow(
+                title=f"Moon {number}" if number % 2 else f"Show {number}",
+                description="Moon",
+            )
+            for number in range(1000)
+        )
+
+        results = search_astronomy_shows(AstronomyShow.objects.all(), "moon")
+
+        # Titles and descriptions (1.2) or descriptions only (0.2)
+        self.assertEqual(str(results.query).count("WHEN"), 2)
+        self.assertEqual(results.count(), 1002)
+        self.assertEqual(results[0], self.moon)
+        self.assertEqual(results[500].title, "Moon 999")
+        self.assertEqual(results[501], self.sun)
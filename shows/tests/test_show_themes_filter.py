@@ -0,0 +1,116 @@
+import re
+import sys
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase, tag
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from shows.models import AstronomyShow, ShowTheme
+from shows.views import AstronomyShowViewSet
+
+ASTRONOMY_SHOWS = 5000
+SHOW_THEMES = 50
+THEMES_PER_SHOW = 4
+ROUNDS = 5
+
+
+def filtered_queryset(params):
+    """Queryset of the astronomy show list for the query parameters"""
+    request = Request(APIRequestFactory().get("/", params))
+    viewset = AstronomyShowViewSet(
+        request=request, action="list", args=(), kwargs={}, format_kwarg=None
+    )
+    # Without the prefetch, only the filter query is measured
+    return viewset.get_queryset().prefetch_related(None)
+
+
+def joined_queryset(show_themes_ids=(), match_all=False):
+    """The previous implementation, joins the M2M table and DISTINCT"""
+    queryset = AstronomyShow.objects.all()
+    if match_all:
+        for show_theme_id in show_themes_ids:
+            queryset = queryset.filter(show_themes__id=show_theme_id)
+    elif show_themes_ids:
+        queryset = queryset.filter(show_themes__id__in=show_themes_ids)
+    return queryset.distinct()
+
+
+@tag("benchmark")
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN ANALYZE")
+class ShowThemesFilterBenchmark(TestCase):
+    """EXISTS based show themes filter against the join and DISTINCT"""
+
+    @classmethod
+    def setUpTestData(cls):
+        show_themes = ShowTheme.objects.bulk_create(
+            ShowTheme(name=f"Theme {index}") for index in range(SHOW_THEMES)
+        )
+        astronomy_shows = AstronomyShow.objects.bulk_create(
+            AstronomyShow(
+                title=f"Show {index}",
+                description=f"Description of the show {index} " * 20,
+            )
+            for index in range(ASTRONOMY_SHOWS)
+        )
+        through = AstronomyShow.show_themes.through
+        through.objects.bulk_create(
+            through(
+                astronomyshow=astronomy_show,
+                showtheme=show_themes[(index * 7 + offset) % SHOW_THEMES],
+            )
+            for index, astronomy_show in enumerate(astronomy_shows)
+            for offset in range(THEMES_PER_SHOW)
+        )
+        cls.show_themes_ids = [show_theme.id for show_theme in show_themes]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    @staticmethod
+    def measure(queryset):
+        """Best execution time in the database, without the ORM"""
+        return min(
+            float(
+                re.search(
+                    r"Execution Time: ([\d.]+) ms",
+                    queryset.explain(analyze=True),
+                ).group(1)
+            )
+            for _ in range(ROUNDS)
+        )
+
+    def test_show_themes_filter(self):
+        any_ids = self.show_themes_ids[:10]
+        all_ids = self.show_themes_ids[:2]
+        report = []
+        for name, params, previous in (
+            ("unfiltered", {}, joined_queryset()),
+            (
+                "any of 10 themes",
+                {"show_themes": ",".join(map(str, any_ids))},
+                joined_queryset(any_ids),
+            ),
+            (
+                "all of 2 themes",
+                {
+                    "show_themes": ",".join(map(str, all_ids)),
+                    "show_themes_match": "all",
+                },
+                joined_queryset(all_ids, match_all=True),
+            ),
+        ):
+            queryset = filtered_queryset(params)
+            self.assertNotIn("DISTINCT", str(queryset.query))
+
+            results = list(queryset)
+            self.assertEqual(results, list(previous))
+            self.assertTrue(results)
+            report.append(
+                f"{name} ({len(results)} shows): join and DISTINCT "
+                f"{self.measure(previous):.1f} ms, "
+                f"EXISTS {self.measure(queryset):.1f} ms"
+            )
+
+        sys.stderr.write(
+            f"\n{ASTRONOMY_SHOWS} astronomy shows, {SHOW_THEMES} show "
+            f"themes, {'; '.join(report)}\n"
+        )
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from shows.models import AstronomyShow
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_content(image_format="JPEG", color="navy", size=(64, 32)):
+    output = BytesIO()
+    Image.new("RGB", size, color).save(output, format=image_format)
+    return output.getvalue()
+
+
+def upload_file(content, name="poster.jpg"):
+    uploaded_file = BytesIO(content)
+    uploaded_file.name = name
+    return uploaded_file
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ContentAddressedImageStorageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@myproject.com", "password"
+            )
+        )
+        self.astronomy_show1 = AstronomyShow.objects.create(
+            title="Good Show",
+            description="Good Show description"
+        )
+        self.astronomy_show2 = AstronomyShow.objects.create(
+            title="Bad Show",
+            description="Bad Show description"
+        )
+
+    def upload(self, astronomy_show, uploaded_file):
+        url = reverse(
+            "shows:astronomyshow-upload-image", args=[astronomy_show.id]
+        )
+        res = self.client.post(url, {"image": uploaded_file})
+        astronomy_show.refresh_from_db()
+        return res
+
+    def test_identical_uploads_share_one_file(self):
+        content = image_content()
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        for astronomy_show in (self.astronomy_show1, self.astronomy_show2):
+            res = self.upload(astronomy_show, upload_file(content))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        name = (
+            f"uploads/astronomy_shows/{content_hash[:2]}/{content_hash}.jpg"
+        )
+        self.assertEqual(self.astronomy_show1.image.name, name)
+        self.assertEqual(self.astronomy_show2.image.name, name)
+        self.assertEqual(
+            os.listdir(os.path.dirname(self.astronomy_show1.image.path)),
+            [f"{content_hash}.jpg"]
+        )
+
+    def test_extension_follows_content(self):
+        self.upload(
+            self.astronomy_show1, upload_file(image_content("PNG"), "a.JPG")
+        )
+
+        self.assertTrue(self.astronomy_show1.image.name.endswith(".png"))
+
+    @override_settings(ASTRONOMY_SHOW_IMAGE_MAX_SIZE=1000)
+    def test_large_upload_is_rejected_before_decoding(self):
+        content = image_content(size=(512, 512))
+        self.assertGreater(len(content), 1000)
+
+        with mock.patch("PIL.Image.open") as image_open:
+            res = self.upload(self.astronomy_show1, upload_file(content))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("not larger than", str(res.data["image"]))
+        image_open.assert_not_called()
+        self.assertFalse(self.astronomy_show1.image)
+
+    def test_unsupported_type_is_rejected_before_decoding(self):
+        with mock.patch("PIL.Image.open") as image_open:
+            res = self.upload(
+                self.astronomy_show1, upload_file(image_content("GIF"))
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("JPEG, PNG or WebP", str(res.data["image"]))
+        image_open.assert_not_called()
+
+    def test_orphaned_files_are_collected(self):
+        self.upload(self.astronomy_show1, upload_file(image_content()))
+        replaced = self.astronomy_show1.image.path
+        self.upload(self.astronomy_show1, upload_file(image_content("PNG")))
+        self.upload(self.astronomy_show2, upload_file(image_content("PNG")))
+
+        out = StringIO()
+        call_command("collect_orphaned_images", stdout=out)
+        self.assertEqual(out.getvalue(), "Deleted 0 orphaned image files\n")
+        self.assertTrue(os.path.exists(replaced))
+
+        call_command(
+            "collect_orphaned_images",
+            "--min-age=0",
+            "--batch-size=1",
+            stdout=out,
+        )
+        self.assertFalse(os.path.exists(replaced))
+        self.assertTrue(os.path.exists(self.astronomy_show1.image.path))
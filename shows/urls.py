@@ -3,6 +3,8 @@ from rest_framework import routers
 from shows.views import (
     ShowThemeViewSet,
     AstronomyShowViewSet,
+    AsyncAstronomyShowListView,
+    AsyncAstronomyShowDetailView,
 )
 
 router = routers.DefaultRouter()
@@ -10,7 +12,17 @@ router.register("show-themes", ShowThemeViewSet)
 router.register("astronomy-shows", AstronomyShowViewSet)
 
 urlpatterns = [
-    path("", include(router.urls))
+    path("", include(router.urls)),
+    path(
+        "async/astronomy-shows/",
+        AsyncAstronomyShowListView.as_view(),
+        name="astronomyshow-list-async",
+    ),
+    path(
+        "async/astronomy-shows/<int:pk>/",
+        AsyncAstronomyShowDetailView.as_view(),
+        name="astronomyshow-detail-async",
+    ),
 ]
 
 app_name = "shows"
@@ -1,11 +1,17 @@
+from django.db.models import Exists, OuterRef
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import mixins, status
+from rest_framework import mixins, serializers, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
+from planetarium_service.async_views import AsyncReadView
+from planetarium_service.conditional import ConditionalGetMixin
 from shows.models import ShowTheme, AstronomyShow
+from shows.search import search_astronomy_shows
+from shows.storage import HashingFileUploadHandler
 from user.permissions import IsAdminOrIfAuthenticatedReadOnly
 from shows.serializers import (
     ShowThemeSerializer,
@@ -17,6 +23,7 @@ from shows.serializers import (
 
 
 class ShowThemeViewSet(
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -25,9 +32,16 @@ class ShowThemeViewSet(
     queryset = ShowTheme.objects.all()
     serializer_class = ShowThemeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    conditional_models = (ShowTheme,)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
 
 
 class AstronomyShowViewSet(
+    ConditionalGetMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -38,27 +52,62 @@ class AstronomyShowViewSet(
     queryset = AstronomyShow.objects.prefetch_related("show_themes")
     serializer_class = AstronomyShowSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    conditional_models = (AstronomyShow, ShowTheme)
 
     @staticmethod
     def _params_to_ints(qs):
         """Converts a list of string IDs to a list of integers"""
         return [int(str_id) for str_id in qs.split(",")]
 
+    @staticmethod
+    def _has_show_themes(show_themes_ids):
+        """
+        EXISTS over the M2M table instead of a join, so every show
+        appears once and no DISTINCT is needed
+        """
+        return Exists(
+            AstronomyShow.show_themes.through.objects.filter(
+                astronomyshow_id=OuterRef("pk"),
+                showtheme_id__in=show_themes_ids,
+            )
+        )
+
+    def get_show_themes_match(self):
+        value = self.request.query_params.get("show_themes_match", "any")
+        try:
+            return serializers.ChoiceField(
+                choices=("any", "all")
+            ).to_internal_value(value)
+        except ValidationError as error:
+            raise ValidationError({"show_themes_match": error.detail})
+
     def get_queryset(self):
         """Retrieve the astronomy_shows with filters"""
         title = self.request.query_params.get("title")
         show_themes = self.request.query_params.get("show_themes")
+        search_query = self.request.query_params.get("q")
 
-        queryset = self.queryset
+        queryset = super().get_queryset()
 
         if title:
             queryset = queryset.filter(title__icontains=title)
 
         if show_themes:
-            show_themes_ids = self._params_to_ints(show_themes)
-            queryset = queryset.filter(show_themes__id__in=show_themes_ids)
-
-        return queryset.distinct()
+            show_themes_ids = set(self._params_to_ints(show_themes))
+            if self.get_show_themes_match() == "all":
+                for show_theme_id in show_themes_ids:
+                    queryset = queryset.filter(
+                        self._has_show_themes([show_theme_id])
+                    )
+            else:
+                queryset = queryset.filter(
+                    self._has_show_themes(show_themes_ids)
+                )
+
+        if search_query:
+            queryset = search_astronomy_shows(queryset, search_query)
+
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -81,6 +130,7 @@ class AstronomyShowViewSet(
     def upload_image(self, request, pk=None):
         """Endpoint for uploading image to specific astronomy show"""
         astronomy_show = self.get_object()
+        request.upload_handlers = [HashingFileUploadHandler(request)]
         serializer = self.get_serializer(astronomy_show, data=request.data)
 
         if serializer.is_valid():
@@ -92,11 +142,28 @@ class AstronomyShowViewSet(
     # Only for documentation purposes
     @extend_schema(
         parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Search in titles, descriptions and show theme names, "
+                    "the most relevant first (ex. ?q=black holes)"
+                ),
+            ),
             OpenApiParameter(
                 "show_themes",
                 type={"type": "list", "items": {"type": "number"}},
                 description="Filter by show theme id (ex. ?show_themes=2,5)",
             ),
+            OpenApiParameter(
+                "show_themes_match",
+                type=OpenApiTypes.STR,
+                enum=("any", "all"),
+                description=(
+                    "Whether astronomy shows need any (default) or all of "
+                    "the show themes (ex. ?show_themes_match=all)"
+                ),
+            ),
             OpenApiParameter(
                 "title",
                 type=OpenApiTypes.STR,
@@ -108,4 +175,21 @@ class AstronomyShowViewSet(
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class AsyncAstronomyShowListView(AsyncReadView):
+    viewset_class = AstronomyShowViewSet
+    action = "list"
+
+
+class AsyncAstronomyShowDetailView(AsyncReadView):
+    viewset_class = AstronomyShowViewSet
+    action = "retrieve"
@@ -0,0 +1,232 @@
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+USER_CACHE_PREFIX = "user:principal"
+
+# Claims embedded by user.serializers.add_principal_claims
+PRINCIPAL_CLAIMS = ("is_staff", "is_active", "auth_time")
+# User fields cached for tokens whose claims are not trusted
+PRINCIPAL_FIELDS = ("is_staff", "is_active")
+
+# The change markers seen by this process, saves a cache round trip
+# per request
+_local_changes = LocMemCache(
+    USER_CACHE_PREFIX, {"OPTIONS": {"MAX_ENTRIES": 10000}}
+)
+
+
+def user_cache_key(user_id):
+    return f"{USER_CACHE_PREFIX}:{user_id}"
+
+
+def user_changed_key(user_id):
+    return f"{USER_CACHE_PREFIX}:changed:{user_id}"
+
+
+def claims_max_age():
+    """
+    Seconds the claims are trusted after they were embedded. Refreshing
+    re-reads the user from the database, so every access token carries
+    claims at most one access token lifetime old.
+    """
+    return api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+
+
+def forget_user(user_id):
+    """
+    Drop the cached user fields and distrust the claims of the tokens
+    issued until now, they are checked against the user again. The
+    marker only has to outlive these claims.
+    """
+    key = user_changed_key(user_id)
+    changed_at = time.time()
+    cache.delete(user_cache_key(user_id))
+    cache.set(key, changed_at, claims_max_age())
+    _local_changes.set(key, changed_at, settings.USER_CHANGE_CHECK_INTERVAL)
+
+
+def changed_since(user_id):
+    """
+    Time of the last change of the user, 0 when it did not change within
+    the claims max age. Changes made by other processes are seen after
+    at most USER_CHANGE_CHECK_INTERVAL seconds.
+    """
+    key = user_changed_key(user_id)
+    changed_at = _local_changes.get(key)
+    if changed_at is None:
+        changed_at = cache.get(key, 0)
+        _local_changes.set(
+            key, changed_at, settings.USER_CHANGE_CHECK_INTERVAL
+        )
+    return changed_at
+
+
+async def achanged_since(user_id):
+    key = user_changed_key(user_id)
+    changed_at = _local_changes.get(key)
+    if changed_at is None:
+        changed_at = await cache.aget(key, 0)
+        _local_changes.set(
+            key, changed_at, settings.USER_CHANGE_CHECK_INTERVAL
+        )
+    return changed_at
+
+
+def principal_queryset(user_id):
+    return (
+        get_user_model()
+        .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+        .values(*PRINCIPAL_FIELDS)
+    )
+
+
+def get_cached_principal(user_id):
+    """
+    The PRINCIPAL_FIELDS of the user, cached for USER_CACHE_TIMEOUT
+    seconds, or None when the user does not exist. A change racing with
+    the lookup can be cached, the short timeout bounds it.
+    """
+    key = user_cache_key(user_id)
+    fields = cache.get(key)
+    if fields is None:
+        fields = principal_queryset(user_id).first()
+        if fields is not None:
+            cache.set(key, fields, settings.USER_CACHE_TIMEOUT)
+    return fields
+
+
+async def aget_cached_principal(user_id):
+    key = user_cache_key(user_id)
+    fields = await cache.aget(key)
+    if fields is None:
+        fields = await principal_queryset(user_id).afirst()
+        if fields is not None:
+            await cache.aset(key, fields, settings.USER_CACHE_TIMEOUT)
+    return fields
+
+
+def claims_are_current(validated_token, changed_at):
+    """
+    Whether the token carries the principal claims and the user did not
+    change since they were issued
+    """
+    if any(claim not in validated_token for claim in PRINCIPAL_CLAIMS):
+        return False
+    auth_time = validated_token["auth_time"]
+    if auth_time + claims_max_age() < time.time():
+        return False
+    return auth_time > changed_at
+
+
+class TokenPrincipal(SimpleLazyObject):
+    """
+    request.user built from the token claims or the cached user fields.
+    The id and the is_staff and is_active flags are read without a
+    query, any other use loads the full user from the database.
+    """
+
+    def __init__(self, user_id, is_staff):
+        super().__init__(lambda: self._load_user())
+        self.__dict__.update(
+            id=user_id,
+            pk=user_id,
+            is_staff=is_staff,
+            is_active=True,
+            is_authenticated=True,
+            is_anonymous=False,
+        )
+
+    def __bool__(self):
+        return True
+
+    def _load_user(self):
+        user = (
+            get_user_model()
+            .objects.filter(
+                **{api_settings.USER_ID_FIELD: self.__dict__["id"]}
+            )
+            .first()
+        )
+        if user is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+        return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without a query per request: request.user is a
+    TokenPrincipal of the token claims. Tokens issued before the user
+    changed, or without the claims, get the user fields from the cache.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if claims_are_current(validated_token, changed_since(user_id)):
+            return self.get_principal(user_id, validated_token)
+        return self.get_principal(user_id, get_cached_principal(user_id))
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+    def get_principal(self, user_id, fields):
+        """Principal of the is_staff and is_active claims or user fields"""
+        if fields is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+        if not fields["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return TokenPrincipal(user_id, fields["is_staff"])
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication for async views, the user is read async. The
+    principal must not load the full user in async code.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if claims_are_current(validated_token, await achanged_since(user_id)):
+            return self.get_principal(user_id, validated_token)
+        return self.get_principal(
+            user_id, await aget_cached_principal(user_id)
+        )
+
+
+class CachedJWTAuthenticationScheme(SimpleJWTScheme):
+    target_class = CachedJWTAuthentication
@@ -1,5 +1,13 @@
+import time
 from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -22,3 +30,44 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+def add_principal_claims(token, user):
+    """Embed the claims user.authentication.TokenPrincipal is built of"""
+    token["is_staff"] = user.is_staff
+    token["is_active"] = user.is_active
+    token["auth_time"] = int(time.time())
+    return token
+
+
+class PrincipalTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_principal_claims(super().get_token(user), user)
+
+
+class PrincipalTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        """
+        Embed the claims of the user as stored in the database, rotated
+        refresh tokens would keep the claims of the login otherwise
+        """
+        refresh = self.token_class(attrs["refresh"])
+        user = (
+            get_user_model()
+            .objects.filter(
+                **{
+                    api_settings.USER_ID_FIELD: refresh.get(
+                        api_settings.USER_ID_CLAIM
+                    )
+                }
+            )
+            .first()
+        )
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                _("No active account found for the given token"),
+                code="no_active_account",
+            )
+        add_principal_claims(refresh, user)
+        return super().validate({**attrs, "refresh": str(refresh)})
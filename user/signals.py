@@ -0,0 +1,13 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from user.authentication import forget_user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_changed_user(sender, instance, **kwargs):
+    """Covers the changes of ManageUserView and the admin panel"""
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_user(user_id))
@@ -1,3 +1,200 @@
+import time
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
-# Create your tests here.
+from reservations.models import Reservation
+from user.authentication import (
+    CachedJWTAuthentication,
+    TokenPrincipal,
+    user_cache_key,
+    user_changed_key,
+)
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_URL = reverse("user:token_refresh")
+MANAGE_USER_URL = reverse("user:manage")
+RESERVATION_URL = reverse("reservations:reservation-list")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "principal@test.com", "password"
+        )
+        self.factory = APIRequestFactory()
+
+    def obtain_tokens(self):
+        return self.client.post(
+            TOKEN_URL,
+            {"email": "principal@test.com", "password": "password"},
+        ).data
+
+    def obtain_access_token(self):
+        return self.obtain_tokens()["access"]
+
+    def authenticate(self, access_token):
+        request = self.factory.get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {access_token}"
+        )
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def test_tokens_embed_principal_claims(self):
+        token = AccessToken(self.obtain_access_token())
+
+        self.assertIs(token["is_staff"], False)
+        self.assertIs(token["is_active"], True)
+        self.assertIn("auth_time", token)
+
+    def test_principal_is_built_without_queries(self):
+        access_token = self.obtain_access_token()
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(access_token)
+            self.assertIsInstance(user, TokenPrincipal)
+            self.assertTrue(user)
+            self.assertTrue(user.is_authenticated)
+            self.assertFalse(user.is_staff)
+            self.assertEqual(user.pk, self.user.pk)
+
+    def test_full_user_is_loaded_on_use(self):
+        access_token = self.obtain_access_token()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.authenticate(access_token).email, "principal@test.com"
+            )
+
+    def test_change_markers_are_read_once_per_interval(self):
+        access_token = self.obtain_access_token()
+        self.authenticate(access_token)
+
+        with mock.patch("user.authentication.cache") as shared_cache:
+            user = self.authenticate(access_token)
+
+        shared_cache.get.assert_not_called()
+        self.assertIsInstance(user, TokenPrincipal)
+
+    def test_only_principal_fields_are_cached(self):
+        self.authenticate(str(RefreshToken.for_user(self.user).access_token))
+
+        self.assertEqual(
+            cache.get(user_cache_key(self.user.pk)),
+            {"is_staff": False, "is_active": True},
+        )
+
+    def test_principal_is_accepted_as_foreign_key(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.obtain_access_token()}"
+        )
+
+        response = self.client.get(RESERVATION_URL)
+
+        self.assertEqual(response.status_code, 200)
+        principal = self.authenticate(self.obtain_access_token())
+        Reservation.objects.create(user=principal)
+        self.assertTrue(Reservation.objects.filter(user=principal).exists())
+
+    def test_tokens_without_claims_use_cached_fields(self):
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        get_user_model().objects.update(is_staff=True)
+
+        user = self.authenticate(access_token)
+
+        self.assertIsInstance(user, TokenPrincipal)
+        self.assertTrue(user.is_staff)
+
+    def test_admin_change_is_seen_by_issued_tokens(self):
+        access_token = self.obtain_access_token()
+        self.authenticate(access_token).email
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = True
+            self.user.save()
+        user = self.authenticate(access_token)
+
+        self.assertTrue(user.is_staff)
+
+    def test_manage_user_view_change_drops_cached_user(self):
+        access_token = self.obtain_access_token()
+        self.assertEqual(
+            self.authenticate(access_token).email, "principal@test.com"
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                MANAGE_USER_URL, {"email": "changed@test.com"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.authenticate(access_token).email, "changed@test.com"
+        )
+
+    def test_deactivated_user_is_rejected(self):
+        access_token = self.obtain_access_token()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access_token)
+
+    def test_new_token_after_change_is_trusted_again(self):
+        # The change happened before the login
+        get_user_model().objects.update(is_staff=True)
+        cache.set(user_changed_key(self.user.pk), time.time() - 60)
+        access_token = self.obtain_access_token()
+        get_user_model().objects.update(is_staff=False)
+
+        user = self.authenticate(access_token)
+
+        self.assertTrue(user.is_staff)
+
+    def test_claims_are_trusted_for_one_access_token_lifetime(self):
+        token = RefreshToken.for_user(self.user).access_token
+        token["is_staff"] = False
+        token["is_active"] = True
+        token["auth_time"] = int(time.time()) - 31 * 60
+        get_user_model().objects.update(is_staff=True)
+
+        user = self.authenticate(str(token))
+
+        self.assertTrue(user.is_staff)
+
+    def test_refresh_reads_claims_from_database(self):
+        refresh_token = self.obtain_tokens()["refresh"]
+        # Queryset updates do not reach the change marker
+        get_user_model().objects.update(is_staff=True)
+
+        response = self.client.post(
+            TOKEN_REFRESH_URL, {"refresh": refresh_token}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(AccessToken(response.data["access"])["is_staff"], True)
+        self.assertIs(
+            RefreshToken(response.data["refresh"])["is_staff"], True
+        )
+        user = self.authenticate(response.data["access"])
+        self.assertIsInstance(user, TokenPrincipal)
+        self.assertTrue(user.is_staff)
+
+    def test_inactive_user_cannot_refresh(self):
+        refresh_token = self.obtain_tokens()["refresh"]
+        get_user_model().objects.update(is_active=False)
+
+        response = self.client.post(
+            TOKEN_REFRESH_URL, {"refresh": refresh_token}
+        )
+
+        self.assertEqual(response.status_code, 401)